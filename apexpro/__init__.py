@@ -21,18 +21,15 @@ import json
 import logging
 import requests
 
-from web3 import Web3
-from apexpro.eth_signing import SignWithWeb3, SignOnboardingAction
-from apexpro.eth_signing import SignWithKey
 from apexpro.constants import REGISTER_ENVID_MAIN, APEX_HTTP_MAIN, URL_SUFFIX, NETWORKID_MAIN
-from apexpro.starkex.helpers import private_key_to_public_key_pair_hex
 
 from datetime import datetime as dt
 from concurrent.futures import ThreadPoolExecutor
 
-from .eth import Eth
 from .exceptions import FailedRequestError, InvalidRequestError
-from .models import configDecoder
+from .helpers.instrumentation import NO_PHASE, PHASE_DECODE, PHASE_NETWORK, phase
+from .helpers.scheduler import endpoint_name
+from .models import ConfigIndex, ConfigsV2, configDecoder
 
 try:
     from simplejson.errors import JSONDecodeError
@@ -43,6 +40,16 @@ except ImportError:
 VERSION = '1.0.0'
 
 
+# web3, eth_account and the STARK math take most of the import time of the package, and are
+# not needed for public market data. They are imported on first use instead.
+
+def private_key_to_public_key_pair_hex(private_key_hex):
+    """Given private key as hex string, return the public x, y pair as hex strings."""
+    from apexpro.starkex.helpers import private_key_to_public_key_pair_hex as _key_pair_hex
+
+    return _key_pair_hex(private_key_hex)
+
+
 class HTTP:
     """
     Connector for Apexpro's HTTP API.
@@ -54,6 +61,12 @@ class HTTP:
     :param endpoint: The endpoint URL of the HTTP API, e.g.
         'https://dev.pro.apex.exchange.com'.
     :type endpoint: str
+    :param request_scheduler: Optional apexpro.helpers.scheduler.RequestScheduler that every
+        request waits on before it is sent, to stay within the rate limits.
+    :param response_cache: Optional apexpro.helpers.response_cache.ResponseCache that coalesces
+        and caches GET requests.
+    :param instrumentation: Optional apexpro.helpers.instrumentation.Instrumentation, e.g. a
+        HistogramCollector, receiving the duration of the phases of each request.
 
     """
 
@@ -82,7 +95,8 @@ class HTTP:
             api_key_credentials=None,
             request_timeout=10, recv_window=5000, force_retry=False,
             retry_codes=None, max_retries=3,
-            retry_delay=3, referral_id=None, proxies=None
+            retry_delay=3, referral_id=None, proxies=None,
+            request_scheduler=None, response_cache=None, instrumentation=None
     ):
         # Remove trailing '/' if present, from host.
         if endpoint.endswith('/'):
@@ -129,7 +143,13 @@ class HTTP:
         self.default_address = None
         self.network_id = None
 
+        self._signer = None
+        self._starkey_signer = None
+
         if web3 is not None or web3_provider is not None:
+            from web3 import Web3
+            from apexpro.eth_signing import SignWithWeb3
+
             if isinstance(web3_provider, str):
                 web3_provider = Web3.HTTPProvider(web3_provider)
             self.web3 = web3 or Web3(web3_provider)
@@ -139,6 +159,8 @@ class HTTP:
 
         if eth_private_key is not None or web3_account is not None:
             # May override web3 or web3_provider configuration.
+            from apexpro.eth_signing import SignWithKey
+
             key = eth_private_key or web3_account.key
             self.eth_signer = SignWithKey(key)
             self.default_address = self.eth_signer.address
@@ -173,15 +195,15 @@ class HTTP:
 
         self.api_key_credentials = api_key_credentials
 
-        self.signer = SignOnboardingAction(self.eth_signer, self.network_id)
-        self.starkeySigner = SignOnboardingAction(self.eth_signer, self.env_id)
-
         # Set timeout.
         self.timeout = request_timeout
         self.recv_window = recv_window
         self.force_retry = force_retry
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.request_scheduler = request_scheduler
+        self.response_cache = response_cache
+        self.instrumentation = instrumentation
 
         # Set whitelist of non-fatal Apexpro status codes to retry on.
         if retry_codes is None:
@@ -249,24 +271,47 @@ class HTTP:
             bytes(_val, 'utf-8'), digestmod='sha256'
         ).hexdigest())
 
+    @property
+    def signer(self):
+        '''
+        Onboarding action signer for the network id, created on first use.
+        '''
+        if self._signer is None:
+            from apexpro.eth_signing import SignOnboardingAction
+
+            self._signer = SignOnboardingAction(self.eth_signer, self.network_id)
+        return self._signer
+
+    @signer.setter
+    def signer(self, signer):
+        self._signer = signer
+
+    @property
+    def starkeySigner(self):
+        '''
+        Onboarding action signer for the register env id, created on first use.
+        '''
+        if self._starkey_signer is None:
+            from apexpro.eth_signing import SignOnboardingAction
+
+            self._starkey_signer = SignOnboardingAction(self.eth_signer, self.env_id)
+        return self._starkey_signer
+
+    @starkeySigner.setter
+    def starkeySigner(self, signer):
+        self._starkey_signer = signer
+
     @property
     def eth(self):
         '''
         Get the eth module, used for interacting with Ethereum smart contracts.
         '''
-        collateral_asset_id = ''
-        token_contracts = ''
-        web3_provider = ''
         starware_perpetuals_contract = self.config.get('global').get('starkExContractAddress')
-        for k, v1 in enumerate(self.config.get('currency')):
-            if v1.get('id') == 'USDC':
-                collateral_asset_id = v1.get('starkExAssetId')
-        for k, v2 in enumerate(self.config.get('multiChain').get('chains')):
-            if v2.get('chainId') == self.network_id:
-                web3_provider = v2.get('rpcUrl')
-                for k, v3 in enumerate(v2.get('tokens')):
-                    if v3.get('token') == 'USDC':
-                        token_contracts = v3.get('tokenAddress')
+        collateral_asset_id = self.configIndex.currency('USDC').get('starkExAssetId', '')
+        web3_provider = self.configIndex.chain(self.network_id).get('rpcUrl', '')
+        token_contracts = self.configIndex.token(self.network_id, 'USDC').get('tokenAddress', '')
+
+        from web3 import Web3
 
         web3_provider = Web3.HTTPProvider(web3_provider)
         self.web3 =  Web3(web3_provider)
@@ -274,6 +319,8 @@ class HTTP:
         if not self._eth:
             eth_private_key = getattr(self.eth_signer, '_private_key', None)
             if self.web3 and eth_private_key:
+                from .eth import Eth
+
                 self._eth = Eth(
                     web3=self.web3,
                     network_id=self.network_id,
@@ -307,9 +354,12 @@ class HTTP:
             method='GET',
             path=self.endpoint + suffix
         )
+        return self._then(configs, self._store_configs)
+
+    def _store_configs(self, configs):
         self.env_id = configs['data']['global']['registerEnvId']
-        self.config = configs['data']
-        self.starkeySigner = SignOnboardingAction(self.eth_signer, self.env_id)
+        self._apply_configs(configs['data'])
+        self._starkey_signer = None
         return configs
 
     def configs_v2(self, **kwargs):
@@ -318,16 +368,88 @@ class HTTP:
             method='GET',
             path=self.endpoint + suffix
         )
-        self.configV2 = configs['data']
+        return self._then(configs, self._store_configs_v2)
+
+    def _store_configs_v2(self, configs):
         self.env_id = configs['data']['usdcConfig']['global']['registerEnvId']
-        self.usdcConfigV2 = configs['data']['usdcConfig']
-        self.usdtConfigV2 = configs['data']['usdtConfig']
-        self.starkeySigner = SignOnboardingAction(self.eth_signer, self.env_id)
+        self._apply_configs_v2(configs['data'])
+        self._starkey_signer = None
         return configs
 
-    def _submit_request(self, method=None, path=None, query=None, headers=None):
+    def _apply_configs(self, config):
+        """Stores the data of configs() along with its lookup index."""
+        self.config = config
+        self.configIndex = ConfigIndex(config)
+
+    def _apply_configs_v2(self, config):
+        """
+        Stores the data of configs_v2() along with its lookup index, as one ConfigsV2 snapshot
+        swapped in by a single assignment. Methods that read several of configV2,
+        usdcConfigV2, usdtConfigV2 and configIndexV2 should take them from one snapshot, or
+        read configIndexV2 once, to stay consistent with a refresh from another thread.
         """
-        Submits the request to the API.
+        self.configsV2 = ConfigsV2(config, config['usdcConfig'], config['usdtConfig'],
+                                   ConfigIndex(config['usdcConfig'], config['usdtConfig']))
+
+    configsV2 = ConfigsV2(None, None, None, None)
+
+    @property
+    def configV2(self):
+        return self.configsV2.config
+
+    @property
+    def usdcConfigV2(self):
+        return self.configsV2.usdc
+
+    @property
+    def usdtConfigV2(self):
+        return self.configsV2.usdt
+
+    @property
+    def configIndexV2(self):
+        return self.configsV2.index
+
+    def _then(self, response, callback):
+        """
+        Passes the response of _submit_request to callback and returns its result. Methods that
+        keep state from a response (configs, user, account) go through here, so that clients
+        whose _submit_request returns an awaitable can apply callback once it resolves.
+        """
+        return callback(response)
+
+    def _phase(self, path, phase_name):
+        """
+        Returns a context manager timing a phase of the request to path (a URL or endpoint name)
+        into the instrumentation of the client. It does nothing if there is none.
+        """
+        if self.instrumentation is None:
+            return NO_PHASE
+        return phase(self.instrumentation, endpoint_name(path), phase_name)
+
+    def _submit_request(self, method=None, path=None, query=None, headers=None,
+                        sign_headers=None):
+        """
+        Submits the request to the API, through response_cache if the client has one.
+        sign_headers, if given, returns the signature headers to add to headers; it is called
+        for each attempt, once request_scheduler lets the request through.
+        """
+        if self.response_cache is None:
+            return self._send_request(method, path, query, headers, sign_headers)
+        if method == 'GET':
+            return self.response_cache.get(
+                self.response_cache.key(path, query, headers),
+                lambda: self._send_request(method, path, query, headers, sign_headers)
+            )
+        try:
+            return self._send_request(method, path, query, headers, sign_headers)
+        finally:
+            if headers and headers.get('APEX-API-KEY'):
+                self.response_cache.invalidate(headers['APEX-API-KEY'])
+
+    def _send_request(self, method=None, path=None, query=None, headers=None,
+                      sign_headers=None):
+        """
+        Sends the request to the API.
 
         Notes
         -------------------
@@ -372,22 +494,30 @@ class HTTP:
             if self.log_requests:
                 self.logger.debug(f'Request -> {method} {path}: {req_params}')
 
+            # Wait for the rate budget, if any, then sign.
+            if self.request_scheduler is not None:
+                self.request_scheduler.acquire(path)
+            req_headers = headers
+            if sign_headers is not None:
+                req_headers = dict(headers or {}, **sign_headers())
+
             # Prepare request; use 'params' for GET and 'data' for POST.
             if method == 'GET':
                 r = self.client.prepare_request(
                     requests.Request(method, path, params=req_params,
-                                     headers=headers)
+                                     headers=req_headers)
                 )
             elif method == 'POST':
                 r = self.client.prepare_request(
                     requests.Request(method, path,
                                      data=req_params,
-                                     headers=headers)
+                                     headers=req_headers)
                 )
 
             # Attempt the request.
             try:
-                s = self.client.send(r, timeout=self.timeout)
+                with self._phase(path, PHASE_NETWORK):
+                    s = self.client.send(r, timeout=self.timeout)
 
             # If requests fires an error, retry.
             except (
@@ -404,7 +534,8 @@ class HTTP:
 
             # Convert response to dictionary, or raise if requests error.
             try:
-                s_json = s.json()
+                with self._phase(path, PHASE_DECODE):
+                    s_json = s.json()
 
             # If we have trouble converting, handle the error and retry.
             except JSONDecodeError as e:
@@ -1,16 +1,18 @@
 import base64
+import functools
 import hashlib
 
 import websocket
 import threading
-import time
 import json
 import hmac
 import logging
 import re
-import copy
+import time
 from . import HTTP, APEX_HTTP_MAIN
 from .constants import APEX_WS_MAIN
+from .helpers.backoff import Backoff
+from .helpers.decoders import get_decoder
 from .helpers.request_helpers import generate_now
 
 
@@ -23,7 +25,9 @@ PUBLIC_WSS = "/realtime_public?v=2"
 class _WebSocketManager:
     def __init__(self, callback_function, endpoint="", api_key_credentials=None,
                  ping_interval=15, ping_timeout=None,
-                 restart_on_error=True, trace_logging=False):
+                 restart_on_error=True, trace_logging=False,
+                 event_callback=None, reconnect_delay=0.05, max_reconnect_delay=30,
+                 dispatcher=None, decoder=None):
 
         if endpoint.endswith('/'):
             self.endpoint = endpoint[:-1]
@@ -43,6 +47,17 @@ class _WebSocketManager:
         #   }
         self.callback_directory = {}
 
+        # If given a helpers.dispatcher.Dispatcher, topic callbacks run on its worker threads
+        # instead of the receive thread.
+        self.dispatcher = dispatcher
+
+        # What a topic push is passed to, by topic: its callback, or the callback bound to the
+        # dispatcher. Kept by _set_callback and _pop_callback.
+        self._routes = {}
+
+        # Parses frames, see helpers.decoders.get_decoder.
+        self.decode = get_decoder(decoder)
+
         # Set ping settings.
         self.ping_interval = ping_interval
         self.ping_timeout = ping_timeout
@@ -51,6 +66,24 @@ class _WebSocketManager:
         self.handle_error = restart_on_error
         self.timer = None
         self.r_timer = None
+        self.connect_timeout = 10
+        self._opened = threading.Event()
+
+        # Reconnect settings. Dropped connections are reopened after a jittered exponential
+        # backoff, re-authenticated, and subscribed again to every topic in subscriptions:
+        #   {
+        #       "topic_name": subscribe message
+        #   }
+        # event_callback, if given, is called with {'event': 'disconnect'} and
+        # {'event': 'reconnect'} dicts (see _on_disconnect and _resume).
+        self.event_callback = event_callback
+        self.backoff = Backoff(reconnect_delay, max_reconnect_delay)
+        self.subscriptions = {}
+        self.reconnects = 0
+        self._disconnected_at = None
+        self._exit_event = threading.Event()
+        self._last_error = None
+        self.ws = None
 
         # Enable websocket-client's trace logging for extra debug information
         # on the websocket connection, including the raw sent & recv messages
@@ -86,8 +119,14 @@ class _WebSocketManager:
             "op": "ping",
             "args": [str(time_stamp)]
         })
-        self.ws.send(ping)
         #print("send ping:" + ping)
+        return self._send(ping)
+
+    def _send(self, message):
+        """
+        Sends a text message on the connection.
+        """
+        return self.ws.send(message)
 
     def _on_open(self):
         """
@@ -95,52 +134,124 @@ class _WebSocketManager:
         """
 
         logger.debug(f"WebSocket  opened.")
+        self._opened.set()
 
     def _on_message(self, message):
         """
         Parse incoming messages.
         """
-        self.callback(json.loads(message))
+        return self.callback(self.decode(message))
 
     def _connect(self, url):
         """
         Open websocket in a thread.
         """
         self.private_websocket = True if url.__contains__("private") else False
+        self.url = url
 
-        time_stamp = generate_now()
-        self.ws = websocket.WebSocketApp(
-            url=url + '&timestamp=' + str(time_stamp),
-            on_message=lambda ws, msg: self._on_message(msg),
-            on_close=self._on_close(),
-            on_open=self._on_open(),
-            on_error=lambda ws, err: self._on_error(err)
-        )
+        self._opened.clear()
+        self._exit_event.clear()
 
-        # Setup the thread running WebSocketApp.
-        self.wst = threading.Thread(target=lambda: self.ws.run_forever(
-            ping_interval=self.ping_interval,
-            ping_timeout=self.ping_timeout
-        ))
+        # Setup the thread running WebSocketApp, and reconnecting when it returns.
+        self.wst = threading.Thread(target=self._run_forever)
 
         # Configure as daemon; start.
         self.wst.daemon = True
         self.wst.start()
 
-        # Attempt to connect for X seconds.
-        retries = 10
-        while retries > 0 and (not self.ws.sock or not self.ws.sock.connected):
-            retries -= 1
-            time.sleep(1)
-
-        # If connection was not successful, raise error.
-        if retries <= 0:
+        # Wait for the handshake (and login) for up to connect_timeout seconds, or raise.
+        if not self._opened.wait(self.connect_timeout):
             self.exit()
             raise websocket.WebSocketTimeoutException("Connection failed.")
 
-        # If given an api_key, authenticate.
+    def _run_forever(self):
+        while not self.exited:
+            time_stamp = generate_now()
+            self.ws = websocket.WebSocketApp(
+                url=self.url + '&timestamp=' + str(time_stamp),
+                on_message=lambda ws, msg: self._on_message(msg),
+                on_close=lambda ws, *args: self._on_close(),
+                on_open=lambda ws: self._on_connected(time_stamp),
+                on_error=lambda ws, err: self._on_error(err)
+            )
+            self.ws.run_forever(
+                ping_interval=self.ping_interval,
+                ping_timeout=self.ping_timeout
+            )
+            if self.exited or not self.handle_error:
+                return
+            self._on_disconnect(self._last_error)
+            self._last_error = None
+            # Wait before reconnecting, unless exit() is called meanwhile.
+            if self._exit_event.wait(self.backoff.next()):
+                return
+
+    def _on_connected(self, time_stamp):
+        """
+        Authenticate if given an api_key, and restore the subscriptions of a dropped
+        connection, before reporting the connection open.
+        """
         if self.api_key_credentials:
             self._auth(time_stamp)
+        if self._disconnected_at is not None:
+            self._resume()
+        self._on_open()
+
+    def _on_disconnect(self, error=None):
+        """
+        Record when the connection was lost, and report it once until it is restored.
+        """
+        if self._disconnected_at is not None:
+            return
+        self._disconnected_at = time.time()
+        logger.warning("WebSocket disconnected, reconnecting.")
+        self._emit({
+            'event': 'disconnect',
+            'url': self.url,
+            'private': self.private_websocket,
+            'error': None if error is None else str(error),
+            'topics': list(self.subscriptions),
+        })
+
+    def _resume(self):
+        """
+        Subscribe again, in a single message, to the topics of the lost connection.
+        """
+        event = {
+            'event': 'reconnect',
+            'url': self.url,
+            'private': self.private_websocket,
+            'attempts': self.backoff.attempts,
+            'downtime': time.time() - self._disconnected_at,
+            'topics': list(self.subscriptions),
+        }
+        self._disconnected_at = None
+        self.backoff.reset()
+        self.reconnects += 1
+        replay = self._replay_message()
+        result = self._send(replay) if replay else None
+        logger.debug(f"WebSocket reconnected after {event['downtime']:.3f}s.")
+        self._emit(event)
+        return result
+
+    def _replay_message(self):
+        """
+        The message subscribing again to every topic in subscriptions, or None.
+        """
+        args = []
+        for sendStr in self.subscriptions.values():
+            args.extend(json.loads(sendStr).get("args") or [])
+        if not args:
+            return None
+        return json.dumps({"op": "subscribe", "args": args}, sort_keys=True,
+                          separators=(",", ":"))
+
+    def _emit(self, event):
+        if self.event_callback is not None:
+            try:
+                self.event_callback(event)
+            except Exception:
+                logger.exception("WebSocket event callback failed.")
 
     def _auth(self, time_stamp):
         """
@@ -171,26 +282,22 @@ class _WebSocketManager:
             }
 
         # Authenticate with API.
-        self.ws.send(
+        return self._send(
             json.dumps(sendStr)
         )
 
     def _on_error(self, error):
         """
-        Exit on errors and raise exception, or attempt reconnect.
+        Log errors. The connection is then closed, and reopened by _run_forever if
+        restart_on_error is set.
         """
 
-        if not self.exited:
-            logger.error(f"WebSocket  encountered error: {error}.")
-            self.exit()
+        # Errors raised while exit() closes the connection are expected.
+        if self.exited:
+            return
 
-        # Reconnect.
-        if self.handle_error:
-            self._reset()
-            if self.private_websocket:
-                self._connect(self.endpoint + PRIVATE_WSS)
-            else:
-                self._connect(self.endpoint + PUBLIC_WSS)
+        logger.error(f"WebSocket  encountered error: {error}.")
+        self._last_error = error
 
     def _on_close(self):
         """
@@ -211,10 +318,22 @@ class _WebSocketManager:
         Closes the websocket connection.
         """
 
-        self.ws.close()
-        while self.ws.sock:
-            continue
         self.exited = True
+        self._exit_event.set()
+        if self.ws is None:
+            return
+        self.ws.keep_running = False
+        # Only send the close frame and let run_forever read the reply and tear the connection
+        # down, since reading from both threads can leave it waiting on a closed socket. The
+        # thread cannot wait for itself when exiting from one of its callbacks (_on_error).
+        sock = self.ws.sock
+        if sock is not None and sock.connected and self.wst is not threading.current_thread():
+            try:
+                sock.send_close()
+            except Exception:
+                pass
+            self.wst.join(self.connect_timeout)
+        self.ws.close()
 
 
 class _ApexWebSocketManager(_WebSocketManager):
@@ -227,73 +346,88 @@ class _ApexWebSocketManager(_WebSocketManager):
         provided callback function, to be called by incoming messages.
         """
 
+        self._set_callback(topic, callback)
         if self.private_websocket:
             # Spot private topics don't need a subscription message
-            self._set_callback(topic, callback)
             return
 
-        self.ws.send(sendStr)
-        self._set_callback(topic, callback)
+        # Keep the subscribe message of the topic, to send it again after a reconnect.
+        op = json.loads(sendStr).get("op")
+        if op == "subscribe":
+            self.subscriptions[topic] = sendStr
+        elif op == "unsubscribe":
+            self.subscriptions.pop(topic, None)
+        if self._disconnected_at is not None:
+            # Sent with the others once reconnected.
+            return
+        return self._send(sendStr)
+
+    def subscribe_many(self, args, callback):
+        """
+        Subscribes callback to several public topics with a single subscribe message.
+        """
+        for arg in args:
+            self._set_callback(arg, callback)
+            self.subscriptions[arg] = json.dumps({"op": "subscribe", "args": [arg]},
+                                                 sort_keys=True, separators=(",", ":"))
+        if self._disconnected_at is not None:
+            # Sent with the others once reconnected.
+            return
+        return self._send(json.dumps({"op": "subscribe", "args": list(args)},
+                                     sort_keys=True, separators=(",", ":")))
 
     def _handle_incoming_message(self, message):
-        #print(message)
-        def is_ping_message():
-            if type(message) == dict and message.get("op") == "ping":
-                return True
-            else:
-                return False
-
-        def is_auth_message():
-            if type(message) == dict and \
-                    message.get("request") is not None and message.get("request").get("op") is not None and message.get("request").get("op") == "login":
-                return True
-            else:
-                return False
-
-        def is_subscription_message():
-            if type(message) == dict and \
-                    message.get("request") is not None and message.get("request").get("op") is not None and message.get("request").get("op") == "subscribe":
-                return True
-            else:
-                return False
-
-        if is_ping_message():
+        if type(message) != dict:
+            return
+        # Topic pushes are nearly all the traffic, so they are recognised by their topic key
+        # alone and passed straight to their route.
+        topic = message.get("topic")
+        if topic is not None:
+            route = self._routes.get(topic)
+            if route is not None:
+                return route(message)
+            return
+
+        if message.get("op") == "ping":
             time_stamp = generate_now()
             pong = json.dumps({
                 "op": "pong",
                 "args": [str(time_stamp)]
             })
-            self.ws.send(pong)
             #print("send pong:" + pong)
-            return
+            return self._send(pong)
 
+        request = message.get("request")
+        if request is None:
+            return
+        op = request.get("op")
         # Check auth
-        if is_auth_message():
+        if op == "login":
             # If we get successful spot auth, notify user
-            if message.get("success") is not None and message.get("success") == "true":
+            if message.get("success") == "true":
                 logger.debug(f"Authorization successful.")
                 self.auth = True
 
         # Check subscription
-        elif is_subscription_message():
+        elif op == "subscribe":
             # If we get successful spot subscription, notify user
-            if message.get("success") is not None and message.get("success") == "true":
+            if message.get("success") == "true":
                 logger.debug(f"Subscription successful.")
 
-
-        else:  # Standard topic push
-                if message.get('topic') is not None and self.callback_directory.get(message.get('topic')) is not None:
-                    callback_function = self.callback_directory[message['topic'] ]
-                    callback_function(message)
-
     def _set_callback(self, topic, callback_function):
         self.callback_directory[topic] = callback_function
+        if self.dispatcher is not None:
+            self._routes[topic] = functools.partial(
+                self.dispatcher.submit, topic, callback_function)
+        else:
+            self._routes[topic] = callback_function
 
     def _get_callback(self, topic):
         return self.callback_directory[topic]
 
     def _pop_callback(self, topic):
         self.callback_directory.pop(topic)
+        self._routes.pop(topic, None)
 
     def _check_callback_directory(self, topics):
         for topic in topics:
@@ -324,7 +458,8 @@ def _find_index(source, target, key):
 
 
 def _make_public_kwargs(private_kwargs):
-    public_kwargs = copy.deepcopy(private_kwargs)
+    # A shallow copy, so that both connections share the callbacks and dispatcher passed in.
+    public_kwargs = dict(private_kwargs)
     public_kwargs.pop("api_key_credentials", "")
     return public_kwargs
 
@@ -0,0 +1,25 @@
+import random
+
+
+class Backoff:
+    """
+    Jittered exponential backoff. The n-th delay (from 0) is drawn uniformly from the upper
+    half of min(maximum, initial * factor ** n), so that clients dropped together do not
+    reconnect in lockstep, and the first retry comes after at most initial seconds.
+    """
+
+    def __init__(self, initial=0.05, maximum=30.0, factor=2.0, random=random.random):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.attempts = 0
+        self._random = random
+
+    def next(self):
+        """Returns the next delay in seconds and counts an attempt."""
+        cap = min(self.maximum, self.initial * self.factor ** min(self.attempts, 64))
+        self.attempts += 1
+        return cap / 2 * (1 + self._random())
+
+    def reset(self):
+        self.attempts = 0
@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+CONFIG_CACHE_FORMAT = 1
+
+
+def config_hash(response):
+    """Returns the SHA-256 of the canonical JSON of a configs response."""
+    return hashlib.sha256(
+        json.dumps(response, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+
+class ConfigCache:
+    """
+    Keeps the symbol configs of a client in a local file, so that a process can sign orders
+    right after it starts instead of waiting for configs_v2() (or configs()):
+
+        cache = ConfigCache(client, 'apex_configs.json', refresh_interval=600)
+        cache.load()   # from the file, or from the API if there is no usable file
+        cache.start()  # refresh in a daemon thread
+
+    The file holds the last good response with its fetch time and content hash, and is
+    replaced atomically. Each refresh applies the new configs to the client, swapping its
+    configs and lookup indexes in one step, then saves them.
+
+    :param client: HttpPublic-based client.
+    :param filename: Path of the cache file.
+    :param refresh_interval: Seconds between refreshes of the background thread or task.
+    :param max_age: Seconds after which the file is too old to be loaded (None: any age).
+    :param version: 2 for configs_v2(), 1 for configs().
+    """
+
+    def __init__(self, client, filename, refresh_interval=3600, max_age=None, version=2):
+        self.client = client
+        self.filename = filename
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.version = version
+        self.fetched_at = None
+        self.hash = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _store(self, response):
+        if self.version == 2:
+            return self.client._store_configs_v2(response)
+        return self.client._store_configs(response)
+
+    def _fetch(self):
+        if self.version == 2:
+            return self.client.configs_v2
+        return self.client.configs
+
+    def read(self):
+        """
+        Returns the cached response, or None if the file is missing, unreadable, stale, for
+        another endpoint or version, or fails its hash check.
+        """
+        try:
+            with open(self.filename) as f:
+                cached = json.load(f)
+            if (cached.get('format') != CONFIG_CACHE_FORMAT or
+                    cached.get('endpoint') != self.client.endpoint or
+                    cached.get('version') != self.version):
+                return None
+            if self.max_age is not None and time.time() - cached['fetchedAt'] > self.max_age:
+                return None
+            if config_hash(cached['response']) != cached['sha256']:
+                return None
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+        self.fetched_at = cached['fetchedAt']
+        self.hash = cached['sha256']
+        return cached['response']
+
+    def write(self, response, response_hash=None):
+        """
+        Atomically writes response to the cache file. Returns False if it could not be written,
+        in which case the client keeps working from memory.
+        """
+        cached = {
+            'format': CONFIG_CACHE_FORMAT,
+            'endpoint': self.client.endpoint,
+            'version': self.version,
+            'fetchedAt': time.time(),
+            'sha256': response_hash or config_hash(response),
+            'response': response,
+        }
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        try:
+            fd, tmp_name = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+        except OSError:
+            return False
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(cached, f)
+            os.chmod(tmp_name, 0o644)
+            os.replace(tmp_name, self.filename)
+        except OSError:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            return False
+        self.fetched_at = cached['fetchedAt']
+        return True
+
+    def _update(self, response):
+        """Saves the response that was just fetched and applied. Returns it."""
+        self.hash = config_hash(response)
+        self.write(response, self.hash)
+        return response
+
+    def load(self):
+        """
+        Applies the cached configs to the client, or fetches, applies and saves them if there is
+        no usable cache file. Returns the configs response.
+        """
+        response = self.read()
+        if response is not None:
+            return self._store(response)
+        return self.refresh()
+
+    def refresh(self):
+        """Fetches, applies and saves the configs."""
+        response = self._fetch()()
+        return self._update(response)
+
+    async def load_async(self):
+        """load() for the async clients."""
+        response = self.read()
+        if response is not None:
+            return self._store(response)
+        return await self.refresh_async()
+
+    async def refresh_async(self):
+        """refresh() for the async clients."""
+        response = await self._fetch()()
+        return self._update(response)
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                self.client.logger.error(f'Config refresh failed: {e}')
+
+    def start(self):
+        """Starts refreshing the configs every refresh_interval seconds in a daemon thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='apexpro-config-refresh', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops the refresh thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def run_async(self):
+        """Refreshes the configs every refresh_interval seconds, until cancelled."""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh_async()
+            except Exception as e:
+                self.client.logger.error(f'Config refresh failed: {e}')
@@ -0,0 +1,206 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TickerState:
+    """Latest fields of an instrumentInfo.H.<symbol> ticker, merged from snapshots and deltas."""
+
+    def __init__(self, topic):
+        self.topic = topic
+        self.data = {}
+
+    def update(self, message):
+        data = message.get('data') or {}
+        if message.get('type') == 'snapshot':
+            changed = data != self.data
+            self.data = dict(data)
+            return changed
+        changed = any(self.data.get(key) != value for key, value in data.items())
+        self.data.update(data)
+        return changed
+
+    def latest(self):
+        return {'topic': self.topic, 'type': 'snapshot', 'data': dict(self.data)}
+
+    def take(self):
+        return self.latest()
+
+
+class AllTickerState:
+    """
+    Latest fields of every symbol of instrumentInfo.all. take() only returns the symbols whose
+    fields changed since the previous take().
+    """
+
+    def __init__(self, topic):
+        self.topic = topic
+        self.data = {}
+        self.changed = set()
+
+    def update(self, message):
+        entries = message.get('data') or []
+        if isinstance(entries, dict):
+            entries = [entries]
+        changed = False
+        for entry in entries:
+            symbol = entry.get('s', entry.get('symbol'))
+            state = self.data.setdefault(symbol, {})
+            if any(state.get(key) != value for key, value in entry.items()):
+                state.update(entry)
+                self.changed.add(symbol)
+                changed = True
+        return changed
+
+    def latest(self):
+        return {'topic': self.topic, 'type': 'snapshot',
+                'data': [dict(self.data[symbol]) for symbol in sorted(self.data)]}
+
+    def take(self):
+        data = [dict(self.data[symbol]) for symbol in sorted(self.changed)]
+        self.changed.clear()
+        return {'topic': self.topic, 'type': 'delta', 'data': data}
+
+
+class DepthState:
+    """The OrderBook of an orderBook<limit>.H.<symbol> topic, delivered as a full snapshot."""
+
+    def __init__(self, topic, book=None):
+        self.topic = topic
+        self.book = book
+
+    def update(self, book):
+        self.book = book
+        return True
+
+    def latest(self):
+        data = self.book.snapshot() if self.book is not None else None
+        return {'topic': self.topic, 'type': 'snapshot', 'data': data}
+
+    def take(self):
+        return self.latest()
+
+
+class _Entry:
+    def __init__(self, topic, state, callback, interval):
+        self.topic = topic
+        self.state = state
+        self.callback = callback
+        self.interval = interval
+        self.dirty = False
+        self.scheduled = False
+        self.last = float('-inf')
+
+
+class Conflator:
+    """
+    Merges the messages of a topic into its latest state (see TickerState, AllTickerState and
+    DepthState), and passes that state to the callback of the topic at most once per interval,
+    from a background thread. Topics registered without an interval are only delivered by
+    flush(), when the consumer asks for them; latest() returns the state without delivering it.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.updates = 0
+        self.delivered = 0
+        self._entries = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def register(self, topic, state, callback, interval=None):
+        with self._condition:
+            self._entries[topic] = _Entry(topic, state, callback, interval)
+
+    def update(self, topic, message):
+        """Merges message into the state of topic, and schedules its delivery if it changed."""
+        entry = self._entries.get(topic)
+        if entry is None:
+            return
+        with self._condition:
+            self.updates += 1
+            if not entry.state.update(message):
+                return
+            entry.dirty = True
+            if entry.interval is None or entry.scheduled:
+                return
+            entry.scheduled = True
+            due = max(self.clock(), entry.last + entry.interval)
+            heapq.heappush(self._heap, (due, next(self._counter), entry))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='apexpro-conflator', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _take(self, entry):
+        """The message to deliver for entry, or None. Called with the condition held."""
+        if not entry.dirty:
+            return None
+        entry.dirty = False
+        entry.last = self.clock()
+        self.delivered += 1
+        return entry.state.take()
+
+    def _run(self):
+        while True:
+            due_entries = []
+            with self._condition:
+                while not self._closed:
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    delay = self._heap[0][0] - self.clock()
+                    if delay > 0:
+                        self._condition.wait(delay)
+                        continue
+                    while self._heap and self._heap[0][0] <= self.clock():
+                        entry = heapq.heappop(self._heap)[2]
+                        entry.scheduled = False
+                        message = self._take(entry)
+                        if message is not None:
+                            due_entries.append((entry.callback, message))
+                    break
+                if self._closed:
+                    return
+            self._deliver(due_entries)
+
+    @staticmethod
+    def _deliver(messages):
+        for callback, message in messages:
+            try:
+                callback(message)
+            except Exception:
+                logger.exception('Conflated callback failed.')
+
+    def flush(self, topic=None):
+        """
+        Delivers the pending state of topic (or of every topic) now, on the calling thread.
+        Unknown topics are ignored.
+        """
+        with self._condition:
+            if topic is None:
+                entries = list(self._entries.values())
+            else:
+                entries = [self._entries[topic]] if topic in self._entries else []
+            messages = [(entry.callback, self._take(entry)) for entry in entries]
+        self._deliver([(callback, message) for callback, message in messages
+                       if message is not None])
+
+    def latest(self, topic):
+        """The merged state of topic, without delivering it, or None for an unknown topic."""
+        with self._condition:
+            entry = self._entries.get(topic)
+            return entry.state.latest() if entry is not None else None
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
@@ -0,0 +1,45 @@
+"""
+JSON decoders for WebSocket frames. A decoder takes a frame as str or bytes and returns the
+parsed message. The json module is the default. orjson and msgspec, when installed, parse bytes
+directly and are several times faster, but do not parse exactly like it (orjson rejects integers
+wider than 64 bits), so they are only used when asked for with decoder='orjson' or 'msgspec'.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def json_decoder(frame):
+    return json.loads(frame)
+
+
+DECODERS = {'json': json_decoder}
+
+if orjson is not None:
+    DECODERS['orjson'] = orjson.loads
+
+if msgspec is not None:
+    DECODERS['msgspec'] = msgspec.json.Decoder().decode
+
+
+def get_decoder(decoder=None):
+    """
+    Returns the decoder named decoder ('json', 'orjson' or 'msgspec'), or decoder itself if it
+    is callable. Defaults to json.
+    """
+    if callable(decoder):
+        return decoder
+    if decoder is None:
+        return json_decoder
+    if decoder not in DECODERS:
+        raise ValueError('decoder must be a callable or one of %s, not %r (is it installed?)'
+                         % (sorted(DECODERS), decoder))
+    return DECODERS[decoder]
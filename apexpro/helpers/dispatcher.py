@@ -0,0 +1,174 @@
+import collections
+import logging
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# What Dispatcher.submit does when the queue of a shard is full.
+OVERFLOW_BLOCK = 'block'
+OVERFLOW_DROP_OLDEST = 'drop_oldest'
+OVERFLOW_CONFLATE = 'conflate'
+
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_CONFLATE)
+
+
+class _Shard:
+    def __init__(self):
+        self.queue = collections.deque()
+        # Queued entries by topic, for conflation.
+        self.pending = {}
+        self.condition = threading.Condition()
+        self.max_depth = 0
+        self.thread = None
+
+
+class Dispatcher:
+    """
+    Runs WebSocket callbacks on worker threads, so that the receive loop does not wait for user
+    code. Topics are sharded over the workers by a hash of their name, so the messages of a
+    topic are handled one at a time and in order, and a slow callback only delays the topics of
+    its shard.
+
+    Each shard queues at most maxsize messages. When it is full, overflow decides what submit
+    does:
+
+    - 'block': wait for room. This keeps every message but stalls the receive loop, so it only
+      suits callbacks that are slow in bursts.
+    - 'drop_oldest': drop the oldest queued message of the shard.
+    - 'conflate': keep one queued message per topic, replacing it with the latest one (at any
+      queue depth); the oldest message is dropped if the shard is full of distinct topics. Meant
+      for topics whose messages are full states, like tickers. Dropped or replaced order book
+      deltas make WebSocket.order_book_stream() resubscribe for a new snapshot.
+
+    Pass it to WebSocket(dispatcher=...) to use it for every stream of the client, and call
+    close() when done. Callbacks are called as plain functions, so it is not meant for the
+    coroutine callbacks of WebSocketAsync.
+
+    :param workers: Number of worker threads (and shards).
+    :param maxsize: Maximum number of queued messages per shard.
+    :param overflow: One of OVERFLOW_POLICIES.
+    """
+
+    def __init__(self, workers=4, maxsize=10000, overflow=OVERFLOW_DROP_OLDEST,
+                 clock=time.monotonic):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError('overflow must be one of %s' % (OVERFLOW_POLICIES,))
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.clock = clock
+        self._closed = False
+        self._lock = threading.Lock()
+        self._dispatched = 0
+        self._dropped = 0
+        self._conflated = 0
+        self._lag_sum = 0.0
+        self._lag_max = 0.0
+        self._topic_lag = {}
+        self._shards = [_Shard() for _ in range(workers)]
+        for i, shard in enumerate(self._shards):
+            shard.thread = threading.Thread(
+                target=self._work, args=(shard,), name='apexpro-dispatch-%d' % i, daemon=True)
+            shard.thread.start()
+
+    def shard(self, topic):
+        return self._shards[zlib.crc32(topic.encode()) % len(self._shards)]
+
+    def submit(self, topic, callback, message):
+        """Queues callback(message) on the worker of topic."""
+        shard = self.shard(topic)
+        entry = [self.clock(), topic, callback, message]
+        with shard.condition:
+            if self._closed:
+                return
+            if self.overflow == OVERFLOW_CONFLATE:
+                queued = shard.pending.get(topic)
+                if queued is not None:
+                    # Keeps its place in the queue, and the time of the older message for lag.
+                    queued[2:] = entry[2:]
+                    self._count('_conflated')
+                    return
+            while len(shard.queue) >= self.maxsize:
+                if self.overflow == OVERFLOW_BLOCK:
+                    shard.condition.wait()
+                    if self._closed:
+                        return
+                else:
+                    dropped = shard.queue.popleft()
+                    shard.pending.pop(dropped[1], None)
+                    self._count('_dropped')
+            shard.queue.append(entry)
+            if self.overflow == OVERFLOW_CONFLATE:
+                shard.pending[topic] = entry
+            if len(shard.queue) > shard.max_depth:
+                shard.max_depth = len(shard.queue)
+            shard.condition.notify_all()
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _work(self, shard):
+        while True:
+            with shard.condition:
+                while not shard.queue and not self._closed:
+                    shard.condition.wait()
+                if not shard.queue:
+                    return
+                entry = shard.queue.popleft()
+                if shard.pending.get(entry[1]) is entry:
+                    del shard.pending[entry[1]]
+                # Wakes a submit blocked on a full queue.
+                shard.condition.notify_all()
+            queued_at, topic, callback, message = entry
+            lag = self.clock() - queued_at
+            with self._lock:
+                self._dispatched += 1
+                self._lag_sum += lag
+                self._lag_max = max(self._lag_max, lag)
+                self._topic_lag[topic] = lag
+            try:
+                callback(message)
+            except Exception:
+                logger.exception('WebSocket callback failed.')
+
+    def metrics(self):
+        """
+        Returns a snapshot of the dispatcher: current queue depth by shard, maximum queue depth,
+        dispatched, dropped and conflated messages, and the lag in seconds between receiving a
+        message and calling its callback (last by topic, maximum and mean).
+        """
+        with self._lock:
+            dispatched = self._dispatched
+            return {
+                'queue_depth': [len(shard.queue) for shard in self._shards],
+                'max_queue_depth': max(shard.max_depth for shard in self._shards),
+                'dispatched': dispatched,
+                'dropped': self._dropped,
+                'conflated': self._conflated,
+                'lag': {
+                    'max': self._lag_max,
+                    'mean': self._lag_sum / dispatched if dispatched else 0.0,
+                    'by_topic': dict(self._topic_lag),
+                },
+            }
+
+    def close(self, timeout=None):
+        """
+        Stops the workers once they have handled the queued messages. Messages submitted after
+        close are ignored.
+        """
+        for shard in self._shards:
+            with shard.condition:
+                self._closed = True
+                shard.condition.notify_all()
+        for shard in self._shards:
+            if shard.thread is not threading.current_thread():
+                shard.thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,179 @@
+import threading
+import time
+
+# Phases of a request that are timed.
+PHASE_SIGN = 'sign'        # STARK signature of orders, withdrawals and transfers.
+PHASE_FEE = 'fee'          # Decimal fee and rounding math of orders.
+PHASE_HMAC = 'hmac'        # API key signature of private requests.
+PHASE_NETWORK = 'network'  # HTTP round trip, up to the body being received.
+PHASE_DECODE = 'decode'    # JSON decoding of the response.
+
+SNAPSHOT_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class Instrumentation:
+    """
+    Receives the duration of the phases of each request. Subclass it to export timings
+    elsewhere, and pass an instance to a client as instrumentation.
+    """
+
+    def record(self, endpoint, phase, seconds):
+        raise NotImplementedError
+
+
+class Histogram:
+    """
+    Log-linear histogram of durations in nanoseconds, in the manner of HdrHistogram: values
+    below 2 ** significant_bits are counted exactly, larger ones in buckets of relative width
+    2 ** (1 - significant_bits), i.e. below 1% error with the default 8 bits. Recording is a
+    couple of integer operations and a dict update.
+    """
+
+    def __init__(self, significant_bits=8):
+        self.significant_bits = significant_bits
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        shift = value.bit_length() - self.significant_bits
+        if shift <= 0:
+            return value
+        return (shift << self.significant_bits) + (value >> shift)
+
+    def _value(self, index):
+        """Returns the highest value counted in the bucket of index."""
+        shift = index >> self.significant_bits
+        if shift == 0:
+            return index
+        return (((index & ((1 << self.significant_bits) - 1)) + 1) << shift) - 1
+
+    def record(self, value):
+        value = int(value)
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, percentile):
+        """Returns the value at percentile (0-100), within the bucket precision."""
+        if not self.count:
+            return 0
+        rank = max(1, int(self.count * percentile / 100.0 + 0.5))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._value(index), self.max)
+        return self.max
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def summary(self, percentiles=SNAPSHOT_PERCENTILES):
+        """Returns count, mean, min, max and percentiles, in microseconds."""
+        summary = {
+            'count': self.count,
+            'mean_us': self.total / self.count / 1e3 if self.count else 0.0,
+            'min_us': (self.min or 0) / 1e3,
+            'max_us': (self.max or 0) / 1e3,
+        }
+        for percentile in percentiles:
+            summary['p%s_us' % percentile] = self.percentile(percentile) / 1e3
+        return summary
+
+
+class HistogramCollector(Instrumentation):
+    """
+    Built-in Instrumentation keeping one Histogram per endpoint and phase:
+
+        collector = HistogramCollector()
+        client = HttpPrivateStark(..., instrumentation=collector)
+        ...
+        collector.snapshot()['create-order']['sign']['p99_us']
+    """
+
+    def __init__(self, significant_bits=8):
+        self.significant_bits = significant_bits
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, phase, seconds):
+        key = (endpoint, phase)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.significant_bits)
+            histogram.record(seconds * 1e9)
+
+    def histograms(self):
+        """Returns a copy of the histograms, by (endpoint, phase)."""
+        with self._lock:
+            copies = {}
+            for key, histogram in self._histograms.items():
+                copies[key] = Histogram(self.significant_bits)
+                copies[key].merge(histogram)
+            return copies
+
+    def snapshot(self, percentiles=SNAPSHOT_PERCENTILES):
+        """Returns the summary of every histogram, as {endpoint: {phase: summary}}."""
+        snapshot = {}
+        for (endpoint, phase), histogram in sorted(self.histograms().items()):
+            snapshot.setdefault(endpoint, {})[phase] = histogram.summary(percentiles)
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+class _Phase:
+    """Context manager timing one phase of a request."""
+    __slots__ = ('instrumentation', 'endpoint', 'phase', 'started')
+
+    def __init__(self, instrumentation, endpoint, phase):
+        self.instrumentation = instrumentation
+        self.endpoint = endpoint
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instrumentation.record(
+            self.endpoint, self.phase, time.perf_counter() - self.started)
+
+
+class _NoPhase:
+    """Context manager doing nothing, used while instrumentation is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NO_PHASE = _NoPhase()
+
+
+def phase(instrumentation, endpoint, phase):
+    """Returns a context manager timing a phase into instrumentation, if it is not None."""
+    if instrumentation is None:
+        return NO_PHASE
+    return _Phase(instrumentation, endpoint, phase)
@@ -0,0 +1,207 @@
+import asyncio
+import collections
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime as dt
+
+from apexpro.exceptions import InvalidRequestError
+
+DEFAULT_PAGE_LIMIT = 100
+DEFAULT_PREFETCH = 4
+
+# Key of the row list in the 'data' of the paginated endpoints, by client method name. Other
+# endpoints are handled too, using the first list found in 'data'.
+ROWS_KEYS = {
+    'history_orders': 'orders',
+    'history_orders_v2': 'orders',
+    'fills': 'orders',
+    'fills_v2': 'orders',
+    'funding': 'fundingValues',
+    'funding_v2': 'fundingValues',
+    'transfers': 'transfers',
+    'transfers_v2': 'transfers',
+    'withdraw_list': 'transfers',
+    'withdraw_list_v2': 'transfers',
+    'historical_pnl': 'historicalPnl',
+    'historical_pnl_v2': 'historicalPnl',
+}
+
+
+class RateLimiter:
+    """
+    Spaces out calls so that at most max_per_second of them start per second, across threads.
+    """
+
+    def __init__(self, max_per_second):
+        self.interval = 1.0 / max_per_second
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Books the next slot and returns how many seconds to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+            return start - now
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class _Pages:
+    """Page bookkeeping shared by iter_rows and aiter_rows."""
+
+    def __init__(self, fetch, rows_key, limit, start_page, id_key):
+        self.name = getattr(fetch, '__name__', None)
+        self.rows_key = rows_key or ROWS_KEYS.get(self.name)
+        self.limit = limit
+        self.next_page = start_page
+        self.start_page = start_page
+        self.last_page = None
+        self.id_key = id_key
+        self.previous_ids = set()
+        self.done = False
+
+    def has_next(self):
+        return not self.done and (self.last_page is None or self.next_page <= self.last_page)
+
+    def take_next(self):
+        page = self.next_page
+        self.next_page += 1
+        return page
+
+    def rows(self, response):
+        """
+        Returns the new rows of a page, skipping those already seen on the previous page (rows
+        shift across page boundaries when new records arrive while paging).
+        """
+        data = response.get('data') if isinstance(response, dict) else None
+        if not isinstance(data, dict):
+            raise InvalidRequestError(
+                request=f'{self.name}: limit={self.limit}',
+                message=str(response.get('msg', 'No data in response.')
+                            if isinstance(response, dict) else response),
+                status_code=response.get('code') if isinstance(response, dict) else None,
+                time=dt.utcnow().strftime("%H:%M:%S")
+            )
+        rows_key = self.rows_key
+        if rows_key is None:
+            rows_key = next((k for k, v in data.items() if isinstance(v, list)), None)
+        rows = data.get(rows_key) or []
+
+        total = data.get('totalSize')
+        if total is not None:
+            self.last_page = self.start_page + math.ceil(int(total) / self.limit) - 1
+        if len(rows) < self.limit:
+            self.done = True
+
+        new_rows = []
+        ids = set()
+        for row in rows:
+            row_id = row.get(self.id_key) if isinstance(row, dict) else None
+            if row_id is not None:
+                if row_id in self.previous_ids:
+                    continue
+                ids.add(row_id)
+            new_rows.append(row)
+        self.previous_ids = ids
+        return new_rows
+
+
+def iter_rows(
+        fetch,
+        rows_key=None,
+        limit=DEFAULT_PAGE_LIMIT,
+        prefetch=DEFAULT_PREFETCH,
+        max_requests_per_second=None,
+        id_key='id',
+        start_page=0,
+        **params
+):
+    """
+    Yields every row of a paginated endpoint, page after page, e.g.
+    iter_rows(client.fills_v2, symbol='BTC-USDC', beginTimeInclusive=begin,
+              endTimeExclusive=end)
+
+    Up to prefetch pages are requested concurrently ahead of the one being consumed, so only
+    those pages are held in memory. Iteration stops at the first short page, or after the
+    totalSize reported by the endpoint.
+
+    :param fetch: Client method returning one page, called with limit, page and params.
+    :param rows_key: Key of the rows in the page 'data', see ROWS_KEYS.
+    :param limit: Rows per page.
+    :param prefetch: Number of pages requested concurrently.
+    :param max_requests_per_second: Rate budget of the page requests.
+    :param id_key: Row field used to drop duplicates at page boundaries.
+    """
+    pages = _Pages(fetch, rows_key, limit, start_page, id_key)
+    limiter = RateLimiter(max_requests_per_second) if max_requests_per_second else None
+
+    def fetch_page(page):
+        if limiter is not None:
+            limiter.acquire()
+        return fetch(limit=limit, page=page, **params)
+
+    with ThreadPoolExecutor(max_workers=prefetch) as executor:
+        pending = collections.deque()
+        try:
+            while True:
+                while len(pending) < prefetch and pages.has_next():
+                    pending.append(executor.submit(fetch_page, pages.take_next()))
+                if not pending:
+                    return
+                for row in pages.rows(pending.popleft().result()):
+                    yield row
+                if pages.done:
+                    return
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def aiter_rows(
+        fetch,
+        rows_key=None,
+        limit=DEFAULT_PAGE_LIMIT,
+        prefetch=DEFAULT_PREFETCH,
+        max_requests_per_second=None,
+        id_key='id',
+        start_page=0,
+        **params
+):
+    """
+    Async version of iter_rows, for the methods of the apexpro.http_async clients:
+    async for fill in aiter_rows(client.fills_v2, symbol='BTC-USDC'): ...
+    """
+    pages = _Pages(fetch, rows_key, limit, start_page, id_key)
+    limiter = RateLimiter(max_requests_per_second) if max_requests_per_second else None
+
+    async def fetch_page(page):
+        if limiter is not None:
+            await limiter.acquire_async()
+        return await fetch(limit=limit, page=page, **params)
+
+    pending = collections.deque()
+    try:
+        while True:
+            while len(pending) < prefetch and pages.has_next():
+                pending.append(asyncio.ensure_future(fetch_page(pages.take_next())))
+            if not pending:
+                return
+            for row in pages.rows(await pending.popleft()):
+                yield row
+            if pages.done:
+                return
+    finally:
+        for task in pending:
+            task.cancel()
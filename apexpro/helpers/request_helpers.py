@@ -4,12 +4,6 @@ import time
 from datetime import datetime
 
 import dateutil.parser as dp
-from web3 import Web3
-
-from apexpro.eth_signing.util import strip_hex_prefix
-from apexpro.starkex.helpers import serialize_signature, deserialize_signature, int_to_hex_32
-from apexpro.starkex.starkex_resources.proxy import sign, verify, get_hash
-from apexpro.starkex.starkex_resources.python_signature import inv_mod_curve_size
 
 
 def generate_query_path(url, params):
@@ -62,6 +56,9 @@ def remove_nones(original):
 
 
 def calc_bind_owner_key_sig_hash(star_key_hex, owner_key):
+    from web3 import Web3
+    from apexpro.eth_signing.util import strip_hex_prefix
+
     data_bytes = "UserRegistration:"
     owner_key_bytes = bytes.fromhex(strip_hex_prefix(owner_key))
     data = Web3.solidityKeccak(
@@ -82,6 +79,9 @@ def calc_bind_owner_key_sig_hash(star_key_hex, owner_key):
 
 def starkex_sign(hash, private_key_hex):
     """Sign the hash of the object using the given private key."""
+    from apexpro.starkex.helpers import serialize_signature, int_to_hex_32
+    from apexpro.starkex.starkex_resources.proxy import sign
+
     EC_ORDER = 3618502788666131213697322783095070105526743751716087489154079457884512865583
     hash_mod = int(hash.hex(), 16) % EC_ORDER
     print("hash_mod:" + int_to_hex_32(hash_mod))
@@ -89,6 +89,9 @@ def starkex_sign(hash, private_key_hex):
     return serialize_signature(r, s)
 
 def starkex_verify(hash, sign, pub_key):
+    from apexpro.starkex.helpers import deserialize_signature
+    from apexpro.starkex.starkex_resources.proxy import verify
+
     EC_ORDER = 3618502788666131213697322783095070105526743751716087489154079457884512865583
     hash_mod = int(hash.hex(), 16) % EC_ORDER
     r, s = deserialize_signature(sign)
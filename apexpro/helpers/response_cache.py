@@ -0,0 +1,202 @@
+import asyncio
+import collections
+import threading
+import time
+from concurrent.futures import Future
+
+from apexpro.helpers.scheduler import endpoint_name
+
+
+class _FetchCancelled(Exception):
+    """Set on an in-flight async request whose fetch was cancelled, for its followers to retry."""
+
+
+def is_error_response(response):
+    """Whether response is an API error, e.g. {'code': 20016, 'msg': '...'}."""
+    return isinstance(response, dict) and response.get('code') not in (None, 0, '0')
+
+
+class ResponseCache:
+    """
+    Response layer for the GET requests of a client, opt-in through its response_cache
+    parameter:
+
+    - Single-flight: identical GET requests (same path, params and API key) made while one is
+      in flight wait for its response instead of going out again.
+    - Short-TTL LRU cache of the responses, keyed the same way.
+    - Any POST made with an API key invalidates the cached and in-flight GETs of that key, so
+      account state is fresh after orders, cancels, withdrawals, etc.
+
+    Cached responses are shared between callers, so treat them as read-only. One cache can be
+    shared by several clients.
+
+    :param ttl: Seconds a response is served from the cache; 0 only coalesces requests.
+    :param maxsize: Maximum number of cached responses.
+    :param ttls: TTL of particular endpoints, by endpoint name, e.g. {'depth': 0.2}.
+    :param error_ttl: Seconds an API error response is served from the cache, by default 0,
+        i.e. errors are only shared with the requests coalesced with them.
+    """
+
+    def __init__(self, ttl=1.0, maxsize=1024, ttls=None, error_ttl=0.0, clock=time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.ttls = ttls or {}
+        self.error_ttl = error_ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._inflight = {}
+        self._async_inflight = {}
+        self._generation = collections.defaultdict(int)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(path, query=None, headers=None):
+        """Returns the cache key of a request: its API key, path and params."""
+        api_key = headers.get('APEX-API-KEY') if headers else None
+        params = tuple(sorted(
+            (k, str(v)) for k, v in (query or {}).items() if v is not None))
+        return api_key, path, params
+
+    def _lookup(self, key):
+        """Returns the fresh cached response of key, or None. Called with the lock held."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, response = entry
+        if self.clock() >= expires:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def _store(self, key, generation, response):
+        """Caches response unless key was invalidated since its request went out."""
+        ttl = self.ttls.get(endpoint_name(key[1]), self.ttl)
+        if is_error_response(response):
+            ttl = min(ttl, self.error_ttl)
+        with self._lock:
+            if ttl <= 0 or self._generation[key[0]] != generation:
+                return
+            self._entries[key] = (self.clock() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, key, fetch):
+        """
+        Returns the response of key, from the cache, from the identical request in flight, or
+        else from fetch(), which is called without the lock held.
+        """
+        with self._lock:
+            response = self._lookup(key)
+            if response is not None:
+                return response
+            waiting = self._inflight.get(key)
+            if waiting is not None:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+                generation = self._generation[key[0]]
+                future = self._inflight[key] = Future()
+        if waiting is not None:
+            return waiting.result()
+
+        try:
+            response = fetch()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(response)
+            self._store(key, generation, response)
+            return response
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    async def get_async(self, key, fetch):
+        """
+        Async version of get, where fetch() returns an awaitable. Requests are coalesced per
+        event loop. When the caller whose fetch() is in flight is cancelled, the requests
+        coalesced with it start over, and one of them fetches in its place.
+        """
+        loop = asyncio.get_running_loop()
+        inflight_key = (id(loop), key)
+        while True:
+            with self._lock:
+                response = self._lookup(key)
+                if response is not None:
+                    return response
+                waiting = self._async_inflight.get(inflight_key)
+                if waiting is not None:
+                    self.coalesced += 1
+                else:
+                    self.misses += 1
+                    generation = self._generation[key[0]]
+                    future = self._async_inflight[inflight_key] = loop.create_future()
+            if waiting is None:
+                break
+            try:
+                return await asyncio.shield(waiting)
+            except _FetchCancelled:
+                continue
+
+        try:
+            response = await fetch()
+        except asyncio.CancelledError:
+            future.set_exception(_FetchCancelled())
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting for it.
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+            self._store(key, generation, response)
+            return response
+        finally:
+            with self._lock:
+                if self._async_inflight.get(inflight_key) is future:
+                    del self._async_inflight[inflight_key]
+
+    def invalidate(self, api_key=None):
+        """
+        Drops the cached responses of api_key, or all of them if api_key is None. Requests then
+        in flight no longer take new callers, and their responses are not cached.
+        """
+        with self._lock:
+            self.invalidations += 1
+            if api_key is None:
+                self._entries.clear()
+                self._inflight.clear()
+                self._async_inflight.clear()
+                for k in list(self._generation):
+                    self._generation[k] += 1
+                return
+            self._generation[api_key] += 1
+            for key in [key for key in self._entries if key[0] == api_key]:
+                del self._entries[key]
+            for key in [key for key in self._inflight if key[0] == api_key]:
+                del self._inflight[key]
+            for key in [key for key in self._async_inflight if key[1][0] == api_key]:
+                del self._async_inflight[key]
+
+    def stats(self):
+        """Returns the hit, miss, coalesce and invalidation counters and the cache size."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'in_flight': len(self._inflight) + len(self._async_inflight),
+            }
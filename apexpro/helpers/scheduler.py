@@ -0,0 +1,255 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime as dt
+
+from apexpro.exceptions import FailedRequestError
+
+# Priority classes, served in this order when requests queue for the rate budget.
+PRIORITY_CANCEL = 0
+PRIORITY_CREATE = 1
+PRIORITY_ACCOUNT = 2
+PRIORITY_HISTORY = 3
+
+PRIORITY_NAMES = {
+    PRIORITY_CANCEL: 'cancel',
+    PRIORITY_CREATE: 'create',
+    PRIORITY_ACCOUNT: 'account',
+    PRIORITY_HISTORY: 'history',
+}
+
+# Priority class of the endpoints, by the last segment of their path. Endpoints not listed
+# here are in PRIORITY_ACCOUNT.
+ENDPOINT_PRIORITIES = {
+    'delete-order': PRIORITY_CANCEL,
+    'delete-client-order-id': PRIORITY_CANCEL,
+    'delete-open-orders': PRIORITY_CANCEL,
+    'create-order': PRIORITY_CREATE,
+    'create-withdrawal-to-address': PRIORITY_CREATE,
+    'cross-chain-withdraw': PRIORITY_CREATE,
+    'fast-withdraw': PRIORITY_CREATE,
+    'fills': PRIORITY_HISTORY,
+    'funding': PRIORITY_HISTORY,
+    'historical-pnl': PRIORITY_HISTORY,
+    'history-funding': PRIORITY_HISTORY,
+    'history-orders': PRIORITY_HISTORY,
+    'history-value': PRIORITY_HISTORY,
+    'klines': PRIORITY_HISTORY,
+    'order-fills': PRIORITY_HISTORY,
+    'trades': PRIORITY_HISTORY,
+    'transfers': PRIORITY_HISTORY,
+    'withdraw-list': PRIORITY_HISTORY,
+    'yesterday-pnl': PRIORITY_HISTORY,
+}
+
+
+def endpoint_name(path):
+    """Returns the last segment of a request path or URL, e.g. 'delete-order'."""
+    return path.split('?', 1)[0].rstrip('/').rsplit('/', 1)[-1]
+
+
+class TokenBucket:
+    """
+    Token bucket holding up to capacity tokens, refilled at rate tokens per second. Not thread
+    safe on its own; RequestScheduler guards it with its lock.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+
+    def refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return now
+
+    def delay(self, weight):
+        """Returns the seconds until weight tokens are available (0 if they are now)."""
+        self.refill()
+        missing = min(weight, self.capacity) - self.tokens
+        return max(missing, 0.0) / self.rate
+
+    def take(self, weight):
+        self.tokens -= min(weight, self.capacity)
+
+
+class _Ticket:
+    __slots__ = ('priority', 'seq', 'weight', 'enqueued', 'name')
+
+    def __init__(self, priority, seq, weight, enqueued, name):
+        self.priority = priority
+        self.seq = seq
+        self.weight = weight
+        self.enqueued = enqueued
+        self.name = name
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RequestScheduler:
+    """
+    Client-side rate limiter for the REST API. Each request takes its weight in tokens from a
+    token bucket before it is sent; when the bucket is empty, requests wait in a priority queue
+    and are released cancel first, then create, account and history requests, in arrival order
+    within a class. Pass it to a client as request_scheduler, and share one scheduler between
+    the clients of an account so they draw on the same budget.
+
+    :param rate: Tokens added per second, i.e. the sustained request rate for weight 1.
+    :param burst: Bucket capacity, i.e. the number of requests that may be sent at once.
+    :param weights: Token cost of the endpoints, by endpoint name (default 1).
+    :param priorities: Priority class of the endpoints, overriding ENDPOINT_PRIORITIES.
+    :param max_queue_time: Drop stale requests: seconds a request may wait for the budget before
+        it fails with a FailedRequestError (status 429). Either one value, or a dict by priority
+        class; None waits indefinitely.
+    """
+
+    def __init__(
+            self,
+            rate,
+            burst=None,
+            weights=None,
+            priorities=None,
+            max_queue_time=None,
+            clock=time.monotonic
+    ):
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.weights = weights or {}
+        self.priorities = dict(ENDPOINT_PRIORITIES, **(priorities or {}))
+        self.max_queue_time = max_queue_time
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._queue = []
+        self._seq = itertools.count()
+        self._depth = dict.fromkeys(PRIORITY_NAMES, 0)
+        self._max_depth = dict.fromkeys(PRIORITY_NAMES, 0)
+        self._dispatched = dict.fromkeys(PRIORITY_NAMES, 0)
+        self._dropped = dict.fromkeys(PRIORITY_NAMES, 0)
+        self._wait_time = dict.fromkeys(PRIORITY_NAMES, 0.0)
+
+    def classify(self, path):
+        """Returns the (priority, weight) of a request path."""
+        name = endpoint_name(path)
+        return self.priorities.get(name, PRIORITY_ACCOUNT), self.weights.get(name, 1)
+
+    def _deadline(self, ticket):
+        max_queue_time = self.max_queue_time
+        if isinstance(max_queue_time, dict):
+            max_queue_time = max_queue_time.get(ticket.priority)
+        if max_queue_time is None:
+            return None
+        return ticket.enqueued + max_queue_time
+
+    def _enqueue(self, path):
+        priority, weight = self.classify(path)
+        with self._lock:
+            ticket = _Ticket(priority, next(self._seq), weight, self.clock(), endpoint_name(path))
+            heapq.heappush(self._queue, ticket)
+            self._depth[priority] += 1
+            self._max_depth[priority] = max(self._max_depth[priority], self._depth[priority])
+            return ticket
+
+    def _remove(self, ticket):
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+        self._depth[ticket.priority] -= 1
+
+    def _abandon(self, ticket):
+        """
+        Takes ticket out of the queue when its waiter is cancelled or fails, so that it does not
+        hold up the requests behind it. Called with the lock held.
+        """
+        if ticket in self._queue:
+            self._remove(ticket)
+            self._condition.notify_all()
+
+    def _try_dispatch(self, ticket):
+        """
+        Dispatches ticket if it is first in line and its tokens are available, and returns 0.
+        Otherwise returns the seconds to wait before trying again, or raises if the ticket went
+        stale. Called with the lock held.
+        """
+        now = self.clock()
+        deadline = self._deadline(ticket)
+        if deadline is not None and now >= deadline:
+            self._remove(ticket)
+            self._dropped[ticket.priority] += 1
+            self._condition.notify_all()
+            raise FailedRequestError(
+                request=ticket.name,
+                message='Too Many Requests. Dropped stale request from the rate limit queue.',
+                status_code=429,
+                time=dt.utcnow().strftime("%H:%M:%S")
+            )
+        head = self._queue[0]
+        delay = self.bucket.delay(head.weight)
+        if head is ticket and delay == 0:
+            heapq.heappop(self._queue)
+            self.bucket.take(ticket.weight)
+            self._depth[ticket.priority] -= 1
+            self._dispatched[ticket.priority] += 1
+            self._wait_time[ticket.priority] += now - ticket.enqueued
+            self._condition.notify_all()
+            return 0
+        if head is not ticket:
+            # Wait for the requests ahead to go, as far as the bucket is concerned.
+            delay = max(delay, self.bucket.delay(head.weight + ticket.weight))
+        if deadline is not None:
+            delay = min(delay, deadline - now)
+        return max(delay, 1e-4)
+
+    def acquire(self, path):
+        """Blocks until the request to path may be sent."""
+        ticket = self._enqueue(path)
+        with self._condition:
+            try:
+                while True:
+                    delay = self._try_dispatch(ticket)
+                    if delay == 0:
+                        return
+                    self._condition.wait(delay)
+            except BaseException:
+                self._abandon(ticket)
+                raise
+
+    async def acquire_async(self, path):
+        """Waits, without blocking the event loop, until the request to path may be sent."""
+        ticket = self._enqueue(path)
+        try:
+            while True:
+                with self._lock:
+                    delay = self._try_dispatch(ticket)
+                if delay == 0:
+                    return
+                await asyncio.sleep(delay)
+        except BaseException:
+            with self._lock:
+                self._abandon(ticket)
+            raise
+
+    def metrics(self):
+        """
+        Returns a snapshot of the scheduler: current and maximum queue depth, dispatched and
+        dropped requests, and total seconds waited, by priority class, plus the available tokens.
+        """
+        with self._lock:
+            self.bucket.refill()
+
+            def by_name(values):
+                return {PRIORITY_NAMES[p]: v for p, v in values.items()}
+
+            return {
+                'queue_depth': by_name(self._depth),
+                'max_queue_depth': by_name(self._max_depth),
+                'dispatched': by_name(self._dispatched),
+                'dropped': by_name(self._dropped),
+                'wait_time': by_name(self._wait_time),
+                'tokens': self.bucket.tokens,
+            }
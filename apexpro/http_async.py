@@ -0,0 +1,251 @@
+import asyncio
+import functools
+import inspect
+import json
+
+import aiohttp
+
+from datetime import datetime as dt
+
+from apexpro.exceptions import FailedRequestError
+from apexpro.helpers.instrumentation import PHASE_DECODE, PHASE_NETWORK
+from apexpro.helpers.pagination import aiter_rows
+from apexpro.http_private import HttpPrivate
+from apexpro.http_private_stark_key_sign import HttpPrivateStark
+from apexpro.http_public import HttpPublic
+
+
+class _AsyncHTTP:
+    """
+    asyncio replacement for the requests-based transport of HTTP. Mixed into the HttpPublic,
+    HttpPrivate and HttpPrivateStark client family, so every endpoint method keeps its
+    signature but returns an awaitable, e.g. await client.depth(symbol='BTC-USDC').
+
+    All requests share one aiohttp session with a keep-alive connection pool, created on first
+    use inside the running event loop. Close it with await client.close(), or use the client
+    as an async context manager.
+
+    :param pool_size: Maximum number of simultaneous connections (0 for no limit).
+    :param pool_size_per_host: Maximum number of simultaneous connections per host.
+    :param keepalive_timeout: Seconds an idle connection is kept open for reuse.
+    :param connect_timeout: Seconds allowed to establish a connection, per request.
+
+    request_timeout (see HTTP) is the total timeout of each request, and can be overridden per
+    call of _submit_request.
+    """
+
+    def __init__(
+            self,
+            *args,
+            pool_size=100,
+            pool_size_per_host=0,
+            keepalive_timeout=30,
+            connect_timeout=None,
+            **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        # The requests session of HTTP is not used by the async clients.
+        self.client.close()
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.connect_timeout = connect_timeout
+        self.session = None
+
+    def _get_session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers=dict(self.client.headers),
+            )
+        return self.session
+
+    async def close(self):
+        """Closes the session and its pooled connections."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        self.logger.debug('HTTP session closed.')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _then(self, response, callback):
+        async def then():
+            return callback(await response)
+
+        return then()
+
+    def paginate(self, method, **kwargs):
+        """
+        Async iterator over the rows of all pages of a paginated endpoint, see
+        HttpPrivate.paginate: async for fill in client.paginate(client.fills_v2): ...
+        """
+        return aiter_rows(method, **kwargs)
+
+    def _proxy(self, path):
+        if not self.proxies:
+            return None
+        return self.proxies.get(path.split(':', 1)[0])
+
+    async def _submit_request(self, method=None, path=None, query=None, headers=None,
+                              sign_headers=None, timeout=None):
+        """
+        Submits the request to the API, through response_cache if the client has one.
+        """
+        if self.response_cache is None:
+            return await self._send_request(method, path, query, headers, sign_headers, timeout)
+        if method == 'GET':
+            return await self.response_cache.get_async(
+                self.response_cache.key(path, query, headers),
+                lambda: self._send_request(method, path, query, headers, sign_headers, timeout)
+            )
+        try:
+            return await self._send_request(method, path, query, headers, sign_headers, timeout)
+        finally:
+            if headers and headers.get('APEX-API-KEY'):
+                self.response_cache.invalidate(headers['APEX-API-KEY'])
+
+    async def _send_request(self, method=None, path=None, query=None, headers=None,
+                            sign_headers=None, timeout=None):
+        """
+        Sends the request to the API, with the same retry and error handling as
+        HTTP._send_request.
+        """
+
+        if query is None:
+            query = {}
+
+        request_timeout = aiohttp.ClientTimeout(
+            total=timeout or self.timeout,
+            connect=self.connect_timeout,
+        )
+
+        # Send request and return headers with body. Retry if failed.
+        retries_attempted = self.max_retries
+        req_params = None
+
+        while True:
+
+            retries_attempted -= 1
+            if retries_attempted < 0:
+                raise FailedRequestError(
+                    request=f'{method} {path}: {req_params}',
+                    message='Bad Request. Retries exceeded maximum.',
+                    status_code=400,
+                    time=dt.utcnow().strftime("%H:%M:%S")
+                )
+
+            retries_remaining = f'{retries_attempted} retries remain.'
+
+            # Define parameters and log the request. Values are sent as str(), like requests.
+            req_params = {k: str(v) for k, v in query.items() if v is not None}
+
+            # Log the request.
+            if self.log_requests:
+                self.logger.debug(f'Request -> {method} {path}: {req_params}')
+
+            # Use 'params' for GET and 'data' for POST.
+            if method == 'GET':
+                request_kwargs = {'params': req_params}
+            else:
+                request_kwargs = {'data': req_params}
+
+            # Wait for the rate budget, if any, then sign.
+            if self.request_scheduler is not None:
+                await self.request_scheduler.acquire_async(path)
+            req_headers = headers
+            if sign_headers is not None:
+                req_headers = dict(headers or {}, **sign_headers())
+
+            # Attempt the request.
+            try:
+                with self._phase(path, PHASE_NETWORK):
+                    async with self._get_session().request(
+                            method, path, headers=req_headers, timeout=request_timeout,
+                            proxy=self._proxy(path), **request_kwargs) as s:
+                        body = await s.text()
+
+            # If aiohttp fires an error, retry.
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+                if self.force_retry:
+                    self.logger.error(f'{e}. {retries_remaining}')
+                    await asyncio.sleep(self.retry_delay)
+                    continue
+                else:
+                    raise e
+
+            # Convert response to dictionary, or raise if the body is not JSON.
+            try:
+                with self._phase(path, PHASE_DECODE):
+                    s_json = json.loads(body)
+
+            # If we have trouble converting, handle the error and retry.
+            except ValueError as e:
+                if self.force_retry:
+                    self.logger.error(f'{e}. {retries_remaining}')
+                    await asyncio.sleep(self.retry_delay)
+                    continue
+                else:
+                    raise FailedRequestError(
+                        request=f'{method} {path}: {req_params}',
+                        message='Conflict. Could not decode JSON.',
+                        status_code=409,
+                        time=dt.utcnow().strftime("%H:%M:%S")
+                    )
+            else:
+                return s_json
+
+
+class AsyncHttpPublic(_AsyncHTTP, HttpPublic):
+    pass
+
+
+class AsyncHttpPrivate(_AsyncHTTP, HttpPrivate):
+    pass
+
+
+def _run_in_executor(method):
+    """
+    Wraps a synchronous HttpPrivateStark method so it runs in the client's signing executor,
+    keeping the STARK signing off the event loop, and awaits the request it returns, if any.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self.signing_executor, functools.partial(method, self, *args, **kwargs))
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    return wrapper
+
+
+class AsyncHttpPrivateStark(_AsyncHTTP, HttpPrivateStark):
+    """
+    Async HttpPrivateStark. The STARK methods (orders, withdrawals, transfers) build and sign
+    their payload in signing_executor and then send it on the event loop.
+
+    :param signing_executor: concurrent.futures executor for signing; defaults to the event
+        loop's default thread pool.
+    """
+
+    def __init__(self, *args, signing_executor=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.signing_executor = signing_executor
+
+
+for _name, _method in vars(HttpPrivateStark).items():
+    if not _name.startswith('_') and inspect.isfunction(_method):
+        setattr(AsyncHttpPrivateStark, _name, _run_in_executor(_method))
+del _name, _method
@@ -5,14 +5,14 @@ import hmac
 import math
 
 from apexpro.http_public import HttpPublic
-from web3 import Web3
 
 from apexpro import HTTP, private_key_to_public_key_pair_hex
 from apexpro.constants import URL_SUFFIX, OFF_CHAIN_KEY_DERIVATION_ACTION, OFF_CHAIN_ONBOARDING_ACTION, ORDER_SIDE_BUY
+from apexpro.helpers.instrumentation import PHASE_HMAC
+from apexpro.helpers.pagination import iter_rows
 from apexpro.helpers.request_helpers import generate_query_path, \
     generate_now, random_client_id, iso_to_epoch_seconds, epoch_seconds_to_iso
 from apexpro.starkex.constants import ONE_HOUR_IN_SECONDS, ORDER_SIGNATURE_EXPIRATION_BUFFER_HOURS
-from apexpro.starkex.order import SignableOrder, DECIMAL_CONTEXT_ROUND_UP, DECIMAL_CONTEXT_ROUND_DOWN
 
 
 class HttpPrivate(HttpPublic):
@@ -23,25 +23,34 @@ class HttpPrivate(HttpPublic):
             data={},
             headers=None
     ):
-        now_iso = generate_now()
+        sign_headers = None
         if self.api_key_credentials is not None:
-            signature = self.sign(
-                request_path=path,
-                method=method.upper(),
-                iso_timestamp=str(now_iso),
-                data=data,
-            )
             headers = {
-                'APEX-SIGNATURE': signature,
                 'APEX-API-KEY': self.api_key_credentials.get('key'),
-                'APEX-TIMESTAMP': str(now_iso),
                 'APEX-PASSPHRASE': self.api_key_credentials.get('passphrase'),
             }
+
+            # Called when the request is sent, after any wait on request_scheduler, so that
+            # the timestamp is fresh.
+            def sign_headers():
+                now_iso = generate_now()
+                with self._phase(path, PHASE_HMAC):
+                    signature = self.sign(
+                        request_path=path,
+                        method=method.upper(),
+                        iso_timestamp=str(now_iso),
+                        data=data,
+                    )
+                return {
+                    'APEX-SIGNATURE': signature,
+                    'APEX-TIMESTAMP': str(now_iso),
+                }
         return self._submit_request(
             method=method,
             path=self.endpoint + path,
             headers=headers,
             query=data,
+            sign_headers=sign_headers,
         )
 
     def _get(self, endpoint, params):
@@ -58,6 +67,33 @@ class HttpPrivate(HttpPublic):
             headers
         )
 
+    def _store_onboarding(self, onboardingRes):
+        if onboardingRes.get('data') is not None:
+            self.user = onboardingRes.get('data').get('user')
+            self.account = onboardingRes.get('data').get('account')
+        return onboardingRes
+
+    def _store_user(self, userRes):
+        self.user = userRes.get('data')
+        return userRes
+
+    def _store_account(self, accountRes):
+        self.account = accountRes.get('data')
+        return accountRes
+
+    def paginate(self, method, **kwargs):
+        """"
+        Iterates over the rows of all pages of a paginated endpoint, prefetching the next pages
+        concurrently, e.g.
+        for fill in client.paginate(client.fills_v2, beginTimeInclusive=begin,
+                                    endTimeExclusive=end, limit=100, prefetch=4): ...
+        :param method: Paginated endpoint, e.g. history_orders_v2, fills_v2, funding_v2,
+            transfers_v2, withdraw_list_v2 or historical_pnl_v2.
+        :param kwargs: Endpoint parameters and options, see apexpro.helpers.pagination.iter_rows
+        :returns: Iterator of rows.
+        """
+        return iter_rows(method, **kwargs)
+
     # ============ Signing ============
 
     def sign(
@@ -167,10 +203,7 @@ class HttpPrivate(HttpPublic):
                 'APEX-ETHEREUM-ADDRESS': eth_address,
             }
         )
-        if onboardingRes.get('data') is not None:
-            self.user = onboardingRes.get('data').get('user')
-            self.account = onboardingRes.get('data').get('account')
-        return onboardingRes
+        return self._then(onboardingRes, self._store_onboarding)
 
     def register_user_v2(
             self,
@@ -232,10 +265,7 @@ class HttpPrivate(HttpPublic):
                 'APEX-ETHEREUM-ADDRESS': eth_address,
             }
         )
-        if onboardingRes.get('data') is not None:
-            self.user = onboardingRes.get('data').get('user')
-            self.account = onboardingRes.get('data').get('account')
-        return onboardingRes
+        return self._then(onboardingRes, self._store_onboarding)
 
     def derive_stark_key(
             self,
@@ -245,6 +275,8 @@ class HttpPrivate(HttpPublic):
             ethereum_address or self.default_address,
             action=OFF_CHAIN_KEY_DERIVATION_ACTION,
             )
+        from web3 import Web3
+
         signature_int = int(signature, 16)
         hashed_signature = Web3.solidityKeccak(['uint256'], [signature_int])
         private_key_int = int(hashed_signature.hex(), 16) >> 5
@@ -271,6 +303,8 @@ class HttpPrivate(HttpPublic):
             action=OFF_CHAIN_ONBOARDING_ACTION,
             nonce=nonce,
         )
+        from web3 import Web3
+
         r_hex = signature[2:66]
         r_int = int(r_hex, 16)
         hashed_r_bytes = bytes(Web3.solidityKeccak(['uint256'], [r_int]))
@@ -309,8 +343,7 @@ class HttpPrivate(HttpPublic):
             endpoint=path,
             params=kwargs
         )
-        self.user = userRes.get('data')
-        return userRes
+        return self._then(userRes, self._store_user)
 
     def get_user(self, **kwargs):
         """"
@@ -325,8 +358,7 @@ class HttpPrivate(HttpPublic):
             endpoint=path,
             params=kwargs
         )
-        self.user = userRes.get('data')
-        return userRes
+        return self._then(userRes, self._store_user)
 
 
     def modify_user(self, **kwargs):
@@ -357,8 +389,7 @@ class HttpPrivate(HttpPublic):
             endpoint=path,
             params=kwargs
         )
-        self.account = accountRes.get('data')
-        return accountRes
+        return self._then(accountRes, self._store_account)
 
     def get_account(self, **kwargs):
         """"
@@ -373,8 +404,7 @@ class HttpPrivate(HttpPublic):
             endpoint=path,
             params=kwargs
         )
-        self.account = accountRes.get('data')
-        return accountRes
+        return self._then(accountRes, self._store_account)
 
     def get_account_v2(self, **kwargs):
         """"
@@ -389,8 +419,7 @@ class HttpPrivate(HttpPublic):
             endpoint=path,
             params=kwargs
         )
-        self.account = accountRes.get('data')
-        return accountRes
+        return self._then(accountRes, self._store_account)
 
     def transfers(self, **kwargs):
         """"
@@ -3,8 +3,10 @@ import decimal
 import math
 
 from apexpro.constants import URL_SUFFIX, ORDER_SIDE_BUY
+from apexpro.helpers.instrumentation import PHASE_FEE, PHASE_SIGN
 from apexpro.helpers.request_helpers import random_client_id, iso_to_epoch_seconds, epoch_seconds_to_iso
 from apexpro.http_private import HttpPrivate
+from apexpro.starkex.batch_signer import OrderBatchSigner
 from apexpro.starkex.conditional_transfer import SignableConditionalTransfer
 from apexpro.starkex.constants import ONE_HOUR_IN_SECONDS, ORDER_SIGNATURE_EXPIRATION_BUFFER_HOURS
 from apexpro.starkex.helpers import get_transfer_erc20_fact, nonce_from_client_id
@@ -14,6 +16,94 @@ from apexpro.starkex.withdrawal import SignableWithdrawal
 
 
 class HttpPrivateStark(HttpPrivate):
+    def _symbol_config_v2(self, symbol, index=None):
+        """
+        Look up the perpetual contract of symbol and its settlement currency in configs_v2(),
+        or in index if given.
+        """
+        index = index or self.configIndexV2
+        symbolData = index.contract(symbol)
+        currency = index.settle_currency(symbol)
+        return symbolData, currency
+
+    def sign_orders_batch(self, orders, max_workers=None, min_pool_batch_size=None):
+        """
+        Sign many v2 orders at once on a pool of worker processes.
+        Each order is a dict with the create_order_v2 arguments symbol, side, size, price,
+        limitFeeRate (or limitFee), expirationEpochSeconds and optionally accountId and
+        clientId. The orders passed in are not modified.
+
+        The pool is created on first use and kept for later batches, until close();
+        max_workers and min_pool_batch_size only apply when it is created (see
+        OrderBatchSigner).
+        :returns: A copy of each order with its clientId (assigned if missing) and signature,
+            in the same order as orders, to submit with create_order_v2(**order).
+        """
+        if not self.stark_private_key:
+            raise Exception(
+                'Client was not initialized with stark_private_key'
+            )
+        configs = self.configsV2
+        if not configs.config:
+            raise Exception(
+                'No config provided' +
+                'please call configs_v2()'
+            )
+
+        signed_orders = []
+        orders_to_sign = []
+        for order in orders:
+            order = dict(order, clientId=order.get('clientId') or random_client_id())
+            signed_orders.append(order)
+            accountId = order.get('accountId') or self.account.get('positionId')
+            if not accountId:
+                raise Exception(
+                    'No accountId provided' +
+                    'please call get_account_v2()'
+                )
+            symbolData, currency = self._symbol_config_v2(order['symbol'], configs.index)
+            orders_to_sign.append({
+                'position_id': accountId,
+                'client_id': order['clientId'],
+                'market': order['symbol'],
+                'side': order['side'],
+                'human_size': str(order['size']),
+                'human_price': str(order['price']),
+                'limit_fee': order.get('limitFeeRate') or order.get('limitFee'),
+                'expiration_epoch_seconds': order['expirationEpochSeconds'],
+                'synthetic_resolution': symbolData.get('starkExResolution'),
+                'synthetic_id': symbolData.get('starkExSyntheticAssetId'),
+                'collateral_id': currency.get('starkExAssetId'),
+            })
+
+        batch_signer = getattr(self, '_order_batch_signer', None)
+        if batch_signer is None or batch_signer.private_key_hex != self.stark_private_key:
+            if batch_signer is not None:
+                batch_signer.close()
+            kwargs = {}
+            if min_pool_batch_size is not None:
+                kwargs['min_pool_batch_size'] = min_pool_batch_size
+            batch_signer = OrderBatchSigner(
+                self.stark_private_key, max_workers=max_workers, **kwargs)
+            self._order_batch_signer = batch_signer
+        signatures = batch_signer.sign_orders(orders_to_sign)
+        for order, signature in zip(signed_orders, signatures):
+            order['signature'] = signature
+        return signed_orders
+
+    def close(self):
+        """Shuts down the worker processes of sign_orders_batch, if it started them."""
+        batch_signer = getattr(self, '_order_batch_signer', None)
+        if batch_signer is not None:
+            batch_signer.close()
+            self._order_batch_signer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     def create_order(self,
                      symbol,
                      side,
@@ -91,17 +181,11 @@ class HttpPrivateStark(HttpPrivate):
                 'No config provided' +
                 'please call configs()'
             )
-        symbolData = {}
-        currency = {}
-        for k, v in enumerate(self.config.get('perpetualContract')):
-            if v.get('symbol') == symbol:
-                symbolData = v
-        for k, v2 in enumerate(self.config.get('currency')):
-            if v2.get('id') == symbolData.get('settleCurrencyId'):
-                currency = v2
+        symbolData = self.configIndex.contract(symbol)
+        currency = self.configIndex.settle_currency(symbol)
 
         if symbolData is not None :
-            number = decimal.Decimal(price) / decimal.Decimal(symbolData.get('tickSize'))
+            number = decimal.Decimal(price) / self.configIndex.tick_size(symbol)
             if number > int(number):
                 raise Exception(
                     'the price must Multiple of tickSize'
@@ -120,24 +204,26 @@ class HttpPrivateStark(HttpPrivate):
             synthetic_id=symbolData.get('starkExSyntheticAssetId'),
             collateral_id=currency.get('starkExAssetId'),
         )
-        signature = order_to_sign.sign(self.stark_private_key)
-
-        if side == ORDER_SIDE_BUY:
-            human_cost = DECIMAL_CONTEXT_ROUND_UP.multiply(
-                decimal.Decimal(size),
-                decimal.Decimal(price)
-            )
-            fee = DECIMAL_CONTEXT_ROUND_UP.multiply(human_cost, decimal.Decimal(limitFeeRate))
-        else:
-            human_cost = DECIMAL_CONTEXT_ROUND_DOWN.multiply(
-                decimal.Decimal(size),
-                decimal.Decimal(price)
-            )
-            fee = DECIMAL_CONTEXT_ROUND_DOWN.multiply(human_cost, decimal.Decimal(limitFeeRate))
+        with self._phase('create-order', PHASE_SIGN):
+            signature = order_to_sign.sign(self.stark_private_key)
+
+        with self._phase('create-order', PHASE_FEE):
+            if side == ORDER_SIDE_BUY:
+                human_cost = DECIMAL_CONTEXT_ROUND_UP.multiply(
+                    decimal.Decimal(size),
+                    decimal.Decimal(price)
+                )
+                fee = DECIMAL_CONTEXT_ROUND_UP.multiply(human_cost, decimal.Decimal(limitFeeRate))
+            else:
+                human_cost = DECIMAL_CONTEXT_ROUND_DOWN.multiply(
+                    decimal.Decimal(size),
+                    decimal.Decimal(price)
+                )
+                fee = DECIMAL_CONTEXT_ROUND_DOWN.multiply(human_cost, decimal.Decimal(limitFeeRate))
 
-        limit_fee_rounded = DECIMAL_CONTEXT_ROUND_UP.quantize(
-            decimal.Decimal(fee),
-            decimal.Decimal(currency.get('stepSize')), )
+            limit_fee_rounded = DECIMAL_CONTEXT_ROUND_UP.quantize(
+                decimal.Decimal(fee),
+                decimal.Decimal(currency.get('stepSize')), )
         expirationEpoch = math.ceil(
             float(expirationEpochSeconds) / ONE_HOUR_IN_SECONDS,
         ) + ORDER_SIGNATURE_EXPIRATION_BUFFER_HOURS
@@ -169,7 +255,8 @@ class HttpPrivateStark(HttpPrivate):
                     synthetic_id=symbolData.get('starkExSyntheticAssetId'),
                     collateral_id=currency.get('starkExAssetId'),
                 )
-                slSignature = slOrder_to_sign.sign(self.stark_private_key)
+                with self._phase('create-order', PHASE_SIGN):
+                    slSignature = slOrder_to_sign.sign(self.stark_private_key)
 
                 if slSide == ORDER_SIDE_BUY:
                     slHuman_cost = DECIMAL_CONTEXT_ROUND_UP.multiply(
@@ -205,7 +292,8 @@ class HttpPrivateStark(HttpPrivate):
                     synthetic_id=symbolData.get('starkExSyntheticAssetId'),
                     collateral_id=currency.get('starkExAssetId'),
                 )
-                tpSignature = tpOrder_to_sign.sign(self.stark_private_key)
+                with self._phase('create-order', PHASE_SIGN):
+                    tpSignature = tpOrder_to_sign.sign(self.stark_private_key)
 
                 if tpSide == ORDER_SIDE_BUY:
                     tpHuman_cost = DECIMAL_CONTEXT_ROUND_UP.multiply(
@@ -318,7 +406,7 @@ class HttpPrivateStark(HttpPrivate):
         price = str(price)
         size = str(size)
         clientId = clientId or random_client_id()
-        if not self.stark_private_key:
+        if not signature and not self.stark_private_key:
             raise Exception(
                 'No signature provided and client was not ' +
                 'initialized with stark_private_key'
@@ -343,63 +431,55 @@ class HttpPrivateStark(HttpPrivate):
                 'please call get_account_v2()'
             )
 
-        if not self.configV2:
+        configs = self.configsV2
+        if not configs.config:
             raise Exception(
                 'No config provided' +
                 'please call configs_v2()'
             )
-        symbolData = {}
-        currency = {}
-        config = {}
-        if symbol.__contains__("USDT"):
-            config = self.usdtConfigV2
-        elif symbol.__contains__("USDC"):
-            config = self.usdcConfigV2
-        for k, v in enumerate(config.get('perpetualContract')):
-            if v.get('symbol') == symbol:
-                symbolData = v
-        for k, v2 in enumerate(config.get('currency')):
-            if v2.get('id') == symbolData.get('settleCurrencyId'):
-                currency = v2
+        symbolData, currency = self._symbol_config_v2(symbol, configs.index)
 
         if symbolData is not None :
-            number = decimal.Decimal(price) / decimal.Decimal(symbolData.get('tickSize'))
+            number = decimal.Decimal(price) / configs.index.tick_size(symbol)
             if number > int(number):
                 raise Exception(
                     'the price must Multiple of tickSize'
                 )
 
-        order_to_sign = SignableOrder(
-            position_id=accountId,
-            client_id=clientId,
-            market=symbol,
-            side=side,
-            human_size=size,
-            human_price=price,
-            limit_fee=limitFeeRate,
-            expiration_epoch_seconds=expirationEpochSeconds,
-            synthetic_resolution=symbolData.get('starkExResolution'),
-            synthetic_id=symbolData.get('starkExSyntheticAssetId'),
-            collateral_id=currency.get('starkExAssetId'),
-        )
-        signature = order_to_sign.sign(self.stark_private_key)
-
-        if side == ORDER_SIDE_BUY:
-            human_cost = DECIMAL_CONTEXT_ROUND_UP.multiply(
-                decimal.Decimal(size),
-                decimal.Decimal(price)
-            )
-            fee = DECIMAL_CONTEXT_ROUND_UP.multiply(human_cost, decimal.Decimal(limitFeeRate))
-        else:
-            human_cost = DECIMAL_CONTEXT_ROUND_DOWN.multiply(
-                decimal.Decimal(size),
-                decimal.Decimal(price)
+        if not signature:
+            order_to_sign = SignableOrder(
+                position_id=accountId,
+                client_id=clientId,
+                market=symbol,
+                side=side,
+                human_size=size,
+                human_price=price,
+                limit_fee=limitFeeRate,
+                expiration_epoch_seconds=expirationEpochSeconds,
+                synthetic_resolution=symbolData.get('starkExResolution'),
+                synthetic_id=symbolData.get('starkExSyntheticAssetId'),
+                collateral_id=currency.get('starkExAssetId'),
             )
-            fee = DECIMAL_CONTEXT_ROUND_DOWN.multiply(human_cost, decimal.Decimal(limitFeeRate))
+            with self._phase('create-order', PHASE_SIGN):
+                signature = order_to_sign.sign(self.stark_private_key)
+
+        with self._phase('create-order', PHASE_FEE):
+            if side == ORDER_SIDE_BUY:
+                human_cost = DECIMAL_CONTEXT_ROUND_UP.multiply(
+                    decimal.Decimal(size),
+                    decimal.Decimal(price)
+                )
+                fee = DECIMAL_CONTEXT_ROUND_UP.multiply(human_cost, decimal.Decimal(limitFeeRate))
+            else:
+                human_cost = DECIMAL_CONTEXT_ROUND_DOWN.multiply(
+                    decimal.Decimal(size),
+                    decimal.Decimal(price)
+                )
+                fee = DECIMAL_CONTEXT_ROUND_DOWN.multiply(human_cost, decimal.Decimal(limitFeeRate))
 
-        limit_fee_rounded = DECIMAL_CONTEXT_ROUND_UP.quantize(
-            decimal.Decimal(fee),
-            decimal.Decimal(currency.get('stepSize')), )
+            limit_fee_rounded = DECIMAL_CONTEXT_ROUND_UP.quantize(
+                decimal.Decimal(fee),
+                decimal.Decimal(currency.get('stepSize')), )
         expirationEpoch = math.ceil(
             float(expirationEpochSeconds) / ONE_HOUR_IN_SECONDS,
             ) + ORDER_SIGNATURE_EXPIRATION_BUFFER_HOURS
@@ -431,7 +511,8 @@ class HttpPrivateStark(HttpPrivate):
                     synthetic_id=symbolData.get('starkExSyntheticAssetId'),
                     collateral_id=currency.get('starkExAssetId'),
                 )
-                slSignature = slOrder_to_sign.sign(self.stark_private_key)
+                with self._phase('create-order', PHASE_SIGN):
+                    slSignature = slOrder_to_sign.sign(self.stark_private_key)
 
                 if slSide == ORDER_SIDE_BUY:
                     slHuman_cost = DECIMAL_CONTEXT_ROUND_UP.multiply(
@@ -467,7 +548,8 @@ class HttpPrivateStark(HttpPrivate):
                     synthetic_id=symbolData.get('starkExSyntheticAssetId'),
                     collateral_id=currency.get('starkExAssetId'),
                 )
-                tpSignature = tpOrder_to_sign.sign(self.stark_private_key)
+                with self._phase('create-order', PHASE_SIGN):
+                    tpSignature = tpOrder_to_sign.sign(self.stark_private_key)
 
                 if tpSide == ORDER_SIDE_BUY:
                     tpHuman_cost = DECIMAL_CONTEXT_ROUND_UP.multiply(
@@ -586,11 +668,7 @@ class HttpPrivateStark(HttpPrivate):
                 'please call configs()'
             )
 
-        currency = {}
-
-        for k, v in enumerate(self.config.get('currency')):
-            if v.get('id') == asset:
-                currency = v
+        currency = self.configIndex.currency(asset)
         withdraw_to_sign = SignableWithdrawal(
             network_id=self.network_id,
             position_id=accountId,
@@ -600,7 +678,8 @@ class HttpPrivateStark(HttpPrivate):
             eth_address=ethAddress,
             collateral_id=currency.get('starkExAssetId'),
         )
-        signature = withdraw_to_sign.sign(self.stark_private_key)
+        with self._phase('create-withdrawal-to-address', PHASE_SIGN):
+            signature = withdraw_to_sign.sign(self.stark_private_key)
 
         expirationEpoch = math.ceil(
             float(expirationEpochSeconds) / ONE_HOUR_IN_SECONDS,
@@ -668,17 +747,7 @@ class HttpPrivateStark(HttpPrivate):
                 'please call get_account()'
             )
 
-        currency = {}
-        config = {}
-        if asset.__contains__("USDT"):
-            config = self.usdtConfigV2
-        elif asset.__contains__("USDC"):
-            config = self.usdcConfigV2
-
-
-        for k, v in enumerate(config.get('currency')):
-            if v.get('id') == asset:
-                currency = v
+        currency = self.configIndexV2.currency(asset)
         withdraw_to_sign = SignableWithdrawal(
             network_id=self.network_id,
             position_id=accountId,
@@ -688,7 +757,8 @@ class HttpPrivateStark(HttpPrivate):
             eth_address=ethAddress,
             collateral_id=currency.get('starkExAssetId'),
         )
-        signature = withdraw_to_sign.sign(self.stark_private_key)
+        with self._phase('create-withdrawal-to-address', PHASE_SIGN):
+            signature = withdraw_to_sign.sign(self.stark_private_key)
 
         expirationEpoch = math.ceil(
             float(expirationEpochSeconds) / ONE_HOUR_IN_SECONDS,
@@ -765,17 +835,9 @@ class HttpPrivateStark(HttpPrivate):
                 'please call configs()'
             )
 
-        currency = {}
-        for k, v in enumerate(self.config.get('currency')):
-            if v.get('id') == asset:
-                currency = v
+        currency = self.configIndex.currency(asset)
 
-        token = {}
-        for k, v1 in enumerate(self.config.get('multiChain').get('chains')):
-            if v1.get('chainId') == self.network_id:
-                for _, v2 in enumerate(v1.get('tokens')):
-                    if v2.get('token') == asset:
-                        token = v2
+        token = self.configIndex.token(self.network_id, asset)
 
         fact = get_transfer_erc20_fact(
             recipient=ethAddress,
@@ -801,7 +863,8 @@ class HttpPrivateStark(HttpPrivate):
             collateral_id=currency.get('starkExAssetId')
         )
 
-        signature = transfer_to_sign.sign(self.stark_private_key)
+        with self._phase('fast-withdraw', PHASE_SIGN):
+            signature = transfer_to_sign.sign(self.stark_private_key)
 
         expirationEpoch = math.ceil(
             float(expirationEpochSeconds) / ONE_HOUR_IN_SECONDS,
@@ -876,23 +939,11 @@ class HttpPrivateStark(HttpPrivate):
                 'please call get_user()'
             )
 
-        currency = {}
-        config = {}
-        if asset.__contains__("USDT"):
-            config = self.usdtConfigV2
-        elif asset.__contains__("USDC"):
-            config = self.usdcConfigV2
+        index = self.configIndexV2
+        config = index.currency_config(asset)
+        currency = index.currency(asset)
 
-        for k, v in enumerate(config.get('currency')):
-            if v.get('id') == asset:
-                currency = v
-
-        token = {}
-        for k, v1 in enumerate(config.get('multiChain').get('chains')):
-            if v1.get('chainId') == self.network_id:
-                for _, v2 in enumerate(v1.get('tokens')):
-                    if v2.get('token') == asset:
-                        token = v2
+        token = index.token(self.network_id, asset)
 
         fact = get_transfer_erc20_fact(
             recipient=ethAddress,
@@ -918,7 +969,8 @@ class HttpPrivateStark(HttpPrivate):
             collateral_id=currency.get('starkExAssetId')
         )
 
-        signature = transfer_to_sign.sign(self.stark_private_key)
+        with self._phase('fast-withdraw', PHASE_SIGN):
+            signature = transfer_to_sign.sign(self.stark_private_key)
 
         expirationEpoch = math.ceil(
             float(expirationEpochSeconds) / ONE_HOUR_IN_SECONDS,
@@ -991,17 +1043,9 @@ class HttpPrivateStark(HttpPrivate):
                 'please call configs()'
             )
 
-        currency = {}
-        for k, v in enumerate(self.config.get('currency')):
-            if v.get('id') == asset:
-                currency = v
+        currency = self.configIndex.currency(asset)
 
-        token = {}
-        for k, v1 in enumerate(self.config.get('multiChain').get('chains')):
-            if v1.get('chainId') == int(chainId):
-                for _, v2 in enumerate(v1.get('tokens')):
-                    if v2.get('token') == asset:
-                        token = v2
+        token = self.configIndex.token(int(chainId), asset)
 
         totalAmount = decimal.Decimal(amount) + decimal.Decimal(fee)
         transfer_to_sign = SignableTransfer(
@@ -1014,7 +1058,8 @@ class HttpPrivateStark(HttpPrivate):
             expiration_epoch_seconds=expirationEpochSeconds,
             collateral_id=currency.get('starkExAssetId')
         )
-        signature = transfer_to_sign.sign(self.stark_private_key)
+        with self._phase('cross-chain-withdraw', PHASE_SIGN):
+            signature = transfer_to_sign.sign(self.stark_private_key)
 
         expirationEpoch = math.ceil(
             float(expirationEpochSeconds) / ONE_HOUR_IN_SECONDS,
@@ -1079,23 +1124,11 @@ class HttpPrivateStark(HttpPrivate):
                 'please call gett_account()'
             )
 
-        currency = {}
-        config = {}
-        if asset.__contains__("USDT"):
-            config = self.usdtConfigV2
-        elif asset.__contains__("USDC"):
-            config = self.usdcConfigV2
-
-        for k, v in enumerate(config.get('currency')):
-            if v.get('id') == asset:
-                currency = v
+        index = self.configIndexV2
+        config = index.currency_config(asset)
+        currency = index.currency(asset)
 
-        token = {}
-        for k, v1 in enumerate(config.get('multiChain').get('chains')):
-            if v1.get('chainId') == int(chainId):
-                for _, v2 in enumerate(v1.get('tokens')):
-                    if v2.get('token') == asset:
-                        token = v2
+        token = index.token(int(chainId), asset)
 
         totalAmount = decimal.Decimal(amount) + decimal.Decimal(fee)
         transfer_to_sign = SignableTransfer(
@@ -1108,7 +1141,8 @@ class HttpPrivateStark(HttpPrivate):
             expiration_epoch_seconds=expirationEpochSeconds,
             collateral_id=currency.get('starkExAssetId')
         )
-        signature = transfer_to_sign.sign(self.stark_private_key)
+        with self._phase('cross-chain-withdraw', PHASE_SIGN):
+            signature = transfer_to_sign.sign(self.stark_private_key)
 
         expirationEpoch = math.ceil(
             float(expirationEpochSeconds) / ONE_HOUR_IN_SECONDS,
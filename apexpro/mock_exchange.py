@@ -0,0 +1,639 @@
+"""
+Local stand-in for the Apex pro exchange, for offline tests and benchmarks.
+
+MockExchange serves the REST endpoints used by HttpPublic, HttpPrivate and HttpPrivateStark on
+http.server, and the realtime_public / realtime_private WebSocket protocol (ping/pong, login,
+subscribe) on aiohttp (the 'async' extra), both on localhost:
+
+    with MockExchange(latency=0.002) as exchange:
+        exchange.add_account(api_key_credentials, stark_public_key, position_id='1')
+        client = HttpPrivateStark(exchange.http_endpoint, ...)
+        ws = WebSocket(endpoint=exchange.ws_endpoint, ...)
+
+Private requests are checked against the HMAC of the API key of an added account, and orders
+against the STARK key of that account. Latency and errors can be injected in REST responses.
+"""
+import asyncio
+import base64
+import collections
+import decimal
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from apexpro.constants import ASSET_RESOLUTION, COLLATERAL_ASSET, NETWORKID_TEST, URL_SUFFIX
+from apexpro.starkex.constants import ONE_HOUR_IN_SECONDS, ORDER_SIGNATURE_EXPIRATION_BUFFER_HOURS
+
+WS_REQUEST_PATH = '/ws/accounts'
+
+DEFAULT_CONFIG = {
+    'global': {'registerEnvId': NETWORKID_TEST},
+    'currency': [
+        {'id': 'USDC', 'starkExAssetId': '0xa21e', 'starkExResolution': '1000000',
+         'stepSize': '0.000001', 'showStep': '0.0001'},
+    ],
+    'perpetualContract': [
+        {'symbol': 'BTC-USDC', 'crossSymbolName': 'BTCUSDC', 'settleCurrencyId': 'USDC',
+         'tickSize': '0.5', 'stepSize': '0.001', 'minOrderSize': '0.001',
+         'starkExResolution': 10000000000,
+         'starkExSyntheticAssetId': '0x4254432d3130000000000000000000'},
+        {'symbol': 'ETH-USDC', 'crossSymbolName': 'ETHUSDC', 'settleCurrencyId': 'USDC',
+         'tickSize': '0.05', 'stepSize': '0.01', 'minOrderSize': '0.01',
+         'starkExResolution': 1000000000,
+         'starkExSyntheticAssetId': '0x4554482d3900000000000000000000'},
+    ],
+    'multiChain': {'chains': []},
+}
+
+
+def hmac_signature(secret, message):
+    """API key signature of message, as computed by HttpPrivate.sign."""
+    hashed = hmac.new(
+        base64.standard_b64encode(secret.encode(encoding='utf-8')),
+        msg=message.encode(encoding='utf-8'),
+        digestmod=hashlib.sha256,
+    )
+    return base64.standard_b64encode(hashed.digest()).decode()
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+class MockAccount:
+    def __init__(self, api_key_credentials, stark_public_key=None, position_id='1'):
+        self.api_key_credentials = api_key_credentials
+        self.stark_public_key = stark_public_key
+        self.position_id = str(position_id)
+        self.orders = collections.OrderedDict()
+        self.fills = []
+
+    @property
+    def api_key(self):
+        return self.api_key_credentials['key']
+
+
+class _RestError(Exception):
+    def __init__(self, code, msg, status=400):
+        self.code = code
+        self.msg = msg
+        self.status = status
+
+
+class MockExchange:
+    """
+    :param host: Interface of both servers.
+    :param port: REST port (0 for any free port).
+    :param ws_port: WebSocket port (0 for any free port).
+    :param config: symbols config served as usdcConfig, DEFAULT_CONFIG by default.
+    :param latency: Seconds added to each REST response, or a (min, max) range.
+    :param error_rate: Fraction of REST requests answered with an injected error.
+    :param error_status: HTTP status and code of the injected errors.
+    :param ping_interval: Seconds between the pings sent to WebSocket clients.
+    :param verify_signatures: Whether to check the STARK signature of orders.
+    :param seed: Seed of the latency and error injection.
+    """
+
+    def __init__(
+            self,
+            host='127.0.0.1',
+            port=0,
+            ws_port=0,
+            config=None,
+            latency=0.0,
+            error_rate=0.0,
+            error_status=500,
+            ping_interval=15,
+            verify_signatures=True,
+            seed=None,
+    ):
+        self.host = host
+        self.port = port
+        self.ws_port = ws_port
+        self.config = config or DEFAULT_CONFIG
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.ping_interval = ping_interval
+        self.verify_signatures = verify_signatures
+        self.random = random.Random(seed)
+        self.accounts = {}
+        self.stats = collections.Counter()
+        self.http_endpoint = None
+        self.ws_endpoint = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._http_server = None
+        self._http_thread = None
+        self._ws_loop = None
+        self._ws_thread = None
+        self._ws_runner = None
+        self._connections = set()
+        self._sequences = collections.Counter()
+        self._snapshots = {}
+        self._contracts = {c['symbol']: c for c in self.config['perpetualContract']}
+        self._currencies = {c['id']: c for c in self.config['currency']}
+
+    # ============ Lifecycle ============
+
+    def start(self):
+        """Starts the REST and WebSocket servers in background threads."""
+        handler = type('Handler', (_RestHandler,), {'exchange': self})
+        self._http_server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._http_server.daemon_threads = True
+        self.http_endpoint = 'http://%s:%d' % (self.host, self._http_server.server_address[1])
+        self._http_thread = threading.Thread(
+            target=self._http_server.serve_forever, name='mock-exchange-http', daemon=True)
+        self._http_thread.start()
+
+        started = threading.Event()
+        self._ws_thread = threading.Thread(
+            target=self._run_ws, args=(started,), name='mock-exchange-ws', daemon=True)
+        self._ws_thread.start()
+        started.wait()
+        return self
+
+    def stop(self):
+        """Stops both servers and closes the WebSocket connections."""
+        if self._http_server is not None:
+            self._http_server.shutdown()
+            self._http_server.server_close()
+            self._http_server = None
+        if self._ws_loop is not None:
+            asyncio.run_coroutine_threadsafe(self._stop_ws(), self._ws_loop).result()
+            self._ws_loop.call_soon_threadsafe(self._ws_loop.stop)
+            self._ws_thread.join()
+            self._ws_loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def add_account(self, api_key_credentials, stark_public_key=None, position_id='1'):
+        """
+        Registers an account. Its private requests must carry the HMAC of api_key_credentials,
+        and its orders the STARK signature of stark_public_key (not checked if None).
+        """
+        account = MockAccount(api_key_credentials, stark_public_key, position_id)
+        self.accounts[account.api_key] = account
+        return account
+
+    # ============ REST ============
+
+    def _inject(self):
+        """Applies the latency and error injection to a REST request."""
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            latency = self.random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.stats['injected_errors'] += 1
+            raise _RestError(self.error_status, 'Injected error', self.error_status)
+
+    def _authenticate(self, method, request_path, headers, form):
+        account = self.accounts.get(headers.get('APEX-API-KEY'))
+        if account is None:
+            raise _RestError(20001, 'Unknown API key', 401)
+        credentials = account.api_key_credentials
+        if headers.get('APEX-PASSPHRASE') != credentials['passphrase']:
+            raise _RestError(20002, 'Invalid passphrase', 401)
+        data_string = '&'.join('{key}={value}'.format(key=k, value=v)
+                               for k, v in sorted(form.items()))
+        expected = hmac_signature(
+            credentials['secret'],
+            (headers.get('APEX-TIMESTAMP') or '') + method + request_path + data_string)
+        if not hmac.compare_digest(expected, headers.get('APEX-SIGNATURE') or ''):
+            raise _RestError(20003, 'Invalid signature', 401)
+        return account
+
+    def handle(self, method, raw_path, headers, form):
+        """Returns the (HTTP status, JSON body) of a REST request."""
+        url = urlsplit(raw_path)
+        path = url.path
+        query = dict(parse_qsl(url.query, keep_blank_values=True))
+        name = path.rstrip('/').rsplit('/', 1)[-1]
+        self.stats[name] += 1
+        try:
+            self._inject()
+            handler = getattr(self, '_%s_%s' % (method.lower(), name.replace('-', '_')), None)
+            if handler is None or not path.startswith(URL_SUFFIX + '/'):
+                raise _RestError(404, 'Not found: %s %s' % (method, path), 404)
+            params = dict(query, **form)
+            if getattr(handler, 'private', False):
+                account = self._authenticate(method, unquote(raw_path), headers, form)
+                return 200, {'data': handler(account, params)}
+            return 200, {'data': handler(params)}
+        except _RestError as e:
+            self.stats['rejected'] += 1
+            return e.status, {'code': e.code, 'msg': e.msg}
+
+    def _get_time(self, params):
+        return {'time': _now_ms()}
+
+    def _get_symbols(self, params):
+        return {'usdcConfig': self.config, 'usdtConfig': {}}
+
+    def _get_depth(self, params):
+        symbol = params.get('symbol', '')
+        snapshot = self._snapshots.get('orderBook200.H.' + symbol) or {}
+        return {'a': snapshot.get('a', []), 'b': snapshot.get('b', []), 's': symbol,
+                'u': snapshot.get('u', 0)}
+
+    def _get_ticker(self, params):
+        return [{'symbol': params.get('symbol'), 'lastPrice': '0', 'price24hPcnt': '0'}]
+
+    def _get_trades(self, params):
+        return []
+
+    def _get_klines(self, params):
+        return {}
+
+    def _private(handler):
+        handler.private = True
+        return handler
+
+    @_private
+    def _get_account(self, account, params):
+        return {'positionId': account.position_id, 'id': account.position_id,
+                'starkKey': account.stark_public_key, 'positions': []}
+
+    @_private
+    def _get_account_balance(self, account, params):
+        return {'totalEquityValue': '0', 'availableBalance': '0'}
+
+    @_private
+    def _get_user(self, account, params):
+        return {'starkKey': account.stark_public_key}
+
+    @_private
+    def _get_open_orders(self, account, params):
+        return [o for o in account.orders.values() if o['status'] == 'OPEN']
+
+    @_private
+    def _get_get_order(self, account, params):
+        return account.orders.get(params.get('id'))
+
+    @staticmethod
+    def _page(rows, params):
+        limit = int(params.get('limit', 100))
+        page = int(params.get('page', 0))
+        return rows[page * limit:(page + 1) * limit]
+
+    @_private
+    def _get_history_orders(self, account, params):
+        orders = list(reversed(account.orders.values()))
+        return {'orders': self._page(orders, params), 'totalSize': len(orders)}
+
+    @_private
+    def _get_fills(self, account, params):
+        fills = list(reversed(account.fills))
+        return {'orders': self._page(fills, params), 'totalSize': len(fills)}
+
+    @_private
+    def _get_funding(self, account, params):
+        return {'fundingValues': [], 'totalSize': 0}
+
+    @_private
+    def _get_transfers(self, account, params):
+        return {'transfers': [], 'totalSize': 0}
+
+    @_private
+    def _get_withdraw_list(self, account, params):
+        return {'transfers': [], 'totalSize': 0}
+
+    @_private
+    def _get_historical_pnl(self, account, params):
+        return {'historicalPnl': [], 'totalSize': 0}
+
+    def _check_order_signature(self, account, order):
+        """Checks the STARK signature of an order posted by create_order or create_order_v2."""
+        from apexpro.starkex.helpers import to_quantums_round_up
+        from apexpro.starkex.order import SignableOrder
+
+        contract = self._contracts.get(order['symbol'])
+        if contract is None:
+            raise _RestError(30001, 'Unknown symbol %s' % order['symbol'])
+        if not self.verify_signatures or account.stark_public_key is None:
+            return
+        currency = self._currencies[contract['settleCurrencyId']]
+        expiration_epoch_hours = int(order['expiration']) // (ONE_HOUR_IN_SECONDS * 1000)
+        signable = SignableOrder(
+            market=order['symbol'],
+            side=order['side'],
+            position_id=account.position_id,
+            human_size=order['size'],
+            human_price=order['price'],
+            limit_fee='0',
+            client_id=order['clientId'],
+            expiration_epoch_seconds=(
+                expiration_epoch_hours - ORDER_SIGNATURE_EXPIRATION_BUFFER_HOURS
+            ) * ONE_HOUR_IN_SECONDS,
+            synthetic_resolution=contract['starkExResolution'],
+            synthetic_id=contract['starkExSyntheticAssetId'],
+            collateral_id=currency['starkExAssetId'],
+        )
+        # The signed fee is the limitFee amount, in collateral quantums.
+        signable._message = signable._message._replace(quantums_amount_fee=to_quantums_round_up(
+            decimal.Decimal(order['limitFee']), ASSET_RESOLUTION[COLLATERAL_ASSET]))
+        try:
+            valid = signable.verify_signature(order['signature'], account.stark_public_key)
+        except (AssertionError, ValueError):
+            valid = False
+        if not valid:
+            raise _RestError(30002, 'Invalid order signature')
+
+    @_private
+    def _post_create_order(self, account, params):
+        for field in ('symbol', 'side', 'type', 'size', 'price', 'limitFee', 'expiration',
+                      'clientId', 'signature'):
+            if not params.get(field):
+                raise _RestError(30000, 'Missing %s' % field)
+        self._check_order_signature(account, params)
+        with self._lock:
+            order_id = str(next(self._ids))
+        order = {
+            'id': order_id,
+            'clientId': params['clientId'],
+            'accountId': account.position_id,
+            'symbol': params['symbol'],
+            'side': params['side'],
+            'type': params['type'],
+            'price': params['price'],
+            'size': params['size'],
+            'limitFee': params['limitFee'],
+            'timeInForce': params.get('timeInForce'),
+            'reduceOnly': params.get('reduceOnly') == 'True',
+            'status': 'OPEN',
+            'createdAt': _now_ms(),
+        }
+        if order['type'] == 'MARKET':
+            order['status'] = 'FILLED'
+            account.fills.append(dict(order, id=order_id, orderId=order_id))
+        account.orders[order_id] = order
+        self.publish_private(account.api_key, 'ws_accounts_v2', {'orders': [order]})
+        return order
+
+    def _cancel(self, account, orders):
+        for order in orders:
+            if order['status'] == 'OPEN':
+                order['status'] = 'CANCELED'
+        if orders:
+            self.publish_private(account.api_key, 'ws_accounts_v2', {'orders': orders})
+
+    @_private
+    def _post_delete_order(self, account, params):
+        order = account.orders.get(params.get('id'))
+        if order is None:
+            raise _RestError(30003, 'Order not found')
+        self._cancel(account, [order])
+        return order['id']
+
+    @_private
+    def _post_delete_client_order_id(self, account, params):
+        orders = [o for o in account.orders.values() if o['clientId'] == params.get('id')]
+        if not orders:
+            raise _RestError(30003, 'Order not found')
+        self._cancel(account, orders)
+        return orders[0]['id']
+
+    @_private
+    def _post_delete_open_orders(self, account, params):
+        symbols = set(params['symbol'].split(',')) if params.get('symbol') else None
+        orders = [o for o in account.orders.values()
+                  if o['status'] == 'OPEN' and (symbols is None or o['symbol'] in symbols)]
+        self._cancel(account, orders)
+        return {}
+
+    del _private
+
+    # ============ WebSocket ============
+
+    def _run_ws(self, started):
+        from aiohttp import web
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._ws_loop = loop
+        app = web.Application()
+        app.router.add_get('/realtime_public', self._ws_handler)
+        app.router.add_get('/realtime_private', self._ws_handler)
+        # The server only stops once every handler has returned.
+        app.on_shutdown.append(lambda app: self._close_connections())
+        self._ws_runner = web.AppRunner(app)
+        loop.run_until_complete(self._ws_runner.setup())
+        site = web.TCPSite(self._ws_runner, self.host, self.ws_port)
+        loop.run_until_complete(site.start())
+        self.ws_endpoint = 'ws://%s:%d' % (self.host, self._ws_runner.addresses[0][1])
+        started.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _stop_ws(self):
+        await self._ws_runner.cleanup()
+
+    async def _ws_handler(self, request):
+        from aiohttp import WSMsgType, web
+
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        conn = _Connection(websocket, private=request.path.endswith('private'))
+        self._connections.add(conn)
+        pinger = asyncio.ensure_future(self._ping(conn))
+        try:
+            async for raw in websocket:
+                if raw.type != WSMsgType.TEXT:
+                    continue
+                self.stats['ws_messages'] += 1
+                try:
+                    message = json.loads(raw.data)
+                except ValueError:
+                    continue
+                await self._ws_message(conn, message)
+        finally:
+            pinger.cancel()
+            self._connections.discard(conn)
+        return websocket
+
+    async def _close_connections(self):
+        for conn in list(self._connections):
+            await conn.websocket.close()
+
+    def drop_connections(self):
+        """Closes every WebSocket connection, as a server restart would."""
+        asyncio.run_coroutine_threadsafe(self._close_connections(), self._ws_loop).result()
+
+    async def _ping(self, conn):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await conn.send({'op': 'ping', 'args': [str(_now_ms())]})
+
+    async def _ws_message(self, conn, message):
+        op = message.get('op')
+        args = message.get('args') or []
+        if op == 'ping':
+            await conn.send({'op': 'pong', 'args': [str(_now_ms())]})
+        elif op == 'pong':
+            conn.last_pong = time.time()
+        elif op == 'subscribe':
+            # Messages published from here on are sent by _publish, so the snapshots are taken
+            # before the first await.
+            conn.topics.update(args)
+            snapshots = [(topic, self._snapshots[topic]) for topic in args
+                         if topic in self._snapshots]
+            await conn.send({'success': True, 'ret_msg': '', 'conn_id': str(id(conn)),
+                             'request': message})
+            for topic, snapshot in snapshots:
+                await conn.send(self._public_message(topic, 'snapshot', snapshot))
+        elif op == 'unsubscribe':
+            conn.topics.difference_update(args)
+            await conn.send({'success': True, 'ret_msg': '', 'conn_id': str(id(conn)),
+                             'request': message})
+        elif op == 'login':
+            success = conn.private and self._ws_login(conn, args)
+            await conn.send({'success': success, 'ret_msg': '' if success else 'Login failed',
+                             'request': {'op': 'login', 'args': args}})
+
+    def _ws_login(self, conn, args):
+        try:
+            req = json.loads(args[0])
+            account = self.accounts[req['apiKey']]
+        except (IndexError, KeyError, TypeError, ValueError):
+            return False
+        credentials = account.api_key_credentials
+        expected = hmac_signature(
+            credentials['secret'], str(req.get('timestamp')) + 'GET' + WS_REQUEST_PATH)
+        if (req.get('passphrase') != credentials['passphrase'] or
+                not hmac.compare_digest(expected, req.get('signature') or '')):
+            return False
+        conn.api_key = account.api_key
+        conn.topics.update(req.get('topics') or [])
+        return True
+
+    def _public_message(self, topic, type, data):
+        return {'topic': topic, 'type': type, 'data': data, 'cs': self._sequences[topic],
+                'ts': int(time.time() * 1e6)}
+
+    async def _broadcast(self, message, select):
+        for conn in list(self._connections):
+            if select(conn):
+                await conn.send(message)
+
+    def _on_ws_loop(self, function, wait=True):
+        """
+        Runs the coroutine function on the WebSocket loop, from any thread. Topic state is only
+        changed there, so that subscribers get each message exactly once and in order.
+        """
+        if self._ws_loop is None:
+            return None
+        future = asyncio.run_coroutine_threadsafe(function(), self._ws_loop)
+        return future.result() if wait else None
+
+    def publish(self, topic, data, type='delta'):
+        """Pushes data on a public topic to its subscribers, and returns once it is sent."""
+        async def publish():
+            await self._publish(topic, data, type)
+
+        self._on_ws_loop(publish)
+
+    async def _publish(self, topic, data, type='delta'):
+        self._sequences[topic] += 1
+        if type == 'snapshot':
+            self._snapshots[topic] = data
+        message = self._public_message(topic, type, data)
+        await self._broadcast(message, lambda conn: not conn.private and topic in conn.topics)
+
+    def publish_private(self, api_key, topic, contents):
+        """Pushes contents on a private topic to the logged in connections of api_key."""
+        message = {'topic': topic, 'contents': contents}
+
+        async def publish():
+            await self._broadcast(
+                message, lambda conn: conn.api_key == api_key and topic in conn.topics)
+
+        self._on_ws_loop(publish, wait=False)
+
+    def publish_depth(self, symbol, bids, asks, snapshot=False, limit=200):
+        """
+        Publishes an order book snapshot or delta of symbol (e.g. 'BTCUSDC') on
+        orderBook<limit>.H.<symbol>, numbered by the update id 'u'. Deltas are applied to the
+        stored snapshot, which new subscribers receive first. Sizes of '0' remove a level.
+        """
+        topic = 'orderBook%d.H.%s' % (limit, symbol)
+
+        async def publish():
+            book = self._snapshots.get(topic)
+            update_id = (book or {}).get('u', 0) + 1
+            data = {'s': symbol, 'b': bids, 'a': asks, 'u': update_id}
+            if snapshot or book is None:
+                await self._publish(topic, data, 'snapshot')
+                return data
+            merged_book = dict(book, u=update_id)
+            for side, levels in (('b', bids), ('a', asks)):
+                merged = dict(book[side])
+                for price, size in levels:
+                    if decimal.Decimal(size) == 0:
+                        merged.pop(price, None)
+                    else:
+                        merged[price] = size
+                merged_book[side] = sorted(merged.items(),
+                                           key=lambda level: decimal.Decimal(level[0]),
+                                           reverse=side == 'b')
+            self._snapshots[topic] = merged_book
+            await self._publish(topic, data)
+            return data
+
+        return self._on_ws_loop(publish)
+
+
+class _Connection:
+    def __init__(self, websocket, private):
+        self.websocket = websocket
+        self.private = private
+        self.topics = set()
+        self.api_key = None
+        self.last_pong = None
+
+    async def send(self, message):
+        try:
+            await self.websocket.send_str(json.dumps(message))
+        except Exception:
+            pass
+
+
+class _RestHandler(BaseHTTPRequestHandler):
+    exchange = None
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _handle(self, method):
+        form = {}
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            form = dict(parse_qsl(self.rfile.read(length).decode(), keep_blank_values=True))
+        status, body = self.exchange.handle(method, self.path, self.headers, form)
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def log_message(self, format, *args):
+        pass
@@ -1,5 +1,96 @@
+import decimal
 from collections import namedtuple
 
 
 def configDecoder(configs):
     return namedtuple('X', configs.keys())(*configs.values())
+
+
+ConfigsV2 = namedtuple('ConfigsV2', ['config', 'usdc', 'usdt', 'index'])
+ConfigsV2.__doc__ = """
+The data of configs_v2(), its usdcConfig and usdtConfig, and its ConfigIndex, stored as one
+immutable snapshot so that a refresh replaces all of them at once.
+"""
+
+
+class ConfigIndex(object):
+    """
+    Lookup tables built once from the 'data' of configs(), or from the usdcConfig and usdtConfig
+    of configs_v2(), so orders and withdrawals find their metadata without scanning the lists.
+
+    Symbols map to their perpetual contract, with tickSize and stepSize parsed as Decimal, and
+    to the currency they settle in (taken from the config listing the contract). Currency ids
+    map to their currency, and (chainId, token) pairs to the token of that chain. When several
+    configs list the same currency or token, the config settling contracts in it wins, like the
+    USDC/USDT config choice the v2 methods used to make.
+    Lookups of unknown keys return an empty dict.
+    """
+
+    def __init__(self, *configs):
+        self.contracts = {}
+        self.tick_sizes = {}
+        self.step_sizes = {}
+        self.settle_currencies = {}
+        self.currencies = {}
+        self.chains = {}
+        self.tokens = {}
+        self.currency_configs = {}
+
+        for config in configs:
+            if not config:
+                continue
+            contracts = config.get('perpetualContract') or []
+            currencies = {v.get('id'): v for v in config.get('currency') or []}
+            settle_ids = {v.get('settleCurrencyId') for v in contracts}
+
+            for contract in contracts:
+                symbol = contract.get('symbol')
+                self.contracts[symbol] = contract
+                self.settle_currencies[symbol] = currencies.get(
+                    contract.get('settleCurrencyId'), {})
+                if contract.get('tickSize') is not None:
+                    self.tick_sizes[symbol] = decimal.Decimal(contract.get('tickSize'))
+                if contract.get('stepSize') is not None:
+                    self.step_sizes[symbol] = decimal.Decimal(contract.get('stepSize'))
+
+            chains = {}
+            tokens = {}
+            for chain in (config.get('multiChain') or {}).get('chains') or []:
+                chains[chain.get('chainId')] = chain
+                for token in chain.get('tokens') or []:
+                    tokens[(chain.get('chainId'), token.get('token'))] = token
+
+            for currency_id, currency in currencies.items():
+                if currency_id in settle_ids or currency_id not in self.currencies:
+                    self.currencies[currency_id] = currency
+                    self.currency_configs[currency_id] = config
+            for chain_id, chain in chains.items():
+                self.chains.setdefault(chain_id, chain)
+            for key, token in tokens.items():
+                if key[1] in settle_ids or key not in self.tokens:
+                    self.tokens[key] = token
+
+    def contract(self, symbol):
+        return self.contracts.get(symbol, {})
+
+    def settle_currency(self, symbol):
+        return self.settle_currencies.get(symbol, {})
+
+    def tick_size(self, symbol):
+        return self.tick_sizes.get(symbol)
+
+    def step_size(self, symbol):
+        return self.step_sizes.get(symbol)
+
+    def currency(self, currency_id):
+        return self.currencies.get(currency_id, {})
+
+    def currency_config(self, currency_id):
+        """Returns the config the currency was taken from, e.g. for its 'global' section."""
+        return self.currency_configs.get(currency_id, {})
+
+    def chain(self, chain_id):
+        return self.chains.get(chain_id, {})
+
+    def token(self, chain_id, token):
+        return self.tokens.get((chain_id, token), {})
@@ -0,0 +1,164 @@
+"""
+Local order books maintained from the orderBook<limit>.H.<symbol> depth stream.
+
+Each side is a dict of price level plus a sorted list of its keys, so an update costs a dict
+write and a O(log n) insertion or removal, and top of book is a single lookup. The sorted list
+is a sortedcontainers.SortedList when that package is installed, and a plain list kept ordered
+with bisect otherwise (O(n) insertions, which is still cheap for the 25 to 200 level books of
+the stream).
+"""
+import bisect
+import threading
+
+try:
+    from sortedcontainers import SortedList
+except ImportError:
+    SortedList = None
+
+
+class _Levels:
+    """
+    Price levels of one side of a book, best first. Bids are keyed by the negated price so
+    that both sides sort ascending.
+    """
+
+    __slots__ = ('_keys', '_levels', '_sorted')
+
+    def __init__(self):
+        self._sorted = SortedList is not None
+        self._keys = SortedList() if self._sorted else []
+        self._levels = {}
+
+    def __len__(self):
+        return len(self._levels)
+
+    def set(self, key, level):
+        if key not in self._levels:
+            if self._sorted:
+                self._keys.add(key)
+            else:
+                bisect.insort(self._keys, key)
+        self._levels[key] = level
+
+    def remove(self, key):
+        if self._levels.pop(key, None) is None:
+            return
+        if self._sorted:
+            self._keys.remove(key)
+        else:
+            del self._keys[bisect.bisect_left(self._keys, key)]
+
+    def clear(self):
+        self._keys.clear()
+        self._levels.clear()
+
+    def first(self):
+        if not self._levels:
+            return None
+        return self._levels[self._keys[0]]
+
+    def top(self, n=None):
+        keys = self._keys if n is None else self._keys[:n]
+        return [self._levels[key] for key in keys]
+
+
+class OrderBook:
+    """
+    Order book of one symbol, built from the snapshot and delta messages of the depth stream.
+
+    Levels are (price, size) tuples of the strings received. A snapshot replaces the book; a
+    delta is applied only if its update id 'u' follows the last one, otherwise the book is
+    marked out of sync and further deltas are ignored until the next snapshot. After a snapshot
+    without an update id, deltas are applied without the check until one carries an id.
+    WebSocket.order_book_stream() resubscribes automatically when that happens.
+
+    Updates and reads take a lock, so the accessors can be called from any thread.
+    """
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.update_id = None
+        self.synced = False
+        self.gaps = 0
+        self._bids = _Levels()
+        self._asks = _Levels()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<OrderBook %s u=%s bid=%s ask=%s>' % (
+            self.symbol, self.update_id, self.best_bid(), self.best_ask())
+
+    def apply(self, message):
+        """
+        Applies a depth stream message. Returns True if the book was updated, False if the
+        message was ignored, either because it is a delta that does not follow the last update
+        id or because the book is waiting for a snapshot.
+        """
+        data = message.get('data')
+        if not data:
+            return False
+        update_id = data.get('u')
+        with self._lock:
+            if message.get('type') == 'snapshot':
+                self._bids.clear()
+                self._asks.clear()
+            elif not self.synced:
+                return False
+            elif self.update_id is not None and update_id != self.update_id + 1:
+                self.synced = False
+                self.gaps += 1
+                return False
+            self._update(self._bids, data.get('b'), -1)
+            self._update(self._asks, data.get('a'), 1)
+            self.update_id = update_id
+            self.synced = True
+        return True
+
+    @staticmethod
+    def _update(levels, entries, sign):
+        if not entries:
+            return
+        for price, size in entries:
+            key = sign * float(price)
+            if size == '0' or float(size) == 0:
+                levels.remove(key)
+            else:
+                levels.set(key, (price, size))
+
+    def reset(self):
+        """Empties the book and waits for a new snapshot."""
+        with self._lock:
+            self._bids.clear()
+            self._asks.clear()
+            self.update_id = None
+            self.synced = False
+
+    def best_bid(self):
+        """(price, size) of the highest bid, or None."""
+        with self._lock:
+            return self._bids.first()
+
+    def best_ask(self):
+        """(price, size) of the lowest ask, or None."""
+        with self._lock:
+            return self._asks.first()
+
+    def top(self):
+        """(best bid, best ask), read together."""
+        with self._lock:
+            return self._bids.first(), self._asks.first()
+
+    def depth(self, n=None):
+        """{'b': bids, 'a': asks} with at most n levels per side, best first."""
+        with self._lock:
+            return {'b': self._bids.top(n), 'a': self._asks.top(n)}
+
+    def snapshot(self):
+        """The whole book in the depth stream format: {'s', 'b', 'a', 'u'}."""
+        with self._lock:
+            return {'s': self.symbol, 'b': self._bids.top(), 'a': self._asks.top(),
+                    'u': self.update_id}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._bids) + len(self._asks)
@@ -0,0 +1,85 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from apexpro.starkex.order import SignableOrder
+
+# Batches smaller than this are signed in the calling process; shipping them to the pool costs
+# more than signing them.
+DEFAULT_MIN_POOL_BATCH_SIZE = 16
+
+# Set once per worker process by the pool initializer.
+_worker_private_key_hex = None
+
+
+def _init_worker(private_key_hex):
+    global _worker_private_key_hex
+    _worker_private_key_hex = private_key_hex
+
+
+def _sign_orders(orders, private_key_hex=None):
+    private_key_hex = private_key_hex or _worker_private_key_hex
+    return [SignableOrder(**order).sign(private_key_hex) for order in orders]
+
+
+class OrderBatchSigner(object):
+    """
+    Signs batches of orders with one STARK key on a persistent pool of worker processes.
+
+    The private key is handed to every worker once, when the pool starts. Each batch is split
+    into one chunk per worker and the signatures come back in input order.
+
+    :param private_key_hex: STARK private key as hex string.
+    :param max_workers: Number of worker processes, defaults to os.cpu_count().
+    :param min_pool_batch_size: Batches smaller than this are signed in-process.
+    """
+
+    def __init__(
+            self,
+            private_key_hex,
+            max_workers=None,
+            min_pool_batch_size=DEFAULT_MIN_POOL_BATCH_SIZE,
+    ):
+        self.private_key_hex = private_key_hex
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_pool_batch_size = min_pool_batch_size
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.private_key_hex,),
+            )
+        return self._executor
+
+    def sign_orders(self, orders):
+        """
+        Sign a list of orders, each given as the keyword arguments of SignableOrder.
+
+        :returns: Serialized signatures, in the same order as orders.
+        """
+        orders = list(orders)
+        if self.max_workers <= 1 or len(orders) < self.min_pool_batch_size:
+            return _sign_orders(orders, self.private_key_hex)
+
+        chunk_size = -(-len(orders) // self.max_workers)
+        chunks = [
+            orders[i:i + chunk_size] for i in range(0, len(orders), chunk_size)
+        ]
+        signatures = []
+        for chunk_signatures in self._get_executor().map(_sign_orders, chunks):
+            signatures.extend(chunk_signatures)
+        return signatures
+
+    def close(self):
+        """Shut down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
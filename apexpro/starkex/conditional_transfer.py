@@ -12,6 +12,7 @@ from apexpro.starkex.helpers import fact_to_condition
 from apexpro.starkex.helpers import nonce_from_client_id
 from apexpro.starkex.helpers import to_quantums_exact
 from apexpro.starkex.signable import Signable
+from apexpro.starkex.starkex_resources.proxy import get_asset_hash
 from apexpro.starkex.starkex_resources.proxy import get_hash
 
 StarkwareConditionalTransfer = namedtuple(
@@ -79,7 +80,7 @@ class SignableConditionalTransfer(Signable):
 
         # The transfer asset and fee asset are always the collateral asset.
         # Fees are not supported for conditional transfers.
-        asset_ids = get_hash(
+        asset_ids = get_asset_hash(
             self.collateral_asset_id,
             CONDITIONAL_TRANSFER_FEE_ASSET_ID,
         )
@@ -1,10 +1,7 @@
 import decimal
 import hashlib
 
-from web3 import Web3
-
 from apexpro.constants import ASSET_RESOLUTION
-from apexpro.eth_signing.util import strip_hex_prefix
 from apexpro.starkex.constants import ORDER_FIELD_BIT_LENGTHS
 from apexpro.starkex.starkex_resources.python_signature import (
     get_random_private_key
@@ -122,6 +119,8 @@ def get_transfer_erc20_fact(
                 token_decimals,
             )
         )
+    from web3 import Web3
+
     hex_bytes = Web3.solidityKeccak(
         [
             'address',
@@ -143,6 +142,9 @@ def fact_to_condition(fact_registry_address, fact):
     """Generate the condition, signed as part of a conditional transfer."""
     if not isinstance(fact, bytes):
         raise ValueError('fact must be a byte-string')
+    from web3 import Web3
+    from apexpro.eth_signing.util import strip_hex_prefix
+
     data = bytes.fromhex(strip_hex_prefix(fact_registry_address)) + fact
     return int(Web3.keccak(data).hex(), 16) & BIT_MASK_250
 
@@ -163,6 +165,8 @@ def private_key_from_bytes(data):
     """Generate a STARK key deterministically from binary data."""
     if not isinstance(data, bytes):
         raise ValueError('Input must be a byte-string')
+    from web3 import Web3
+
     return hex(int(Web3.keccak(data).hex(), 16) >> 5)
 
 
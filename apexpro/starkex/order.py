@@ -14,6 +14,7 @@ from apexpro.starkex.helpers import to_quantums_exact
 from apexpro.starkex.helpers import to_quantums_round_down
 from apexpro.starkex.helpers import to_quantums_round_up
 from apexpro.starkex.signable import Signable
+from apexpro.starkex.starkex_resources.proxy import get_asset_hash
 from apexpro.starkex.starkex_resources.proxy import get_hash
 
 DECIMAL_CONTEXT_ROUND_DOWN = decimal.Context(rounding=decimal.ROUND_DOWN)
@@ -161,11 +162,9 @@ class SignableOrder(Signable):
         part_2 += self._message.expiration_epoch_hours
         part_2 <<= ORDER_PADDING_BITS
 
-        assets_hash = get_hash(
-            get_hash(
-                asset_id_sell,
-                asset_id_buy,
-            ),
+        assets_hash = get_asset_hash(
+            asset_id_sell,
+            asset_id_buy,
             self._message.asset_id_fee,
         )
         return get_hash(
@@ -1,20 +1,18 @@
 import ctypes
 import secrets
 import os
-from typing import Optional, Tuple
-import json
+from typing import List, Optional, Tuple
 import math
+from apexpro.starkex.starkex_resources.pedersen_params import get_pedersen_params
 from apexpro.starkex.starkex_resources.python_signature import (
     inv_mod_curve_size,
 )
 
-PEDERSEN_HASH_POINT_FILENAME = os.path.join(
-    os.path.dirname(__file__), 'pedersen_params.json')
-PEDERSEN_PARAMS = json.load(open(PEDERSEN_HASH_POINT_FILENAME))
+PEDERSEN_PARAMS = get_pedersen_params()
 
-EC_ORDER = PEDERSEN_PARAMS['EC_ORDER']
+EC_ORDER = PEDERSEN_PARAMS.ec_order
 
-FIELD_PRIME = PEDERSEN_PARAMS['FIELD_PRIME']
+FIELD_PRIME = PEDERSEN_PARAMS.field_prime
 
 N_ELEMENT_BITS_ECDSA = math.floor(math.log(FIELD_PRIME, 2))
 assert N_ELEMENT_BITS_ECDSA == 251
@@ -23,17 +21,56 @@ assert N_ELEMENT_BITS_ECDSA == 251
 CPP_LIB_PATH = None
 OUT_BUFFER_SIZE = 251
 
+# Environment variable with the path of the StarkWare crypto_c_exports shared library. When it is
+# not set, the library is looked up next to this module (see CPP_LIB_FILENAMES).
+CPP_LIB_ENV_VAR = 'APEXPRO_CRYPTO_C_EXPORTS_PATH'
+CPP_LIB_FILENAMES = (
+    'libcrypto_c_exports.so',
+    'libcrypto_c_exports.dylib',
+    'crypto_c_exports.dll',
+)
+
 def get_cpp_lib(crypto_c_exports_path):
     global CPP_LIB_PATH
-    CPP_LIB_PATH = ctypes.cdll.LoadLibrary(os.path.abspath(crypto_c_exports_path))
-    # Configure argument and return types.
-    CPP_LIB_PATH.Hash.argtypes = [
+    lib = ctypes.cdll.LoadLibrary(os.path.abspath(crypto_c_exports_path))
+    # Configure argument and return types. A library missing one of the functions raises
+    # AttributeError here, before it is used.
+    lib.Hash.argtypes = [
         ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p]
-    CPP_LIB_PATH.Verify.argtypes = [
+    lib.Verify.argtypes = [
         ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p]
-    CPP_LIB_PATH.Verify.restype = bool
-    CPP_LIB_PATH.Sign.argtypes = [
+    lib.Verify.restype = bool
+    lib.Sign.argtypes = [
         ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p]
+    CPP_LIB_PATH = lib
+
+def find_cpp_lib() -> Optional[str]:
+    """
+    Returns the path of the crypto_c_exports library given by CPP_LIB_ENV_VAR, or the first of
+    CPP_LIB_FILENAMES shipped next to this module, or None.
+    """
+    path = os.environ.get(CPP_LIB_ENV_VAR)
+    if path:
+        return path
+    for filename in CPP_LIB_FILENAMES:
+        path = os.path.join(os.path.dirname(__file__), filename)
+        if os.path.isfile(path):
+            return path
+    return None
+
+def load_cpp_lib() -> bool:
+    """
+    Loads the library found by find_cpp_lib, unless one is loaded already.
+    A library that cannot be loaded is ignored and the pure Python implementation is used.
+    """
+    if CPP_LIB_PATH is None:
+        path = find_cpp_lib()
+        if path is not None:
+            try:
+                get_cpp_lib(path)
+            except (OSError, AttributeError):
+                pass
+    return check_cpp_lib_path()
 
 def check_cpp_lib_path() -> bool:
   return CPP_LIB_PATH is not None
@@ -59,6 +96,23 @@ def cpp_hash(left, right) -> int:
     return int.from_bytes(res.raw[:32], 'little', signed=False)
 
 
+def cpp_hash_batch(pairs) -> List[int]:
+    """
+    Hashes every (left, right) pair of pairs, reusing one output buffer for the whole batch.
+    """
+    lib_hash = CPP_LIB_PATH.Hash
+    res = ctypes.create_string_buffer(OUT_BUFFER_SIZE)
+    hashes = []
+    for left, right in pairs:
+        if lib_hash(
+                left.to_bytes(32, 'little', signed=False),
+                right.to_bytes(32, 'little', signed=False),
+                res) != 0:
+            raise ValueError(res.raw.rstrip(b'\00'))
+        hashes.append(int.from_bytes(res.raw[:32], 'little', signed=False))
+    return hashes
+
+
 def cpp_sign(msg_hash, priv_key, seed: Optional[int] = 32) -> ECSignature:
     """
     Note that this uses the secrets module to generate cryptographically strong random numbers.
@@ -77,6 +131,27 @@ def cpp_sign(msg_hash, priv_key, seed: Optional[int] = 32) -> ECSignature:
     return (int.from_bytes(res.raw[:32], 'little', signed=False), s)
 
 
+def cpp_sign_batch(msg_hashes, priv_key, seed: Optional[int] = 32) -> List[ECSignature]:
+    """
+    Signs every hash of msg_hashes with priv_key, like cpp_sign. The private key is encoded
+    once and one output buffer is reused for the whole batch.
+    """
+    lib_sign = CPP_LIB_PATH.Sign
+    res = ctypes.create_string_buffer(OUT_BUFFER_SIZE)
+    priv_key_bytes = priv_key.to_bytes(32, 'little', signed=False)
+    signatures = []
+    for msg_hash in msg_hashes:
+        if lib_sign(
+                priv_key_bytes,
+                msg_hash.to_bytes(32, 'little', signed=False),
+                secrets.token_bytes(seed), res) != 0:
+            raise ValueError(res.raw.rstrip(b'\00'))
+        raw = res.raw
+        w = int.from_bytes(raw[32:64], 'little', signed=False)
+        signatures.append((int.from_bytes(raw[:32], 'little', signed=False), inv_mod_curve_size(w)))
+    return signatures
+
+
 def cpp_verify(msg_hash, r, s, stark_key) -> bool:
     w =inv_mod_curve_size(s)
     assert 1 <= stark_key < 2**N_ELEMENT_BITS_ECDSA, 'stark_key = %s' % stark_key
@@ -88,3 +163,6 @@ def cpp_verify(msg_hash, r, s, stark_key) -> bool:
         msg_hash.to_bytes(32, 'little', signed=False),
         r.to_bytes(32, 'little', signed=False),
         w.to_bytes(32, 'little', signed=False))
+
+
+load_cpp_lib()
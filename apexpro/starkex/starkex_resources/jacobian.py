@@ -0,0 +1,217 @@
+"""Elliptic curve arithmetic in Jacobian coordinates.
+
+A Jacobian point (X, Y, Z) represents the affine point (X / Z**2, Y / Z**3). Additions and
+doublings need no modular inversion, so a whole scalar multiplication pays for a single inversion
+when the result is converted back to affine form.
+
+The functions mirror the affine ones in math_utils, including their assertions: ec_add asserts
+the x coordinates differ and ec_double asserts y != 0, and so do jacobian_add and
+jacobian_double. The x comparison is done projectively (X1 * Z2**2 == X2 * Z1**2).
+"""
+from typing import List, Sequence, Tuple
+
+from .math_utils import ECPoint, div_mod
+
+# A type that represents a point (X, Y, Z) on an elliptic curve in Jacobian coordinates.
+JacobianPoint = Tuple[int, int, int]
+
+
+def to_jacobian(point: ECPoint) -> JacobianPoint:
+    return point[0], point[1], 1
+
+
+def from_jacobian(point: JacobianPoint, p: int) -> ECPoint:
+    """
+    Converts a Jacobian point back to affine form (x, y). This is the only inversion.
+    """
+    x, y, z = point
+    if z == 1:
+        return x % p, y % p
+    z_inv = div_mod(1, z, p)
+    z_inv_squared = z_inv * z_inv % p
+    return x * z_inv_squared % p, y * z_inv_squared * z_inv % p
+
+
+def batch_from_jacobian(points: Sequence[JacobianPoint], p: int) -> List[ECPoint]:
+    """
+    Converts many Jacobian points back to affine form with a single inversion (Montgomery's
+    trick).
+    """
+    prefix_products = []
+    product = 1
+    for point in points:
+        prefix_products.append(product)
+        product = product * point[2] % p
+    inverse = div_mod(1, product, p)
+    affine_points = [None] * len(points)
+    for i in range(len(points) - 1, -1, -1):
+        x, y, z = points[i]
+        z_inv = inverse * prefix_products[i] % p
+        inverse = inverse * z % p
+        z_inv_squared = z_inv * z_inv % p
+        affine_points[i] = (x * z_inv_squared % p, y * z_inv_squared * z_inv % p)
+    return affine_points
+
+
+def jacobian_x_equals(point1: JacobianPoint, point2: JacobianPoint, p: int) -> bool:
+    """
+    Returns True if the two points have the same affine x coordinate.
+    """
+    z1_squared = point1[2] * point1[2]
+    z2_squared = point2[2] * point2[2]
+    return (point1[0] * z2_squared - point2[0] * z1_squared) % p == 0
+
+
+def jacobian_x_equals_affine(point1: JacobianPoint, point2: ECPoint, p: int) -> bool:
+    """
+    Returns True if the Jacobian point1 and the affine point2 have the same x coordinate.
+    """
+    return (point1[0] - point2[0] * point1[2] * point1[2]) % p == 0
+
+
+def jacobian_double(point: JacobianPoint, alpha: int, p: int) -> JacobianPoint:
+    """
+    Doubles a point on an elliptic curve with the equation y^2 = x^3 + alpha*x + beta mod p.
+    Assumes the point has y != 0, like ec_double.
+    """
+    x, y, z = point
+    assert y % p != 0
+    y_squared = y * y % p
+    s = 4 * x * y_squared % p
+    z_squared = z * z % p
+    m = (3 * x * x + alpha * z_squared * z_squared) % p
+    x3 = (m * m - 2 * s) % p
+    y3 = (m * (s - x3) - 8 * y_squared * y_squared) % p
+    z3 = 2 * y * z % p
+    return x3, y3, z3
+
+
+def jacobian_add(point1: JacobianPoint, point2: JacobianPoint, p: int) -> JacobianPoint:
+    """
+    Adds two Jacobian points. Assumes they have different x coordinates, like ec_add.
+    """
+    x1, y1, z1 = point1
+    x2, y2, z2 = point2
+    z1_squared = z1 * z1 % p
+    z2_squared = z2 * z2 % p
+    u1 = x1 * z2_squared % p
+    u2 = x2 * z1_squared % p
+    h = (u2 - u1) % p
+    assert h != 0
+    s1 = y1 * z2 * z2_squared % p
+    s2 = y2 * z1 * z1_squared % p
+    r = s2 - s1
+    h_squared = h * h % p
+    h_cubed = h * h_squared % p
+    v = u1 * h_squared % p
+    x3 = (r * r - h_cubed - 2 * v) % p
+    y3 = (r * (v - x3) - s1 * h_cubed) % p
+    z3 = z1 * z2 * h % p
+    return x3, y3, z3
+
+
+def jacobian_add_affine(point1: JacobianPoint, point2: ECPoint, p: int) -> JacobianPoint:
+    """
+    Adds an affine point to a Jacobian point (mixed addition).
+    Assumes they have different x coordinates, like ec_add.
+    """
+    x1, y1, z1 = point1
+    z1_squared = z1 * z1 % p
+    h = (point2[0] * z1_squared - x1) % p
+    assert h != 0
+    r = point2[1] * z1 * z1_squared - y1
+    h_squared = h * h % p
+    h_cubed = h * h_squared % p
+    v = x1 * h_squared % p
+    x3 = (r * r - h_cubed - 2 * v) % p
+    y3 = (r * (v - x3) - y1 * h_cubed) % p
+    z3 = z1 * h % p
+    return x3, y3, z3
+
+
+def jacobian_mult(m: int, point: ECPoint, alpha: int, p: int) -> ECPoint:
+    """
+    Multiplies by m a point on the elliptic curve with equation y^2 = x^3 + alpha*x + beta mod p.
+    Same contract and result as ec_mult: assumes 0 < m < order(point).
+    """
+    assert m > 0
+    result = to_jacobian(point)
+    for bit in bin(m)[3:]:
+        result = jacobian_double(result, alpha, p)
+        if bit == '1':
+            result = jacobian_add_affine(result, point, p)
+    return from_jacobian(result, p)
+
+
+def jacobian_fixed_base_mult(m: int, table: list, window_bits: int, p: int) -> ECPoint:
+    """
+    Multiplies by m the point that table was built for by ec_fixed_base_table, using one mixed
+    addition per nonzero window of m and a single final inversion.
+    Assumes 0 < m < order(point) and that m fits in the bits covered by the table.
+    The partial sums are always strictly smaller multiples than the next table entry, so the
+    additions never hit equal x coordinates.
+    """
+    n_digits = (1 << window_bits) - 1
+    assert m.bit_length() <= (len(table) // n_digits) * window_bits
+    result = None
+    offset = -1
+    while m:
+        digit = m & n_digits
+        if digit:
+            entry = table[offset + digit]
+            result = to_jacobian(entry) if result is None else jacobian_add_affine(
+                result, entry, p)
+        m >>= window_bits
+        offset += n_digits
+    return from_jacobian(result, p)
+
+
+def jacobian_mimic_ec_mult_air(
+        m: int, point: JacobianPoint, shift_point: JacobianPoint, n_bits: int, alpha: int,
+        p: int) -> JacobianPoint:
+    """
+    Computes m * point + shift_point in Jacobian coordinates using the same steps like the AIR,
+    and throws an AssertionError if and only if the affine mimic_ec_mult_air does.
+    """
+    assert 0 < m < 2**n_bits
+    partial_sum = shift_point
+    for _ in range(n_bits):
+        assert not jacobian_x_equals(partial_sum, point, p)
+        if m & 1:
+            partial_sum = jacobian_add(partial_sum, point, p)
+        point = jacobian_double(point, alpha, p)
+        m >>= 1
+    assert m == 0
+    return partial_sum
+
+
+def doubling_table(point: ECPoint, n_bits: int, alpha: int, p: int) -> List[ECPoint]:
+    """
+    Returns the affine points 2**i * point for 0 <= i < n_bits, i.e. every doubled point that
+    jacobian_mimic_ec_mult_air visits. Performs the same doublings as the AIR (including the last
+    one, whose result is unused), so it throws an AssertionError whenever they do.
+    """
+    doublings = [to_jacobian(point)]
+    for _ in range(n_bits):
+        doublings.append(jacobian_double(doublings[-1], alpha, p))
+    return batch_from_jacobian(doublings[:n_bits], p)
+
+
+def mimic_ec_mult_air_with_table(
+        m: int, doublings: Sequence[ECPoint], shift_point: JacobianPoint,
+        p: int) -> JacobianPoint:
+    """
+    Same as jacobian_mimic_ec_mult_air, for a point whose doubling_table is given. The doublings
+    are looked up instead of computed and are added with mixed additions; the checks are the
+    same, step by step.
+    """
+    n_bits = len(doublings)
+    assert 0 < m < 2**n_bits
+    partial_sum = shift_point
+    for point in doublings:
+        assert not jacobian_x_equals_affine(partial_sum, point, p)
+        if m & 1:
+            partial_sum = jacobian_add_affine(partial_sum, point, p)
+        m >>= 1
+    assert m == 0
+    return partial_sum
@@ -15,20 +15,31 @@
 ###############################################################################
 
 
+import sys
 from typing import Tuple
 
-import mpmath
-import sympy
-from sympy.core.numbers import igcdex
-
 # A type that represents a point (x,y) on an elliptic curve.
 ECPoint = Tuple[int, int]
 
+# The prime of the STARK field, 2**251 + 17 * 2**192 + 1. Square roots modulo this prime use a
+# Tonelli-Shanks with precomputed constants; other moduli fall back to sympy, if installed.
+STARK_FIELD_PRIME = 2**251 + 17 * 2**192 + 1
+# STARK_FIELD_PRIME - 1 == 2**_TS_TWO_ADICITY * _TS_ODD_FACTOR.
+_TS_TWO_ADICITY = 192
+_TS_ODD_FACTOR = 2**59 + 17
+# 3 generates the multiplicative group, so it is a quadratic non-residue.
+_TS_ROOT_OF_UNITY = pow(3, _TS_ODD_FACTOR, STARK_FIELD_PRIME)
+
+# pow(x, -1, p) computes modular inverses natively on Python 3.8+.
+_HAS_POW_INVERSE = sys.version_info >= (3, 8)
+
 
 def pi_as_string(digits: int) -> str:
     """
     Returns pi as a string of decimal digits without the decimal point ("314...").
     """
+    import mpmath
+
     mpmath.mp.dps = digits  # Set number of digits.
     return '3' + str(mpmath.mp.pi)[2:]
 
@@ -37,6 +48,12 @@ def is_quad_residue(n: int, p: int) -> bool:
     """
     Returns True if n is a quadratic residue mod p.
     """
+    if p == STARK_FIELD_PRIME:
+        # Euler's criterion.
+        n %= p
+        return n == 0 or pow(n, (p - 1) // 2, p) == 1
+    import sympy
+
     return sympy.is_quad_residue(n, p)
 
 
@@ -44,14 +61,68 @@ def sqrt_mod(n: int, p: int) -> int:
     """
     Finds the minimum positive integer m such that (m*m) % p == n
     """
+    if p == STARK_FIELD_PRIME:
+        root = _stark_field_sqrt(n % p)
+        return min(root, (p - root) % p)
+    import sympy
+
     return min(sympy.sqrt_mod(n, p, all_roots=True))
 
 
+def _stark_field_sqrt(n: int) -> int:
+    """
+    Tonelli-Shanks for STARK_FIELD_PRIME. Raises ValueError if n is not a quadratic residue.
+    """
+    p = STARK_FIELD_PRIME
+    if n == 0:
+        return 0
+    m = _TS_TWO_ADICITY
+    c = _TS_ROOT_OF_UNITY
+    t = pow(n, _TS_ODD_FACTOR, p)
+    root = pow(n, (_TS_ODD_FACTOR + 1) // 2, p)
+    while t != 1:
+        # Find the least i such that t**(2**i) == 1.
+        i = 0
+        t_power = t
+        while t_power != 1:
+            t_power = t_power * t_power % p
+            i += 1
+            if i == m:
+                raise ValueError('%s is not a quadratic residue' % n)
+        b = pow(c, 1 << (m - i - 1), p)
+        m = i
+        c = b * b % p
+        t = t * c % p
+        root = root * b % p
+    return root
+
+
+def _igcdex(a: int, b: int) -> Tuple[int, int, int]:
+    """
+    Returns (x, y, g) such that x * a + y * b == g == gcd(a, b), like sympy's igcdex.
+    """
+    x, y, r, s = 1, 0, 0, 1
+    while b:
+        q, c = divmod(a, b)
+        a, b = b, c
+        x, r = r, x - q * r
+        y, s = s, y - q * s
+    if a < 0:
+        return -x, -y, -a
+    return x, y, a
+
+
 def div_mod(n: int, m: int, p: int) -> int:
     """
     Finds a nonnegative integer 0 <= x < p such that (m * x) % p == n
     """
-    a, b, c = igcdex(m, p)
+    if _HAS_POW_INVERSE:
+        try:
+            return n * pow(m, -1, p) % p
+        except ValueError:
+            # m is not invertible mod p.
+            assert False, 'm = %s is not invertible mod %s' % (m, p)
+    a, b, c = _igcdex(m, p)
     assert c == 1
     return (n * a) % p
 
@@ -98,3 +169,26 @@ def ec_mult(m: int, point: ECPoint, alpha: int, p: int) -> ECPoint:
     if m % 2 == 0:
         return ec_mult(m // 2, ec_double(point, alpha, p), alpha, p)
     return ec_add(ec_mult(m - 1, point, alpha, p), point, p)
+
+
+def ec_fixed_base_table(point: ECPoint, window_bits: int, n_bits: int, alpha: int, p: int) -> list:
+    """
+    Precomputes d * 2**(window_bits * i) * point for every window i covering n_bits bits and
+    every nonzero digit d < 2**window_bits, flattened window by window.
+    """
+    n_digits = (1 << window_bits) - 1
+    table = []
+    base = point
+    for _ in range((n_bits + window_bits - 1) // window_bits):
+        multiple = base
+        table.append(multiple)
+        for digit in range(2, n_digits + 1):
+            if digit == 2:
+                multiple = ec_double(base, alpha, p)
+            else:
+                multiple = ec_add(multiple, base, p)
+            table.append(multiple)
+        # (2**window_bits - 1) * base + base.
+        base = ec_add(multiple, base, p)
+    return table
+
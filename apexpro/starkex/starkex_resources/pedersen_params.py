@@ -0,0 +1,125 @@
+"""Shared store for the curve parameters and constant points in pedersen_params.json.
+
+The JSON is parsed once, the first time a process needs it, and then saved as a point cache file
+(see point_cache) next to it. Later processes memory-map that file instead, so the pages are
+shared by every process on the host. The constant points are decoded one by one when they are
+used. The first records of the cache hold the scalar parameters:
+(FIELD_PRIME, FIELD_GEN), (ALPHA, BETA), (EC_ORDER, 0).
+"""
+import json
+import os
+import threading
+from typing import Optional
+
+from .math_utils import ECPoint
+from .point_cache import (
+    FIELD_ELEMENT_BYTES, POINT_BYTES, decode_points, encode_points, point_cache_tag,
+    read_point_cache, write_point_cache)
+
+PEDERSEN_HASH_POINT_FILENAME = os.path.join(
+    os.path.dirname(__file__), 'pedersen_params.json')
+PEDERSEN_PARAMS_CACHE_FILENAME = os.path.join(
+    os.path.dirname(__file__), 'pedersen_params.bin')
+N_SCALAR_RECORDS = 3
+
+_params_lock = threading.Lock()
+_params = None
+
+
+class ConstantPoints(object):
+    """
+    Read-only sequence of the Pedersen constant points, decoded from the parameter cache on
+    access. Supports len(), indexing, slicing and iteration like the list it replaces.
+    """
+
+    def __init__(self, data, offset: int, count: int):
+        self._data = data
+        self._offset = offset
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if step == 1:
+                return decode_points(
+                    self._data, self._offset + start * POINT_BYTES, max(stop - start, 0))
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('constant point index out of range')
+        start = self._offset + index * POINT_BYTES
+        middle = start + FIELD_ELEMENT_BYTES
+        return (int.from_bytes(self._data[start:middle], 'little'),
+                int.from_bytes(self._data[middle:start + POINT_BYTES], 'little'))
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+
+class PedersenParams(object):
+    def __init__(self, data):
+        (self.field_prime, self.field_gen), (self.alpha, self.beta), (self.ec_order, _) = \
+            decode_points(data, 0, N_SCALAR_RECORDS)
+        self.constant_points = ConstantPoints(
+            data, N_SCALAR_RECORDS * POINT_BYTES,
+            len(data) // POINT_BYTES - N_SCALAR_RECORDS)
+
+    def is_point_on_curve(self, point: ECPoint) -> bool:
+        x, y = point
+        return (y * y - (x * x * x + self.alpha * x + self.beta)) % self.field_prime == 0
+
+
+def _json_tag(filename: str) -> bytes:
+    stat = os.stat(filename)
+    return point_cache_tag('PEDERSEN_PARAMS', stat.st_size, stat.st_mtime_ns)
+
+
+def _parse_json(filename: str) -> list:
+    with open(filename) as f:
+        params = json.load(f)
+    return [
+        (params['FIELD_PRIME'], params['FIELD_GEN']),
+        (params['ALPHA'], params['BETA']),
+        (params['EC_ORDER'], 0),
+    ] + [tuple(point) for point in params['CONSTANT_POINTS']]
+
+
+def load_pedersen_params(
+        filename: str = PEDERSEN_HASH_POINT_FILENAME,
+        cache_filename: Optional[str] = PEDERSEN_PARAMS_CACHE_FILENAME) -> PedersenParams:
+    """
+    Loads the parameters from cache_filename if it was built from the current filename, and
+    otherwise parses filename and (re)writes the cache. A corrupted cache fails its digest and
+    is rebuilt rather than trusted; only the first constant point is decoded here, to check
+    that it lies on the curve.
+    """
+    tag = _json_tag(filename)
+    if cache_filename is not None:
+        data = read_point_cache(cache_filename, tag, memory_map=True)
+        if data is not None and len(data) > N_SCALAR_RECORDS * POINT_BYTES:
+            params = PedersenParams(data)
+            if params.is_point_on_curve(params.constant_points[0]):
+                return params
+    records = _parse_json(filename)
+    if cache_filename is not None and write_point_cache(cache_filename, tag, records):
+        data = read_point_cache(cache_filename, tag, memory_map=True)
+        if data is not None:
+            return PedersenParams(data)
+    return PedersenParams(encode_points(records))
+
+
+def get_pedersen_params() -> PedersenParams:
+    """
+    Returns the process-wide parameter store, loading it on first use.
+    """
+    global _params
+    if _params is None:
+        with _params_lock:
+            if _params is None:
+                _params = load_pedersen_params()
+    return _params
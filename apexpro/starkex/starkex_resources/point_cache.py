@@ -0,0 +1,140 @@
+"""On-disk cache for precomputed tables of elliptic curve points.
+
+A cache file holds a fixed header followed by the points, each stored as two
+fixed-width 32-byte little-endian integers (x, then y). The header carries a
+tag derived from the parameters the table was built from, so a stale or
+foreign file is detected and rebuilt instead of being trusted, and a SHA-256
+digest of the points, so a corrupted file is detected without decoding them.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from typing import Callable, List, Optional, Sequence
+
+from .math_utils import ECPoint
+
+POINT_CACHE_MAGIC = b'STKPTS\x00\x02'
+POINT_CACHE_HEADER = struct.Struct('<8s32sI32s')
+FIELD_ELEMENT_BYTES = 32
+POINT_BYTES = 2 * FIELD_ELEMENT_BYTES
+
+_cache_lock = threading.Lock()
+
+
+def point_cache_tag(*parameters) -> bytes:
+    """
+    Returns a 32-byte tag identifying a table built from the given parameters.
+    """
+    return hashlib.sha256(repr(parameters).encode()).digest()
+
+
+def encode_points(points: Sequence[ECPoint]) -> bytes:
+    return b''.join(
+        x.to_bytes(FIELD_ELEMENT_BYTES, 'little') + y.to_bytes(FIELD_ELEMENT_BYTES, 'little')
+        for x, y in points)
+
+
+def decode_points(data, offset: int = 0, count: Optional[int] = None) -> List[ECPoint]:
+    if count is None:
+        count = (len(data) - offset) // POINT_BYTES
+    points = []
+    for i in range(offset, offset + count * POINT_BYTES, POINT_BYTES):
+        points.append((
+            int.from_bytes(data[i:i + FIELD_ELEMENT_BYTES], 'little'),
+            int.from_bytes(data[i + FIELD_ELEMENT_BYTES:i + POINT_BYTES], 'little'),
+        ))
+    return points
+
+
+def read_point_cache(filename: str, tag: bytes, memory_map: bool = False):
+    """
+    Returns the raw point data stored in filename, or None if the file is missing, truncated,
+    corrupted or was built for a different tag. With memory_map the data is a read-only memoryview over a
+    shared mapping of the file instead of a private copy.
+    """
+    try:
+        with open(filename, 'rb') as f:
+            if memory_map:
+                data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            else:
+                data = f.read()
+    except (OSError, ValueError):
+        return None
+    if len(data) < POINT_CACHE_HEADER.size:
+        return None
+    magic, file_tag, count, digest = POINT_CACHE_HEADER.unpack_from(data)
+    if magic != POINT_CACHE_MAGIC or file_tag != tag:
+        return None
+    if len(data) != POINT_CACHE_HEADER.size + count * POINT_BYTES:
+        return None
+    points = data[POINT_CACHE_HEADER.size:]
+    if hashlib.sha256(points).digest() != digest:
+        return None
+    return points
+
+
+def write_point_cache(filename: str, tag: bytes, points: Sequence[ECPoint]) -> bool:
+    """
+    Atomically writes points to filename. Returns False if the directory is not writable, in
+    which case the caller keeps its in-memory copy only.
+    """
+    encoded = encode_points(points)
+    payload = POINT_CACHE_HEADER.pack(
+        POINT_CACHE_MAGIC, tag, len(points), hashlib.sha256(encoded).digest()) + encoded
+    directory = os.path.dirname(os.path.abspath(filename))
+    try:
+        fd, tmp_name = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.bin')
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, filename)
+    except OSError:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def load_point_buffer(
+        filename: str,
+        tag: bytes,
+        build: Callable[[], List[ECPoint]],
+        is_valid: Callable[[ECPoint], bool],
+        memory_map: bool = False,
+):
+    """
+    Loads the encoded points of a table from its cache file, or builds the table and stores it
+    for the next process. The file is checked against its digest, and its first point with
+    is_valid (e.g. that it lies on the curve) to catch a file of the wrong layout; the other
+    points are only decoded when they are used.
+    """
+    with _cache_lock:
+        data = read_point_cache(filename, tag, memory_map=memory_map)
+        if data is not None and (len(data) == 0 or is_valid(decode_points(data, 0, 1)[0])):
+            return data
+        points = build()
+        if write_point_cache(filename, tag, points) and memory_map:
+            data = read_point_cache(filename, tag, memory_map=True)
+            if data is not None:
+                return data
+        return encode_points(points)
+
+
+def load_point_table(
+        filename: str,
+        tag: bytes,
+        build: Callable[[], List[ECPoint]],
+        is_valid: Callable[[ECPoint], bool],
+) -> List[ECPoint]:
+    """
+    Same as load_point_buffer, but returns the decoded list of points.
+    """
+    return decode_points(load_point_buffer(filename, tag, build, is_valid))
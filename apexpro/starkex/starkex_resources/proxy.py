@@ -1,13 +1,26 @@
-from typing import Optional, Union
+import os
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple, Union
 
 from apexpro.starkex.starkex_resources.cpp_signature import check_cpp_lib_path
 from apexpro.starkex.starkex_resources.cpp_signature import cpp_hash
+from apexpro.starkex.starkex_resources.cpp_signature import cpp_hash_batch
+from apexpro.starkex.starkex_resources.cpp_signature import cpp_sign
+from apexpro.starkex.starkex_resources.cpp_signature import cpp_sign_batch
 from apexpro.starkex.starkex_resources.cpp_signature import cpp_verify
 from apexpro.starkex.starkex_resources.python_signature import ECPoint
 from apexpro.starkex.starkex_resources.python_signature import ECSignature
 from apexpro.starkex.starkex_resources.python_signature import py_pedersen_hash
 from apexpro.starkex.starkex_resources.python_signature import py_sign
 from apexpro.starkex.starkex_resources.python_signature import py_verify
+from apexpro.starkex.starkex_resources.python_signature import py_verify_batch
+
+# Number of distinct asset id combinations whose hash is kept by get_asset_hash.
+ASSET_HASH_CACHE_SIZE = 1024
+
+# cpp_sign() draws k at random instead of using RFC6979, so its signatures are valid but differ
+# from py_sign() for the same input. It is therefore only used when explicitly enabled.
+USE_CPP_SIGN = os.environ.get('APEXPRO_USE_CPP_SIGN', '').lower() in ('1', 'true', 'yes')
 
 
 def sign(
@@ -15,11 +28,23 @@ def sign(
     priv_key: int,
     seed: Optional[int] = None,
 ) -> ECSignature:
-    # Note: cpp_sign() is not optimized and is currently slower than py_sign().
-    #       So always use py_sign() for now.
+    if USE_CPP_SIGN and check_cpp_lib_path():
+        return cpp_sign(msg_hash=msg_hash, priv_key=priv_key)
+
     return py_sign(msg_hash=msg_hash, priv_key=priv_key, seed=seed)
 
 
+def sign_batch(
+    msg_hashes: Sequence[int],
+    priv_key: int,
+    seed: Optional[int] = None,
+) -> List[ECSignature]:
+    if USE_CPP_SIGN and check_cpp_lib_path():
+        return cpp_sign_batch(msg_hashes, priv_key)
+
+    return [py_sign(msg_hash=msg_hash, priv_key=priv_key, seed=seed) for msg_hash in msg_hashes]
+
+
 def verify(
     msg_hash: int,
     r: int,
@@ -32,8 +57,40 @@ def verify(
     return py_verify(msg_hash=msg_hash, r=r, s=s, public_key=public_key)
 
 
+def verify_batch(
+    signatures: Sequence[Tuple[int, int, int]],
+    public_key: Union[int, ECPoint],
+) -> List[bool]:
+    if check_cpp_lib_path():
+        return [
+            cpp_verify(msg_hash=msg_hash, r=r, s=s, stark_key=public_key)
+            for msg_hash, r, s in signatures
+        ]
+
+    return py_verify_batch(signatures=signatures, public_key=public_key)
+
+
 def get_hash(*elements: int) -> int:
     if check_cpp_lib_path():
         return cpp_hash(*elements)
 
     return py_pedersen_hash(*elements)
+
+
+def get_hash_batch(pairs: Sequence[Tuple[int, int]]) -> List[int]:
+    if check_cpp_lib_path():
+        return cpp_hash_batch(pairs)
+
+    return [py_pedersen_hash(left, right) for left, right in pairs]
+
+
+@lru_cache(maxsize=ASSET_HASH_CACHE_SIZE)
+def get_asset_hash(*asset_ids: int) -> int:
+    """
+    Left-folded hash of asset ids, e.g. get_hash(get_hash(sell, buy), fee) for three ids.
+    These sub-hashes only depend on the market, so they are computed once per combination.
+    """
+    result = asset_ids[0]
+    for asset_id in asset_ids[1:]:
+        result = get_hash(result, asset_id)
+    return result
@@ -15,26 +15,30 @@
 ###############################################################################
 
 import hashlib
-import json
 import math
 import os
 import random
-from typing import Optional, Tuple, Union
-
-from ecdsa.rfc6979 import generate_k
-
-from .math_utils import ECPoint, div_mod, ec_add, ec_double, ec_mult, is_quad_residue, sqrt_mod
-
-PEDERSEN_HASH_POINT_FILENAME = os.path.join(
-    os.path.dirname(__file__), 'pedersen_params.json')
-PEDERSEN_PARAMS = json.load(open(PEDERSEN_HASH_POINT_FILENAME))
-
-FIELD_PRIME = PEDERSEN_PARAMS['FIELD_PRIME']
-FIELD_GEN = PEDERSEN_PARAMS['FIELD_GEN']
-ALPHA = PEDERSEN_PARAMS['ALPHA']
-BETA = PEDERSEN_PARAMS['BETA']
-EC_ORDER = PEDERSEN_PARAMS['EC_ORDER']
-CONSTANT_POINTS = PEDERSEN_PARAMS['CONSTANT_POINTS']
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple, Union
+
+from .math_utils import (
+    ECPoint, div_mod, ec_fixed_base_table, is_quad_residue, sqrt_mod)
+from .jacobian import (
+    doubling_table, from_jacobian, jacobian_add, jacobian_add_affine, jacobian_fixed_base_mult,
+    jacobian_mimic_ec_mult_air, jacobian_x_equals_affine, mimic_ec_mult_air_with_table,
+    to_jacobian)
+from .pedersen_params import get_pedersen_params
+from .pedersen_table import PedersenTable, build_pedersen_table_points
+from .point_cache import load_point_buffer, load_point_table, point_cache_tag
+
+PEDERSEN_PARAMS = get_pedersen_params()
+
+FIELD_PRIME = PEDERSEN_PARAMS.field_prime
+FIELD_GEN = PEDERSEN_PARAMS.field_gen
+ALPHA = PEDERSEN_PARAMS.alpha
+BETA = PEDERSEN_PARAMS.beta
+EC_ORDER = PEDERSEN_PARAMS.ec_order
+CONSTANT_POINTS = PEDERSEN_PARAMS.constant_points
 
 N_ELEMENT_BITS_ECDSA = math.floor(math.log(FIELD_PRIME, 2))
 assert N_ELEMENT_BITS_ECDSA == 251
@@ -49,10 +53,30 @@ SHIFT_POINT = CONSTANT_POINTS[0]
 MINUS_SHIFT_POINT = (SHIFT_POINT[0], FIELD_PRIME - SHIFT_POINT[1])
 EC_GEN = CONSTANT_POINTS[1]
 
-assert SHIFT_POINT == [0x49ee3eba8c1600700ee1b87eb599f16716b0b1022947733551fde4050ca6804,
-                       0x3ca0cfe4b3bc6ddf346d49d06ea0ed34e621062c0e056c1d0405d266e10268a]
-assert EC_GEN == [0x1ef15c18599971b7beced415a40f0c7deacfd9b0d1819e03d723d8bc943cfca,
-                  0x5668060aa49730b7be4801df46ec62de53ecd11abe43a32873000c36e8dc1f]
+assert SHIFT_POINT == (0x49ee3eba8c1600700ee1b87eb599f16716b0b1022947733551fde4050ca6804,
+                       0x3ca0cfe4b3bc6ddf346d49d06ea0ed34e621062c0e056c1d0405d266e10268a)
+assert EC_GEN == (0x1ef15c18599971b7beced415a40f0c7deacfd9b0d1819e03d723d8bc943cfca,
+                  0x5668060aa49730b7be4801df46ec62de53ecd11abe43a32873000c36e8dc1f)
+
+# Fixed-base table for multiplications of EC_GEN (signing and key derivation). It is built on
+# first use and cached next to the Pedersen parameters, so later processes just load it.
+EC_GEN_TABLE_WINDOW_BITS = 4
+EC_GEN_TABLE_FILENAME = os.path.join(os.path.dirname(__file__), 'ec_gen_table.bin')
+_ec_gen_table = None
+
+# Windowed Pedersen hash tables, built on first use and cached next to the parameters as well.
+# 8-bit windows halve the number of additions at the cost of a ~2MB table; memory-mapping the
+# cache file lets every signer process on the host share one copy.
+PEDERSEN_TABLE_WINDOW_BITS = 4
+PEDERSEN_TABLE_MEMORY_MAP = False
+_pedersen_table = None
+
+# Verification walks the doublings 2**i * P of EC_GEN and of the public key. They are computed
+# once for EC_GEN, and kept for the most recently verified public keys, together with the
+# decompressed points of stark keys given by x coordinate only.
+_ec_gen_doublings = None
+PUBLIC_KEY_CACHE_SIZE = 1024
+PUBLIC_KEY_DOUBLINGS_CACHE_SIZE = 64
 
 
 #########
@@ -83,14 +107,77 @@ def get_y_coordinate(stark_key_x_coordinate: int) -> int:
     return sqrt_mod(y_squared, FIELD_PRIME)
 
 
+@lru_cache(maxsize=PUBLIC_KEY_CACHE_SIZE)
+def decompress_public_key(stark_key: int) -> Tuple[ECPoint, ...]:
+    """
+    Returns the two points on the curve whose x coordinate is stark_key, y first and -y second
+    (see get_y_coordinate), or an empty tuple if stark_key is not a valid x coordinate.
+    """
+    try:
+        y = get_y_coordinate(stark_key)
+    except InvalidPublicKeyError:
+        return ()
+    assert pow(y, 2, FIELD_PRIME) == (
+        pow(stark_key, 3, FIELD_PRIME) + ALPHA * stark_key + BETA) % FIELD_PRIME
+    return (stark_key, y), (stark_key, (-y) % FIELD_PRIME)
+
+
 def get_random_private_key() -> int:
     # NOTE: It is IMPORTANT to use a strong random function here.
     return random.randint(1, EC_ORDER - 1)
 
 
+def is_point_on_curve(point: ECPoint) -> bool:
+    x, y = point
+    return (y * y - (x * x * x + ALPHA * x + BETA)) % FIELD_PRIME == 0
+
+
+def get_ec_gen_table() -> list:
+    """
+    Returns the fixed-base table of EC_GEN, loading it from (or building it into) the cache file.
+    """
+    global _ec_gen_table
+    if _ec_gen_table is None:
+        tag = point_cache_tag('EC_GEN', EC_GEN, EC_GEN_TABLE_WINDOW_BITS, EC_ORDER, FIELD_PRIME)
+        _ec_gen_table = load_point_table(
+            EC_GEN_TABLE_FILENAME,
+            tag,
+            lambda: ec_fixed_base_table(
+                EC_GEN, EC_GEN_TABLE_WINDOW_BITS, EC_ORDER.bit_length(), ALPHA, FIELD_PRIME),
+            is_point_on_curve,
+        )
+    return _ec_gen_table
+
+
+def ec_gen_mult(m: int) -> ECPoint:
+    """
+    Computes m * EC_GEN using the precomputed fixed-base table.
+    Gives the same point as ec_mult(m, EC_GEN, ALPHA, FIELD_PRIME).
+    """
+    assert 0 < m < EC_ORDER
+    return jacobian_fixed_base_mult(
+        m, get_ec_gen_table(), EC_GEN_TABLE_WINDOW_BITS, FIELD_PRIME)
+
+
+def get_ec_gen_doubling_table() -> List[ECPoint]:
+    global _ec_gen_doublings
+    if _ec_gen_doublings is None:
+        _ec_gen_doublings = doubling_table(EC_GEN, N_ELEMENT_BITS_ECDSA, ALPHA, FIELD_PRIME)
+    return _ec_gen_doublings
+
+
+@lru_cache(maxsize=PUBLIC_KEY_DOUBLINGS_CACHE_SIZE)
+def get_public_key_doubling_table(public_key: ECPoint) -> List[ECPoint]:
+    """
+    Returns the doublings of public_key used by verification, see doubling_table.
+    Raises AssertionError if the AIR fails to double it.
+    """
+    return doubling_table(public_key, N_ELEMENT_BITS_ECDSA, ALPHA, FIELD_PRIME)
+
+
 def private_key_to_ec_point_on_stark_curve(priv_key: int) -> ECPoint:
     assert 0 < priv_key < EC_ORDER
-    return ec_mult(priv_key, EC_GEN, ALPHA, FIELD_PRIME)
+    return ec_gen_mult(priv_key)
 
 
 def private_to_stark_key(priv_key: int) -> int:
@@ -102,6 +189,10 @@ def inv_mod_curve_size(x: int) -> int:
 
 
 def generate_k_rfc6979(msg_hash: int, priv_key: int, seed: Optional[int] = None) -> int:
+    # Importing ecdsa precomputes its own curves, which takes about half a second, so it is
+    # deferred until the first signature.
+    from ecdsa.rfc6979 import generate_k
+
     # Pad the message hash, for consistency with the elliptic.js library.
     if 1 <= msg_hash.bit_length() % 8 <= 4 and msg_hash.bit_length() >= 248:
         # Only if we are one-nibble short:
@@ -142,7 +233,7 @@ def py_sign(msg_hash: int, priv_key: int, seed: Optional[int] = None) -> ECSigna
             seed += 1
 
         # Cannot fail because 0 < k < EC_ORDER and EC_ORDER is prime.
-        x = ec_mult(k, EC_GEN, ALPHA, FIELD_PRIME)[0]
+        x = ec_gen_mult(k)[0]
 
         # DIFF: in classic ECDSA, we take int(x) % n.
         r = int(x)
@@ -168,16 +259,11 @@ def mimic_ec_mult_air(m: int, point: ECPoint, shift_point: ECPoint) -> ECPoint:
     Computes m * point + shift_point using the same steps like the AIR and throws an exception if
     and only if the AIR errors.
     """
-    assert 0 < m < 2**N_ELEMENT_BITS_ECDSA
-    partial_sum = shift_point
-    for _ in range(N_ELEMENT_BITS_ECDSA):
-        assert partial_sum[0] != point[0]
-        if m & 1:
-            partial_sum = ec_add(partial_sum, point, FIELD_PRIME)
-        point = ec_double(point, ALPHA, FIELD_PRIME)
-        m >>= 1
-    assert m == 0
-    return partial_sum
+    return from_jacobian(
+        jacobian_mimic_ec_mult_air(
+            m, to_jacobian(point), to_jacobian(shift_point), N_ELEMENT_BITS_ECDSA, ALPHA,
+            FIELD_PRIME),
+        FIELD_PRIME)
 
 
  # Starkware crypto functions implemented in Python.
@@ -188,34 +274,47 @@ def mimic_ec_mult_air(m: int, point: ECPoint, shift_point: ECPoint) -> ECPoint:
  # Changes made by dYdX to function name only.
 
 def py_verify(msg_hash: int, r: int, s: int, public_key: Union[int, ECPoint]) -> bool:
-    # Compute w = s^-1 (mod EC_ORDER).
-    assert 1 <= s < EC_ORDER, 's = %s' % s
-    w = inv_mod_curve_size(s)
+    return py_verify_batch([(msg_hash, r, s)], public_key)[0]
 
-    # Preassumptions:
-    # DIFF: in classic ECDSA, we assert 1 <= r, w <= EC_ORDER-1.
-    # Since r, w < 2**N_ELEMENT_BITS_ECDSA < EC_ORDER, we only need to verify r, w != 0.
-    assert 1 <= r < 2**N_ELEMENT_BITS_ECDSA, 'r = %s' % r
-    assert 1 <= w < 2**N_ELEMENT_BITS_ECDSA, 'w = %s' % w
-    assert 0 <= msg_hash < 2**N_ELEMENT_BITS_ECDSA, 'msg_hash = %s' % msg_hash
 
+def py_verify_batch(
+        signatures: Sequence[Tuple[int, int, int]],
+        public_key: Union[int, ECPoint]) -> List[bool]:
+    """
+    Verifies many (msg_hash, r, s) signatures of one public key, and returns one result for each
+    like py_verify. The public key is decompressed and its doublings computed once for the batch
+    (and cached for later calls).
+    """
     if isinstance(public_key, int):
         # Only the x coordinate of the point is given, check the two possibilities for the y
         # coordinate.
-        try:
-            y = get_y_coordinate(public_key)
-        except InvalidPublicKeyError:
-            return False
-        assert pow(y, 2, FIELD_PRIME) == (
-            pow(public_key, 3, FIELD_PRIME) + ALPHA * public_key + BETA) % FIELD_PRIME
-        return py_verify(msg_hash, r, s, (public_key, y)) or \
-            py_verify(msg_hash, r, s, (public_key, (-y) % FIELD_PRIME))
+        public_key_points = decompress_public_key(public_key)
     else:
         # The public key is provided as a point.
         # Verify it is on the curve.
         assert (public_key[1]**2 - (public_key[0]**3 + ALPHA *
                                     public_key[0] + BETA)) % FIELD_PRIME == 0
+        public_key_points = ((public_key[0], public_key[1]),)
+
+    results = []
+    for msg_hash, r, s in signatures:
+        # Compute w = s^-1 (mod EC_ORDER).
+        assert 1 <= s < EC_ORDER, 's = %s' % s
+        w = inv_mod_curve_size(s)
+
+        # Preassumptions:
+        # DIFF: in classic ECDSA, we assert 1 <= r, w <= EC_ORDER-1.
+        # Since r, w < 2**N_ELEMENT_BITS_ECDSA < EC_ORDER, we only need to verify r, w != 0.
+        assert 1 <= r < 2**N_ELEMENT_BITS_ECDSA, 'r = %s' % r
+        assert 1 <= w < 2**N_ELEMENT_BITS_ECDSA, 'w = %s' % w
+        assert 0 <= msg_hash < 2**N_ELEMENT_BITS_ECDSA, 'msg_hash = %s' % msg_hash
+
+        results.append(any(
+            _verify_with_point(msg_hash, r, w, point) for point in public_key_points))
+    return results
 
+
+def _verify_with_point(msg_hash: int, r: int, w: int, public_key: ECPoint) -> bool:
     # Signature validation.
     # DIFF: original formula is:
     # x = (w*msg_hash)*EC_GEN + (w*r)*public_key
@@ -224,11 +323,17 @@ def py_verify(msg_hash: int, r: int, s: int, public_key: Union[int, ECPoint]) ->
     # While both mathematically equivalent, one might error while the other doesn't,
     # given the current implementation.
     # This formula ensures that if the verification errors in our AIR, it errors here as well.
+    # The steps run in Jacobian coordinates, with a single inversion at the end, and the
+    # doublings of EC_GEN and of the public key come from their tables.
     try:
-        zG = mimic_ec_mult_air(msg_hash, EC_GEN, MINUS_SHIFT_POINT)
-        rQ = mimic_ec_mult_air(r, public_key, SHIFT_POINT)
-        wB = mimic_ec_mult_air(w, ec_add(zG, rQ, FIELD_PRIME), SHIFT_POINT)
-        x = ec_add(wB, MINUS_SHIFT_POINT, FIELD_PRIME)[0]
+        zG = mimic_ec_mult_air_with_table(
+            msg_hash, get_ec_gen_doubling_table(), to_jacobian(MINUS_SHIFT_POINT), FIELD_PRIME)
+        rQ = mimic_ec_mult_air_with_table(
+            r, get_public_key_doubling_table(public_key), to_jacobian(SHIFT_POINT), FIELD_PRIME)
+        wB = jacobian_mimic_ec_mult_air(
+            w, jacobian_add(zG, rQ, FIELD_PRIME), to_jacobian(SHIFT_POINT),
+            N_ELEMENT_BITS_ECDSA, ALPHA, FIELD_PRIME)
+        x = from_jacobian(jacobian_add_affine(wB, MINUS_SHIFT_POINT, FIELD_PRIME), FIELD_PRIME)[0]
     except AssertionError:
         return False
 
@@ -251,20 +356,66 @@ def py_pedersen_hash(*elements: int) -> int:
     return pedersen_hash_as_point(*elements)[0]
 
 
+def configure_pedersen_table(window_bits: int = 4, memory_map: bool = False):
+    """
+    Selects the window size (4 or 8 bits) of the Pedersen hash tables and whether their cache
+    file is memory-mapped. Takes effect on the next hash.
+    """
+    global PEDERSEN_TABLE_WINDOW_BITS, PEDERSEN_TABLE_MEMORY_MAP, _pedersen_table
+    assert window_bits in (4, 8), 'window_bits = %s' % window_bits
+    PEDERSEN_TABLE_WINDOW_BITS = window_bits
+    PEDERSEN_TABLE_MEMORY_MAP = memory_map
+    _pedersen_table = None
+
+
+def get_pedersen_table() -> PedersenTable:
+    global _pedersen_table
+    if _pedersen_table is None:
+        window_bits = PEDERSEN_TABLE_WINDOW_BITS
+        n_elements = (len(CONSTANT_POINTS) - 2) // N_ELEMENT_BITS_HASH
+        tag = point_cache_tag(
+            'PEDERSEN', window_bits, N_ELEMENT_BITS_HASH, FIELD_PRIME,
+            CONSTANT_POINTS[2], CONSTANT_POINTS[-1])
+        data = load_point_buffer(
+            os.path.join(os.path.dirname(__file__), 'pedersen_table_w%d.bin' % window_bits),
+            tag,
+            lambda: build_pedersen_table_points(
+                CONSTANT_POINTS[2:], n_elements, N_ELEMENT_BITS_HASH, window_bits, FIELD_PRIME),
+            is_point_on_curve,
+            memory_map=PEDERSEN_TABLE_MEMORY_MAP,
+        )
+        _pedersen_table = PedersenTable(data, n_elements, N_ELEMENT_BITS_HASH, window_bits)
+    return _pedersen_table
+
+
 def pedersen_hash_as_point(*elements: int) -> ECPoint:
     """
     Similar to pedersen_hash but also returns the y coordinate of the resulting EC point.
     This function is used for testing.
     """
-    point = SHIFT_POINT
+    table = get_pedersen_table()
+    if len(elements) <= table.n_elements:
+        try:
+            return table.hash_as_point(SHIFT_POINT, elements, FIELD_PRIME)
+        except AssertionError:
+            # Colliding partial sums; let the bitwise hash decide.
+            pass
+    return pedersen_hash_as_point_bitwise(*elements)
+
+
+def pedersen_hash_as_point_bitwise(*elements: int) -> ECPoint:
+    """
+    Reference Pedersen hash, adding the constant points one bit at a time.
+    """
+    point = to_jacobian(SHIFT_POINT)
     for i, x in enumerate(elements):
         assert 0 <= x < FIELD_PRIME
         point_list = CONSTANT_POINTS[2 + i * N_ELEMENT_BITS_HASH:2 + (i + 1) * N_ELEMENT_BITS_HASH]
         assert len(point_list) == N_ELEMENT_BITS_HASH
         for pt in point_list:
-            assert point[0] != pt[0], 'Unhashable input.'
+            assert not jacobian_x_equals_affine(point, pt, FIELD_PRIME), 'Unhashable input.'
             if x & 1:
-                point = ec_add(point, pt, FIELD_PRIME)
+                point = jacobian_add_affine(point, pt, FIELD_PRIME)
             x >>= 1
         assert x == 0
-    return point
+    return from_jacobian(point, FIELD_PRIME)
@@ -11,6 +11,7 @@ from apexpro.starkex.constants import TRANSFER_MAX_AMOUNT_FEE
 from apexpro.starkex.helpers import nonce_from_client_id
 from apexpro.starkex.helpers import to_quantums_exact
 from apexpro.starkex.signable import Signable
+from apexpro.starkex.starkex_resources.proxy import get_asset_hash
 from apexpro.starkex.starkex_resources.proxy import get_hash
 
 StarkwareTransfer = namedtuple(
@@ -84,7 +85,7 @@ class SignableTransfer(Signable):
         """Calculate the hash of the Starkware order."""
         # TODO: Check values are in bounds
 
-        asset_ids = get_hash(
+        asset_ids = get_asset_hash(
             self.collateral_asset_id,
             TRANSFER_FEE_ASSET_ID,
         )
@@ -1,34 +1,201 @@
 import json
+import threading
+import zlib
+
+import websocket
 
 from ._websocket_stream import _identify_ws_method, _make_public_kwargs, _WebSocketManager, \
     _ApexWebSocketManager, PUBLIC_WSS, PRIVATE_WSS
+from .helpers.conflation import AllTickerState, Conflator, DepthState, TickerState
+from .order_book import OrderBook
 
 from concurrent.futures import ThreadPoolExecutor
 
 
 
 class WebSocket(_ApexWebSocketManager):
-    def __init__(self, **kwargs):
+    """
+    Public topics are spread over public_connections connections by a hash of their symbol
+    (the last part of the topic), so that all the topics of a symbol share a connection. A
+    connection is opened when its first topic is subscribed. With max_topics_per_connection,
+    topics that do not fit on the connection of their symbol go to the least loaded one, and
+    to new connections once all are full.
+
+    Frames are parsed with the json module; pass decoder='orjson' or 'msgspec' for a faster
+    parser (or any function of a str or bytes frame), see helpers.decoders.
+    """
+
+    def __init__(self, public_connections=1, max_topics_per_connection=None, **kwargs):
         super().__init__(**kwargs)
 
+        self.public_connections = public_connections
+        self.max_topics_per_connection = max_topics_per_connection
+        # The public connections, by slot, and the slot of each public topic.
+        self.ws_public_pool = [None] * public_connections
+        self.public_topics = {}
+        self._public_lock = threading.RLock()
+        # The first public connection opened.
         self.ws_public = None
         self.ws_private = None
-        self.kwargs = kwargs
+        # The connections report their events here, see _on_event.
+        self.kwargs = dict(kwargs, event_callback=self._on_event)
         self.public_kwargs = _make_public_kwargs(self.kwargs)
 
+        # Books maintained by order_book_stream(), and the callbacks passed for them, by topic.
+        self.order_books = {}
+        self.order_book_callbacks = {}
+        # Merges the messages of conflated streams, created by the first of them.
+        self.conflator = None
+
+    def _on_event(self, event):
+        """
+        Passes connection events to event_callback. The order books of a dropped public
+        connection are reset, with a 'gap' event each, so that they are not read stale until
+        the subscriptions replayed on reconnect bring new snapshots.
+        """
+        self._emit(event)
+        if event['event'] == 'disconnect' and not event['private']:
+            # A copy, since order_book_stream() may add a book from another thread meanwhile.
+            for topic, book in list(self.order_books.items()):
+                if topic not in event['topics']:
+                    continue
+                book.reset()
+                self._emit({'event': 'gap', 'topic': topic, 'reason': 'disconnect'})
+
+    def _then(self, result, callback):
+        """
+        Passes the result of a subscription to callback and returns its result, so that
+        WebSocketAsync, whose subscriptions are awaitable, can chain on them.
+        """
+        return callback(result)
+
+    def _conflate(self, arg, state, callback, conflate):
+        """
+        Registers a conflated stream and returns the callback merging its messages. conflate is
+        the minimum number of seconds between two calls of callback, or True to only call it
+        from flush_conflated().
+        """
+        if self.conflator is None:
+            self.conflator = Conflator()
+        interval = None if conflate is True else conflate
+        self.conflator.register(arg, state, callback, interval)
+        return lambda message: self.conflator.update(arg, message)
+
+    def flush_conflated(self, topic=None):
+        """
+        Calls the callbacks of the conflated streams (or of topic) that changed since their last
+        call with their latest state, on the calling thread.
+        """
+        if self.conflator is not None:
+            self.conflator.flush(topic)
+
+    def latest(self, topic):
+        """
+        The latest merged state of a conflated stream, e.g. 'instrumentInfo.H.BTCUSDC', or None
+        if topic is not conflated.
+        """
+        if self.conflator is None:
+            return None
+        return self.conflator.latest(topic)
+
+    def _public_slot(self, topic):
+        """
+        The slot in ws_public_pool of the connection of topic, assigned on first use.
+        """
+        with self._public_lock:
+            slot = self.public_topics.get(topic)
+            if slot is not None:
+                return slot
+            symbol = topic.rsplit(".", 1)[-1]
+            preferred = zlib.crc32(symbol.encode()) % self.public_connections
+            slot = preferred
+            limit = self.max_topics_per_connection
+            if limit is not None:
+                loads = [0] * len(self.ws_public_pool)
+                for assigned in self.public_topics.values():
+                    loads[assigned] += 1
+                if loads[preferred] >= limit:
+                    slot = min(range(len(loads)), key=loads.__getitem__)
+                    if loads[slot] >= limit:
+                        slot = len(self.ws_public_pool)
+                        self.ws_public_pool.append(None)
+            self.public_topics[topic] = slot
+            return slot
+
+    def _release_public_topic(self, topic, result=None):
+        """
+        Frees the slot of an unsubscribed topic, so that it no longer counts against
+        max_topics_per_connection, and returns result.
+        """
+        with self._public_lock:
+            self.public_topics.pop(topic, None)
+        return result
+
+    def _on_public_connection(self, topic, call):
+        """
+        Returns call(manager) for the connection of topic, opening it first if needed. The
+        connection is opened outside the lock, so that subscriptions to the other connections
+        do not wait for it; those to the same connection wait for it to open.
+        """
+        slot = self._public_slot(topic)
+        with self._public_lock:
+            manager = self.ws_public_pool[slot]
+            created = manager is None
+            if created:
+                manager = self.ws_public_pool[slot] = _ApexWebSocketManager(**self.public_kwargs)
+                if self.ws_public is None:
+                    self.ws_public = manager
+        if created:
+            try:
+                manager._connect(self.endpoint + PUBLIC_WSS)
+            except Exception:
+                with self._public_lock:
+                    if self.ws_public_pool[slot] is manager:
+                        self.ws_public_pool[slot] = None
+                    if self.ws_public is manager:
+                        self.ws_public = None
+                raise
+        elif not manager._opened.wait(manager.connect_timeout):
+            raise websocket.WebSocketTimeoutException("Connection failed.")
+        return call(manager)
+
     def _ws_public_subscribe(self, sendStr, topic, callback):
-        if not self.ws_public:
-            self.ws_public = _ApexWebSocketManager(
-                **self.public_kwargs)
-            self.ws_public._connect(self.endpoint + PUBLIC_WSS)
-        self.ws_public.subscribe(sendStr, topic, callback)
+        return self._on_public_connection(
+            topic, lambda manager: manager.subscribe(sendStr, topic, callback))
+
+    def _gather(self, results):
+        return results
+
+    def public_topics_stream(self, callback, args):
+        """
+        Subscribes callback to every public topic in args, e.g. ["orderBook25.H.BTCUSDC",
+        "recentlyTrade.H.ETHUSDC"], with one subscribe message per connection.
+        """
+        by_slot = {}
+        for arg in args:
+            by_slot.setdefault(self._public_slot(arg), []).append(arg)
+        return self._gather([
+            self._on_public_connection(
+                topics[0], lambda manager, topics=topics: manager.subscribe_many(topics, callback))
+            for topics in by_slot.values()
+        ])
+
+    def close(self):
+        """
+        Closes every connection.
+        """
+        for manager in self.ws_public_pool + [self.ws_private]:
+            if manager is not None:
+                manager.exit()
+        if self.conflator is not None:
+            self.conflator.close()
 
     def _ws_private_subscribe(self,topic, callback):
         if not self.ws_private:
             self.ws_private = _ApexWebSocketManager(
                 **self.kwargs)
             self.ws_private._connect(self.endpoint + PRIVATE_WSS)
-        self.ws_private.subscribe("", topic, callback)
+        return self.ws_private.subscribe("", topic, callback)
 
     def custom_topic_stream(self, topic, callback, wss_url):
         subscribe = _identify_ws_method(
@@ -37,20 +204,64 @@ class WebSocket(_ApexWebSocketManager):
                 PUBLIC_WSS: self._ws_public_subscribe,
                 PRIVATE_WSS: self._ws_private_subscribe
             })
-        subscribe(topic, callback)
+        return subscribe(topic, callback)
 
-    def depth_stream(self, callback, symbol, limit):
+    def depth_stream(self, callback, symbol, limit, conflate=False):
         """
+        With conflate (seconds, or True for flush_conflated()), the stream is kept in an
+        OrderBook (see order_book_stream) and callback gets a snapshot message of the whole
+        book at most once per conflate seconds, instead of every delta.
         https://api-docs.pro.apex.exchange/#public-websocket-depth
         """
         arg = "orderBook" + str(limit) + ".H." + symbol
+        if conflate:
+            update = self._conflate(
+                arg, DepthState(arg, self.order_books.get(arg)), callback, conflate)
+            return self.order_book_stream(symbol, limit, callback=update)
         topic = \
             {
                 "op": "subscribe",
                 "args": [arg]
             }
         topicStr = json.dumps(topic, sort_keys=True, separators=(",", ":"))
-        self._ws_public_subscribe(topicStr, arg, callback)
+        return self._ws_public_subscribe(topicStr, arg, callback)
+
+    def order_book_stream(self, symbol, limit=25, callback=None):
+        """
+        Maintains an OrderBook of symbol from the depth stream and returns it. The book is
+        updated on the WebSocket thread, and callback (if given) is called with it after every
+        update. When an update id is skipped, the topic is unsubscribed and subscribed again to
+        get a new snapshot, and a 'gap' event is passed to event_callback. Calling it again for
+        the same book adds callback to the book, which is only subscribed once.
+        https://api-docs.pro.apex.exchange/#public-websocket-depth
+        """
+        arg = "orderBook" + str(limit) + ".H." + symbol
+        book = self.order_books.get(arg)
+        if book is not None:
+            if callback is not None:
+                self.order_book_callbacks[arg].append(callback)
+            return self._then(None, lambda _: book)
+        callbacks = self.order_book_callbacks[arg] = [] if callback is None else [callback]
+        book = self.order_books[arg] = OrderBook(symbol)
+
+        def handle(message):
+            synced = book.synced
+            if book.apply(message):
+                if len(callbacks) == 1:
+                    return callbacks[0](book)
+                if callbacks:
+                    return self._gather([callback(book) for callback in list(callbacks)])
+            elif synced and not book.synced:
+                self._emit({'event': 'gap', 'topic': arg, 'reason': 'sequence'})
+                return self._then(self.unsub_depth_topic_stream(handle, arg),
+                                  lambda _: self.depth_topic_stream(handle, arg))
+
+        return self._then(self.depth_topic_stream(handle, arg), lambda _: book)
+
+    def order_book(self, symbol, limit=25):
+        """The OrderBook of symbol started by order_book_stream(), or None."""
+        return self.order_books.get("orderBook" + str(limit) + ".H." + symbol)
+
     def unsub_depth_topic_stream(self, callback, arg):
         """
         https://api-docs.pro.apex.exchange/#public-websocket-depth
@@ -61,7 +272,8 @@ class WebSocket(_ApexWebSocketManager):
                 "args": [arg]
             }
         topicStr = json.dumps(topic, sort_keys=True, separators=(",", ":"))
-        self._ws_public_subscribe(topicStr, arg, callback)
+        return self._then(self._ws_public_subscribe(topicStr, arg, callback),
+                          lambda result: self._release_public_topic(arg, result))
     def depth_topic_stream(self, callback, arg):
         """
         https://api-docs.pro.apex.exchange/#public-websocket-depth
@@ -72,32 +284,42 @@ class WebSocket(_ApexWebSocketManager):
                 "args": [arg]
             }
         topicStr = json.dumps(topic, sort_keys=True, separators=(",", ":"))
-        self._ws_public_subscribe(topicStr, arg, callback)
-    def ticker_stream(self, callback, symbol):
+        return self._ws_public_subscribe(topicStr, arg, callback)
+    def ticker_stream(self, callback, symbol, conflate=False):
         """
+        With conflate (seconds, or True for flush_conflated()), snapshots and deltas are merged
+        and callback gets a snapshot message of the latest fields at most once per conflate
+        seconds.
         https://api-docs.pro.apex.exchange/#public-websocket-ticker
         """
         arg = "instrumentInfo" + ".H." + symbol
+        if conflate:
+            callback = self._conflate(arg, TickerState(arg), callback, conflate)
         topic = \
             {
                 "op": "subscribe",
                 "args": [arg]
             }
         topicStr = json.dumps(topic, sort_keys=True, separators=(",", ":"))
-        self._ws_public_subscribe(topicStr, arg, callback)
+        return self._ws_public_subscribe(topicStr, arg, callback)
 
-    def all_ticker_stream(self, callback):
+    def all_ticker_stream(self, callback, conflate=False):
         """
+        With conflate (seconds, or True for flush_conflated()), callback gets at most once per
+        conflate seconds a message with the latest fields of the symbols that changed since the
+        previous call, and latest('instrumentInfo.all') returns every symbol.
         https://api-docs.pro.apex.exchange/#public-websocket-ticker
         """
         arg = "instrumentInfo.all"
+        if conflate:
+            callback = self._conflate(arg, AllTickerState(arg), callback, conflate)
         topic = \
             {
                 "op": "subscribe",
                 "args": [arg]
             }
         topicStr = json.dumps(topic, sort_keys=True, separators=(",", ":"))
-        self._ws_public_subscribe(topicStr, arg, callback)
+        return self._ws_public_subscribe(topicStr, arg, callback)
 
     def klines_stream(self, callback, symbol, interval):
         """
@@ -110,7 +332,7 @@ class WebSocket(_ApexWebSocketManager):
                 "args": [arg]
             }
         topicStr = json.dumps(topic, sort_keys=True, separators=(",", ":"))
-        self._ws_public_subscribe(topicStr, arg, callback)
+        return self._ws_public_subscribe(topicStr, arg, callback)
 
     def trade_stream(self, callback, symbol):
         """
@@ -123,7 +345,7 @@ class WebSocket(_ApexWebSocketManager):
                 "args": [arg]
             }
         topicStr = json.dumps(topic, sort_keys=True, separators=(",", ":"))
-        self._ws_public_subscribe(topicStr, arg, callback)
+        return self._ws_public_subscribe(topicStr, arg, callback)
 
 
     def account_info_stream(self, callback):
@@ -131,11 +353,11 @@ class WebSocket(_ApexWebSocketManager):
         https://api-docs.pro.apex.exchange/#private-websocket
         """
         topic = "ws_accounts_v1"
-        self._ws_private_subscribe(topic=topic, callback=callback)
+        return self._ws_private_subscribe(topic=topic, callback=callback)
 
     def account_info_stream_v2(self, callback):
         """
         https://api-docs.pro.apex.exchange/#private-websocket
         """
         topic = "ws_accounts_v2"
-        self._ws_private_subscribe(topic=topic, callback=callback)
+        return self._ws_private_subscribe(topic=topic, callback=callback)
@@ -0,0 +1,201 @@
+import asyncio
+import inspect
+import logging
+
+import aiohttp
+
+from ._websocket_stream import _ApexWebSocketManager, PUBLIC_WSS, PRIVATE_WSS
+from .helpers.request_helpers import generate_now
+from .websocket_api import WebSocket
+
+logger = logging.getLogger(__name__)
+
+
+async def _maybe_await(result):
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+class _AsyncApexWebSocketManager(_ApexWebSocketManager):
+    """
+    asyncio replacement for the websocket-client thread of _ApexWebSocketManager. The
+    connection is an aiohttp WebSocket read by a task on the running event loop, so any number
+    of them can share one loop (and one aiohttp session). Connecting awaits the handshake and
+    exit() awaits the end of the reader, without polling. Dropped connections are reopened by
+    the reader task, with the backoff and subscription replay of _WebSocketManager.
+
+    Callbacks may be plain functions or coroutine functions; the result of the latter is
+    awaited before the next message is read, so messages of a connection are handled in order.
+    """
+
+    def __init__(self, session=None, **kwargs):
+        super().__init__(**kwargs)
+        self.session = session
+        self._own_session = session is None
+        self.ws = None
+        self._reader = None
+
+    def _send(self, message):
+        return self.ws.send_str(message)
+
+    async def _connect(self, url):
+        """
+        Opens the connection, starts reading it and authenticates if given an api_key.
+        """
+        self.private_websocket = "private" in url
+        self.url = url
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        await self._open()
+        self._reader = asyncio.ensure_future(self._run())
+
+    async def _open(self):
+        time_stamp = generate_now()
+        self.ws = await asyncio.wait_for(
+            self.session.ws_connect(self.url + '&timestamp=' + str(time_stamp),
+                                    heartbeat=self.ping_interval),
+            self.connect_timeout,
+        )
+        if self.api_key_credentials:
+            await self._auth(time_stamp)
+        self._on_open()
+
+    async def _run(self):
+        """
+        Reads the connection, and reopens it after a backoff when it drops, until exit().
+        """
+        while True:
+            await self._read()
+            if self.exited or not self.handle_error:
+                return
+            self._on_disconnect(self._last_error)
+            self._last_error = None
+            while not self.exited:
+                await asyncio.sleep(self.backoff.next())
+                try:
+                    await self._open()
+                    break
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                    logger.warning(f"WebSocket reconnect failed: {e!r}.")
+            if self.exited:
+                return
+            await _maybe_await(self._resume())
+
+    async def _read(self):
+        try:
+            async for msg in self.ws:
+                if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                    try:
+                        await _maybe_await(self._on_message(msg.data))
+                    except Exception:
+                        logger.exception("WebSocket callback failed.")
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    self._on_error(self.ws.exception())
+        finally:
+            self._on_close()
+
+    async def exit(self):
+        """
+        Closes the websocket connection and waits for its reader to finish.
+        """
+        self.exited = True
+        if self.ws is not None:
+            await self.ws.close()
+        if self._reader is not None:
+            # Stop a pending reconnect.
+            if not self._reader.done():
+                self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+        if self._own_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class WebSocketAsync(WebSocket):
+    """
+    asyncio version of WebSocket. The stream methods keep their signature but return an
+    awaitable, e.g. await ws_client.depth_stream(callback, 'BTCUSDC', 25), and callbacks run on
+    the event loop. The public and private connections share one aiohttp session, which can be
+    passed in to share it with other clients. Close with await ws_client.close(), or use the
+    client as an async context manager.
+    """
+
+    def __init__(self, session=None, **kwargs):
+        super().__init__(**kwargs)
+        self.session = session
+        self._own_session = session is None
+        # Connection attempts of ws_public_pool by slot, and of ws_private.
+        self._public_connects = {}
+        self._private_connect = None
+
+    def _get_session(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+        return self.session
+
+    def _then(self, result, callback):
+        async def then():
+            return await _maybe_await(callback(await _maybe_await(result)))
+
+        return then()
+
+    async def _on_public_connection(self, topic, call):
+        slot = self._public_slot(topic)
+        manager = self.ws_public_pool[slot]
+        if manager is None:
+            manager = _AsyncApexWebSocketManager(
+                session=self._get_session(), **self.public_kwargs)
+            self.ws_public_pool[slot] = manager
+            if self.ws_public is None:
+                self.ws_public = manager
+            self._public_connects[slot] = asyncio.ensure_future(
+                manager._connect(self.endpoint + PUBLIC_WSS))
+        try:
+            await self._public_connects[slot]
+        except Exception:
+            if self.ws_public_pool[slot] is manager:
+                self.ws_public_pool[slot] = None
+            if self.ws_public is manager:
+                self.ws_public = None
+            raise
+        return await _maybe_await(call(manager))
+
+    def _gather(self, results):
+        return asyncio.gather(*(_maybe_await(result) for result in results))
+
+    async def _ws_private_subscribe(self, topic, callback):
+        if not self.ws_private:
+            self.ws_private = _AsyncApexWebSocketManager(
+                session=self._get_session(), **self.kwargs)
+            self._private_connect = asyncio.ensure_future(
+                self.ws_private._connect(self.endpoint + PRIVATE_WSS))
+        try:
+            await self._private_connect
+        except Exception:
+            self.ws_private = None
+            raise
+        await _maybe_await(self.ws_private.subscribe("", topic, callback))
+
+    async def close(self):
+        """Closes every connection, and the session unless it was passed in."""
+        for manager in self.ws_public_pool + [self.ws_private]:
+            if manager is not None:
+                await manager.exit()
+        self.ws_public_pool = [None] * len(self.ws_public_pool)
+        self._public_connects = {}
+        self.ws_public = self.ws_private = None
+        if self.conflator is not None:
+            self.conflator.close()
+        if self._own_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -28,7 +28,7 @@ setup(
         'Programming Language :: Python :: 3.9',
     ],
     keywords='apexpro api connector',
-    package_data={'': ['*.json']},
+    package_data={'': ['*.json', '*.so', '*.dylib', '*.dll']},
     data_files=[('apexpro', ['apexpro/starkex/starkex_resources/pedersen_params.json'])],
     # packages=['apexpro'],
     python_requires='>=3.6',
@@ -40,13 +40,21 @@ setup(
         'ecdsa==0.16.0',
         'eth_keys',
         'eth-account>=0.4.0,<0.6.0',
-        'mpmath==1.0.0',
         'pytest>=4.4.0,<5.0.0',
         'requests-mock==1.6.0',
         'requests>=2.22.0,<3.0.0',
         'setuptools==50.3.2',
-        'sympy==1.6',
         'tox==3.13.2',
         'web3>=5.0.0,<6.0.0'
     ],
+    extras_require={
+        # Only needed for field arithmetic modulo primes other than the STARK prime.
+        'sympy': ['sympy==1.6', 'mpmath==1.0.0'],
+        # apexpro.http_async and apexpro.websocket_async.
+        'async': ['aiohttp>=3.7.0'],
+        # O(log n) order book updates in apexpro.order_book (a bisect fallback is used without).
+        'orderbook': ['sortedcontainers>=2.0.0'],
+        # Faster parsing of WebSocket frames (see apexpro.helpers.decoders).
+        'orjson': ['orjson>=3.0.0'],
+    },
 )
@@ -0,0 +1,79 @@
+import json
+import os
+import sys
+import timeit
+
+root_path = os.path.abspath(__file__)
+root_path = '/'.join(root_path.split('/')[:-2])
+sys.path.append(root_path)
+
+from apexpro._websocket_stream import _ApexWebSocketManager
+from apexpro.helpers.decoders import DECODERS
+
+# Messages per second per core through WebSocket frame parsing and topic routing, on one
+# thread: the json.loads and nested-check handler this client used before, against the topic
+# table with each installed decoder.
+
+MESSAGES = 20000
+
+frames = []
+for i in range(MESSAGES):
+    symbol = ('BTCUSDC', 'ETHUSDC', 'SOLUSDC')[i % 3]
+    frames.append(json.dumps({
+        'topic': 'orderBook25.H.' + symbol, 'type': 'delta', 'ts': 1670000000000 + i,
+        'data': {'s': symbol, 'b': [['20000.5', str(i)], ['19999', '0']],
+                 'a': [['20001', '1.5']], 'u': i},
+    }))
+
+
+def before(callback_directory):
+    def handle(message):
+        def is_ping_message():
+            return type(message) == dict and message.get("op") == "ping"
+
+        def is_auth_message():
+            return type(message) == dict and \
+                message.get("request") is not None and \
+                message.get("request").get("op") is not None and \
+                message.get("request").get("op") == "login"
+
+        def is_subscription_message():
+            return type(message) == dict and \
+                message.get("request") is not None and \
+                message.get("request").get("op") is not None and \
+                message.get("request").get("op") == "subscribe"
+
+        if is_ping_message():
+            return
+        if is_auth_message():
+            pass
+        elif is_subscription_message():
+            pass
+        elif message.get('topic') is not None and \
+                callback_directory.get(message.get('topic')) is not None:
+            return callback_directory[message['topic']](message)
+
+    return lambda frame: handle(json.loads(frame))
+
+
+def report(name, on_message, frames=frames):
+    seconds = min(timeit.repeat(lambda: [on_message(frame) for frame in frames],
+                                number=1, repeat=5))
+    print('%-22s %10.0f messages/s' % (name, MESSAGES / seconds))
+
+
+def callback(message):
+    pass
+
+
+callback_directory = {'orderBook25.H.' + symbol: callback
+                      for symbol in ('BTCUSDC', 'ETHUSDC', 'SOLUSDC')}
+report('before', before(callback_directory))
+
+encoded = [frame.encode() for frame in frames]
+for name in DECODERS:
+    manager = _ApexWebSocketManager(decoder=name)
+    for topic in callback_directory:
+        manager._set_callback(topic, callback)
+    report('after (%s)' % name, manager._on_message)
+    report('after (%s, bytes)' % name, manager._on_message, encoded)
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+root_path = os.path.abspath(__file__)
+root_path = '/'.join(root_path.split('/')[:-2])
+sys.path.append(root_path)
+
+from apexpro import private_key_to_public_key_pair_hex
+from apexpro.constants import NETWORKID_TEST
+from apexpro.helpers.instrumentation import HistogramCollector
+from apexpro.http_private_stark_key_sign import HttpPrivateStark
+from apexpro.mock_exchange import MockExchange
+
+# Order placement throughput and per-phase latency against the local mock exchange, so runs are
+# reproducible offline. LATENCY is the simulated one-way server delay in seconds.
+
+STARK_PRIVATE_KEY = '0x170d807cafe3d8b5758f3f698331d292bf5aeb71f6fd282f0831dee094ee891'
+API_KEY_CREDENTIALS = {'key': 'key', 'secret': 'secret', 'passphrase': 'passphrase'}
+N_ORDERS = 200
+THREADS = (1, 4, 16)
+LATENCY = 0.005
+
+# The server side STARK verification is skipped so that it does not dominate the numbers.
+with MockExchange(latency=LATENCY, verify_signatures=False, seed=0) as exchange:
+    exchange.add_account(
+        API_KEY_CREDENTIALS, private_key_to_public_key_pair_hex(STARK_PRIVATE_KEY)[0])
+    for threads in THREADS:
+        collector = HistogramCollector()
+        client = HttpPrivateStark(
+            exchange.http_endpoint, network_id=NETWORKID_TEST,
+            stark_private_key=STARK_PRIVATE_KEY, api_key_credentials=API_KEY_CREDENTIALS,
+            instrumentation=collector)
+        client.configs_v2()
+        client.get_account_v2()
+
+        def place(i):
+            return client.create_order_v2(
+                symbol='BTC-USDC', side='BUY', type='LIMIT', size='0.01', price='20000',
+                limitFeeRate='0.0005', expirationEpochSeconds=time.time() + 3600,
+                clientId=str(i))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            list(executor.map(place, range(N_ORDERS)))
+        elapsed = time.perf_counter() - start
+
+        print('%2d threads: %7.1f orders/s' % (threads, N_ORDERS / elapsed))
+        for phase, summary in collector.snapshot()['create-order'].items():
+            print('    %-8s p50 %8.1f us  p99 %8.1f us' % (
+                phase, summary['p50_us'], summary['p99_us']))
@@ -0,0 +1,50 @@
+import os
+import random
+import sys
+import timeit
+
+root_path = os.path.abspath(__file__)
+root_path = '/'.join(root_path.split('/')[:-2])
+sys.path.append(root_path)
+
+from apexpro.starkex.starkex_resources.cpp_signature import CPP_LIB_ENV_VAR
+from apexpro.starkex.starkex_resources.cpp_signature import check_cpp_lib_path
+from apexpro.starkex.starkex_resources.cpp_signature import cpp_hash
+from apexpro.starkex.starkex_resources.cpp_signature import cpp_hash_batch
+from apexpro.starkex.starkex_resources.cpp_signature import cpp_sign
+from apexpro.starkex.starkex_resources.cpp_signature import cpp_sign_batch
+from apexpro.starkex.starkex_resources.python_signature import EC_ORDER
+from apexpro.starkex.starkex_resources.python_signature import FIELD_PRIME
+from apexpro.starkex.starkex_resources.python_signature import py_pedersen_hash
+from apexpro.starkex.starkex_resources.python_signature import py_sign
+
+# Compares the pure Python and the native (crypto_c_exports) signing and hashing paths.
+# Point APEXPRO_CRYPTO_C_EXPORTS_PATH at the library to include the native numbers.
+
+BATCH_SIZE = 100
+
+rng = random.Random(0)
+priv_key = rng.randint(1, EC_ORDER - 1)
+msg_hashes = [rng.randrange(1, 2 ** 251) for _ in range(BATCH_SIZE)]
+pairs = [(rng.randrange(FIELD_PRIME), rng.randrange(FIELD_PRIME)) for _ in range(BATCH_SIZE)]
+
+
+def report(name, func):
+    seconds = min(timeit.repeat(func, number=1, repeat=3))
+    print('%-24s %8.3f ms/op' % (name, seconds * 1000 / BATCH_SIZE))
+
+
+# Build the hash and signing tables before timing.
+py_sign(msg_hashes[0], priv_key)
+py_pedersen_hash(*pairs[0])
+
+report('py_pedersen_hash', lambda: [py_pedersen_hash(a, b) for a, b in pairs])
+report('py_sign', lambda: [py_sign(m, priv_key) for m in msg_hashes])
+
+if check_cpp_lib_path():
+    report('cpp_hash', lambda: [cpp_hash(a, b) for a, b in pairs])
+    report('cpp_hash_batch', lambda: cpp_hash_batch(pairs))
+    report('cpp_sign', lambda: [cpp_sign(m, priv_key) for m in msg_hashes])
+    report('cpp_sign_batch', lambda: cpp_sign_batch(msg_hashes, priv_key))
+else:
+    print('native library not found, set %s to benchmark it' % CPP_LIB_ENV_VAR)
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+root_path = os.path.abspath(__file__)
+root_path = '/'.join(root_path.split('/')[:-2])
+sys.path.append(root_path)
+
+from apexpro.mock_exchange import MockExchange
+from apexpro.websocket_api import WebSocket
+from apexpro.websocket_async import WebSocketAsync
+
+# Connect latency and idle CPU of the websocket-client (thread per connection) and asyncio
+# WebSocket clients, against the local mock exchange.
+
+CONNECTIONS = 50
+IDLE = 2.0
+
+
+def idle_cpu(seconds):
+    start = time.process_time()
+    time.sleep(seconds)
+    return (time.process_time() - start) / seconds * 100
+
+
+with MockExchange() as exchange:
+    exchange.publish('instrumentInfo.H.BTCUSDC', {'symbol': 'BTCUSDC'}, 'snapshot')
+
+    start = time.perf_counter()
+    clients = []
+    for _ in range(CONNECTIONS):
+        received = threading.Event()
+        client = WebSocket(endpoint=exchange.ws_endpoint)
+        client.ticker_stream(lambda message, received=received: received.set(), 'BTCUSDC')
+        received.wait()
+        clients.append(client)
+    elapsed = time.perf_counter() - start
+    print('threads: %6.2f ms per connection, %5.1f%% idle CPU' % (
+        elapsed / CONNECTIONS * 1000, idle_cpu(IDLE)))
+    for client in clients:
+        client.ws_public.exit()
+
+    async def run():
+        clients = [WebSocketAsync(endpoint=exchange.ws_endpoint) for _ in range(CONNECTIONS)]
+        received = asyncio.Queue()
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client.ticker_stream(received.put_nowait, 'BTCUSDC') for client in clients))
+        for _ in clients:
+            await received.get()
+        elapsed = time.perf_counter() - start
+        start = time.process_time()
+        await asyncio.sleep(IDLE)
+        cpu = (time.process_time() - start) / IDLE * 100
+        print('asyncio: %6.2f ms per connection, %5.1f%% idle CPU' % (
+            elapsed / CONNECTIONS * 1000, cpu))
+        await asyncio.gather(*(client.close() for client in clients))
+
+    asyncio.run(run())
@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+import pytest
+
+API_KEY_CREDENTIALS = {'key': 'key', 'secret': 'secret', 'passphrase': 'passphrase'}
+
+
+class FakeClock:
+    """Clock for the helpers taking a clock parameter; set now to move time."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def wait(condition, timeout=5):
+    """Polls condition until it holds, for up to timeout seconds, then asserts it."""
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.005)
+    assert condition()
+
+
+def run(coroutine):
+    """Runs coroutine on a new event loop and returns its result."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@pytest.fixture
+def exchange():
+    """A MockExchange with an account for API_KEY_CREDENTIALS, stopped after the test."""
+    pytest.importorskip('aiohttp')
+    from apexpro.mock_exchange import MockExchange
+
+    with MockExchange() as exchange:
+        exchange.add_account(API_KEY_CREDENTIALS)
+        yield exchange
@@ -0,0 +1,52 @@
+import time
+
+from apexpro.starkex.batch_signer import OrderBatchSigner
+from apexpro.starkex.order import SignableOrder
+
+from .conftest import API_KEY_CREDENTIALS
+
+STARK_PRIVATE_KEY = '0x170d807cafe3d8b5758f3f698331d292bf5aeb71f6fd282f0831dee094ee891'
+
+ORDERS = [dict(
+    market='BTC-USDC', side=('BUY', 'SELL')[i % 2], position_id='12345',
+    human_size='0.0%d' % (i + 1), human_price=str(20000 + i), limit_fee='0.0005',
+    client_id='client-%d' % i, expiration_epoch_seconds=1700000000 + i,
+    synthetic_resolution='10000000000', synthetic_id='0x4254432d3130000000000000000000',
+    collateral_id='0xa21edc9d9997b1b1956f542fe95922518a9e28ace11b7b2972a1974bf5971f',
+) for i in range(6)]
+
+
+class TestOrderBatchSigner():
+
+    def test_pool_matches_single_signatures(self):
+        expected = [SignableOrder(**order).sign(STARK_PRIVATE_KEY) for order in ORDERS]
+        with OrderBatchSigner(STARK_PRIVATE_KEY, max_workers=2, min_pool_batch_size=1) as signer:
+            assert signer.sign_orders(ORDERS) == expected
+            # Batches below min_pool_batch_size are signed in-process.
+            signer.min_pool_batch_size = 100
+            assert signer.sign_orders(reversed(ORDERS)) == expected[::-1]
+            assert signer._executor is not None
+        assert signer._executor is None
+
+    def test_client_batch(self, exchange):
+        from apexpro import private_key_to_public_key_pair_hex
+        from apexpro.constants import NETWORKID_TEST
+        from apexpro.http_private_stark_key_sign import HttpPrivateStark
+
+        exchange.add_account(API_KEY_CREDENTIALS,
+                             private_key_to_public_key_pair_hex(STARK_PRIVATE_KEY)[0],
+                             position_id='12345')
+        with HttpPrivateStark(exchange.http_endpoint, network_id=NETWORKID_TEST,
+                              stark_private_key=STARK_PRIVATE_KEY,
+                              api_key_credentials=API_KEY_CREDENTIALS) as client:
+            client.configs_v2()
+            client.get_account_v2()
+            orders = [dict(symbol='BTC-USDC', side='BUY', type='LIMIT', size='0.01',
+                           price=str(20000 + i), limitFeeRate='0.0005',
+                           expirationEpochSeconds=time.time() + 3600) for i in range(4)]
+            signed = client.sign_orders_batch(orders, max_workers=2, min_pool_batch_size=1)
+            assert all('clientId' not in order for order in orders)
+            assert [order['price'] for order in signed] == [order['price'] for order in orders]
+            for order in signed:
+                assert client.create_order_v2(**order)['data']['status'] == 'OPEN'
+        assert client._order_batch_signer is None
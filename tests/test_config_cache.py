@@ -0,0 +1,95 @@
+import json
+import time
+from decimal import Decimal
+
+from apexpro.constants import APEX_HTTP_TEST, NETWORKID_TEST
+from apexpro.helpers.config_cache import ConfigCache
+from apexpro.http_public import HttpPublic
+
+
+def make_config(tick_size):
+    return {
+        'global': {'registerEnvId': NETWORKID_TEST},
+        'currency': [{'id': 'USDC', 'starkExAssetId': '0xa21e', 'stepSize': '0.000001'}],
+        'perpetualContract': [
+            {'symbol': 'BTC-USDC', 'settleCurrencyId': 'USDC', 'tickSize': tick_size,
+             'stepSize': '0.001'},
+        ],
+        'multiChain': {'chains': []},
+    }
+
+
+def make_client(responses):
+    client = HttpPublic(APEX_HTTP_TEST, network_id=NETWORKID_TEST)
+    client.requests = []
+
+    def submit_request(method=None, path=None, query=None, headers=None):
+        client.requests.append(path)
+        return responses.pop(0)
+
+    client._submit_request = submit_request
+    return client
+
+
+def symbols(tick_size):
+    return {'data': {'usdcConfig': make_config(tick_size), 'usdtConfig': {}}}
+
+
+class TestConfigCache():
+
+    def test_load_fetches_then_reads_the_file(self, tmp_path):
+        filename = str(tmp_path / 'configs.json')
+        client = make_client([symbols('0.5')])
+        ConfigCache(client, filename).load()
+        assert client.configIndexV2.tick_size('BTC-USDC') == Decimal('0.5')
+        assert len(client.requests) == 1
+
+        restarted = make_client([])
+        ConfigCache(restarted, filename).load()
+        assert restarted.configIndexV2.tick_size('BTC-USDC') == Decimal('0.5')
+        assert restarted.requests == []
+
+    def test_unusable_file_is_refetched(self, tmp_path):
+        filename = str(tmp_path / 'configs.json')
+        ConfigCache(make_client([symbols('0.5')]), filename).load()
+        with open(filename) as f:
+            cached = json.load(f)
+        cached['response']['data']['usdcConfig']['perpetualContract'][0]['tickSize'] = '1'
+        with open(filename, 'w') as f:
+            json.dump(cached, f)
+
+        client = make_client([symbols('0.1')])
+        ConfigCache(client, filename).load()
+        assert client.configIndexV2.tick_size('BTC-USDC') == Decimal('0.1')
+
+        client = make_client([symbols('0.2')])
+        ConfigCache(client, filename, max_age=0).load()
+        assert client.configIndexV2.tick_size('BTC-USDC') == Decimal('0.2')
+
+    def test_background_refresh(self, tmp_path):
+        filename = str(tmp_path / 'configs.json')
+        client = make_client(
+            [symbols('0.5'), {'code': 500}, symbols('0.1')] + [symbols('0.1')] * 100)
+        cache = ConfigCache(client, filename, refresh_interval=0.01)
+        cache.load()
+        cache.start()
+        try:
+            deadline = time.time() + 5
+            while (client.configIndexV2.tick_size('BTC-USDC') != Decimal('0.1') and
+                   time.time() < deadline):
+                time.sleep(0.01)
+        finally:
+            cache.stop()
+        assert client.configIndexV2.tick_size('BTC-USDC') == Decimal('0.1')
+        assert ConfigCache(make_client([]), filename).read() == symbols('0.1')
+
+    def test_refresh_swaps_one_snapshot(self):
+        client = make_client([symbols('0.5'), symbols('0.1')])
+        client.configs_v2()
+        configs = client.configsV2
+        client.configs_v2()
+        assert client.configsV2 is not configs
+        assert configs.index.tick_size('BTC-USDC') == Decimal('0.5')
+        assert configs.usdc['perpetualContract'][0]['tickSize'] == '0.5'
+        assert client.configIndexV2 is client.configsV2.index
+        assert client.usdcConfigV2['perpetualContract'][0]['tickSize'] == '0.1'
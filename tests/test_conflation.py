@@ -0,0 +1,90 @@
+from apexpro.helpers.conflation import AllTickerState, Conflator, TickerState
+
+from .conftest import wait
+
+
+class TestConflation():
+
+    def test_ticker_state(self):
+        state = TickerState('instrumentInfo.H.BTCUSDC')
+        assert state.update({'type': 'snapshot', 'data': {'symbol': 'BTCUSDC', 'lastPrice': '1'}})
+        assert not state.update({'type': 'delta', 'data': {'lastPrice': '1'}})
+        assert state.update({'type': 'delta', 'data': {'volume24h': '5'}})
+        assert state.take()['data'] == {'symbol': 'BTCUSDC', 'lastPrice': '1', 'volume24h': '5'}
+
+    def test_all_ticker_state_takes_changed_symbols(self):
+        state = AllTickerState('instrumentInfo.all')
+        state.update({'data': [{'s': 'BTCUSDC', 'p': '1'}, {'s': 'ETHUSDC', 'p': '2'}]})
+        state.take()
+        assert not state.update({'data': [{'s': 'BTCUSDC', 'p': '1'}, {'s': 'ETHUSDC', 'p': '2'}]})
+        assert state.update({'data': [{'s': 'BTCUSDC', 'p': '1'}, {'s': 'ETHUSDC', 'p': '3'}]})
+        assert state.take()['data'] == [{'s': 'ETHUSDC', 'p': '3'}]
+        assert len(state.latest()['data']) == 2
+
+    def test_interval_and_demand(self):
+        conflator = Conflator()
+        timed, demand = [], []
+        conflator.register('timed', TickerState('timed'), timed.append, interval=0.05)
+        conflator.register('demand', TickerState('demand'), demand.append)
+        for i in range(1000):
+            conflator.update('timed', {'type': 'delta', 'data': {'p': i}})
+            conflator.update('demand', {'type': 'delta', 'data': {'p': i}})
+        wait(lambda: timed and timed[-1]['data'] == {'p': 999})
+        assert len(timed) <= 3
+        assert demand == []
+        assert conflator.latest('demand')['data'] == {'p': 999}
+        conflator.flush('demand')
+        conflator.flush('demand')
+        assert [message['data'] for message in demand] == [{'p': 999}]
+        conflator.flush('unknown')
+        assert conflator.latest('unknown') is None
+        conflator.close()
+
+    def test_streams(self, exchange):
+        from apexpro.websocket_api import WebSocket
+
+        exchange.publish('instrumentInfo.H.BTCUSDC', {'symbol': 'BTCUSDC', 'p': '0'},
+                         'snapshot')
+        exchange.publish('instrumentInfo.all', [{'s': 'BTCUSDC', 'p': '0'},
+                                                {'s': 'ETHUSDC', 'p': '0'}], 'snapshot')
+        exchange.publish_depth('BTCUSDC', [['20000', '1']], [['20001', '1']], limit=25)
+        tickers, all_tickers, books = [], [], []
+        ws_client = WebSocket(endpoint=exchange.ws_endpoint)
+        ws_client.ticker_stream(tickers.append, 'BTCUSDC', conflate=0.05)
+        ws_client.all_ticker_stream(all_tickers.append, conflate=True)
+        ws_client.depth_stream(books.append, 'BTCUSDC', 25, conflate=0.05)
+        wait(lambda: tickers and books)
+        wait(lambda: len(ws_client.latest('instrumentInfo.all')['data']) == 2)
+        ws_client.flush_conflated()
+        del all_tickers[:]
+
+        for i in range(1, 201):
+            exchange.publish('instrumentInfo.H.BTCUSDC', {'p': str(i)})
+            exchange.publish('instrumentInfo.all', [{'s': 'BTCUSDC', 'p': str(i)},
+                                                    {'s': 'ETHUSDC', 'p': '0'}])
+            exchange.publish_depth('BTCUSDC', [['20000', str(i)]], [], limit=25)
+        wait(lambda: tickers[-1]['data']['p'] == '200')
+        wait(lambda: books[-1]['data']['b'] == [('20000', '200')])
+        assert len(tickers) < 50
+        assert len(books) < 50
+
+        wait(lambda: ws_client.latest('instrumentInfo.all')['data'][0]['p'] == '200')
+        ws_client.flush_conflated('instrumentInfo.all')
+        assert all_tickers[-1]['data'] == [{'s': 'BTCUSDC', 'p': '200'}]
+        assert len(all_tickers) == 1
+        ws_client.conflator.close()
+        ws_client.ws_public.exit()
+
+    def test_conflated_depth_on_existing_book(self, exchange):
+        from apexpro.websocket_api import WebSocket
+
+        exchange.publish_depth('BTCUSDC', [['20000', '1']], [['20001', '1']], limit=25)
+        books = []
+        ws_client = WebSocket(endpoint=exchange.ws_endpoint)
+        assert ws_client.latest('orderBook25.H.BTCUSDC') is None
+        book = ws_client.order_book_stream('BTCUSDC', 25)
+        wait(lambda: book.synced)
+        ws_client.depth_stream(books.append, 'BTCUSDC', 25, conflate=0.01)
+        exchange.publish_depth('BTCUSDC', [['20000', '2']], [], limit=25)
+        wait(lambda: books and books[-1]['data']['b'] == [('20000', '2')])
+        ws_client.close()
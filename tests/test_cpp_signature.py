@@ -0,0 +1,88 @@
+import _ctypes
+import os
+import random
+
+import pytest
+
+from apexpro.starkex.starkex_resources import cpp_signature
+from apexpro.starkex.starkex_resources import proxy
+from apexpro.starkex.starkex_resources.python_signature import FIELD_PRIME
+from apexpro.starkex.starkex_resources.python_signature import inv_mod_curve_size
+from apexpro.starkex.starkex_resources.python_signature import py_pedersen_hash
+from apexpro.starkex.starkex_resources.python_signature import py_sign
+
+STARK_PRIVATE_KEY = 0x170d807cafe3d8b5758f3f698331d292bf5aeb71f6fd282f0831dee094ee891
+
+rng = random.Random(3)
+PAIRS = [(rng.randrange(FIELD_PRIME), rng.randrange(FIELD_PRIME)) for _ in range(3)]
+MSG_HASHES = [rng.randrange(1, 2 ** 251) for _ in range(3)]
+
+
+def from_bytes(value):
+    return int.from_bytes(value, 'little')
+
+
+def to_bytes(value):
+    return value.to_bytes(32, 'little')
+
+
+class FakeCppLib:
+    """Stands in for crypto_c_exports, with the Python implementation behind its ABI."""
+
+    @staticmethod
+    def Hash(left, right, res):
+        res.raw = to_bytes(py_pedersen_hash(from_bytes(left), from_bytes(right)))
+        return 0
+
+    @staticmethod
+    def Sign(priv_key, msg_hash, random_bytes, res):
+        r, s = py_sign(from_bytes(msg_hash), from_bytes(priv_key))
+        res.raw = to_bytes(r) + to_bytes(inv_mod_curve_size(s))
+        return 0
+
+
+@pytest.fixture
+def no_cpp_lib(monkeypatch):
+    monkeypatch.setattr(cpp_signature, 'CPP_LIB_PATH', None)
+
+
+class TestCppSignature():
+
+    def test_find_lib_from_env(self, monkeypatch):
+        monkeypatch.setenv(cpp_signature.CPP_LIB_ENV_VAR, '/opt/crypto/libcrypto_c_exports.so')
+        assert cpp_signature.find_cpp_lib() == '/opt/crypto/libcrypto_c_exports.so'
+        monkeypatch.delenv(cpp_signature.CPP_LIB_ENV_VAR)
+        path = cpp_signature.find_cpp_lib()
+        assert path is None or \
+            os.path.dirname(path) == os.path.dirname(cpp_signature.__file__)
+
+    @pytest.mark.parametrize('library', ['missing', 'invalid', 'without_exports'])
+    def test_unusable_lib_falls_back_to_python(self, monkeypatch, tmp_path, no_cpp_lib, library):
+        path = str(tmp_path / 'libcrypto_c_exports.so')
+        if library == 'invalid':
+            with open(path, 'wb') as f:
+                f.write(b'not a shared library')
+        elif library == 'without_exports':
+            # A shared library that loads, but is not crypto_c_exports.
+            path = getattr(_ctypes, '__file__', None)
+            if path is None:
+                pytest.skip('_ctypes is built in')
+        monkeypatch.setenv(cpp_signature.CPP_LIB_ENV_VAR, path)
+        assert not cpp_signature.load_cpp_lib()
+        assert not cpp_signature.check_cpp_lib_path()
+        assert proxy.get_hash(*PAIRS[0]) == py_pedersen_hash(*PAIRS[0])
+
+    def test_python_batches_match_single_calls(self, no_cpp_lib):
+        assert proxy.get_hash_batch(PAIRS) == [proxy.get_hash(a, b) for a, b in PAIRS]
+        assert proxy.sign_batch(MSG_HASHES, STARK_PRIVATE_KEY) == [
+            proxy.sign(msg_hash, STARK_PRIVATE_KEY) for msg_hash in MSG_HASHES]
+
+    def test_cpp_batches_match_single_calls(self, monkeypatch):
+        monkeypatch.setattr(cpp_signature, 'CPP_LIB_PATH', FakeCppLib())
+        monkeypatch.setattr(proxy, 'USE_CPP_SIGN', True)
+        expected = [py_pedersen_hash(a, b) for a, b in PAIRS]
+        assert [proxy.get_hash(a, b) for a, b in PAIRS] == expected
+        assert proxy.get_hash_batch(PAIRS) == expected
+        signatures = [py_sign(msg_hash, STARK_PRIVATE_KEY) for msg_hash in MSG_HASHES]
+        assert [proxy.sign(msg_hash, STARK_PRIVATE_KEY) for msg_hash in MSG_HASHES] == signatures
+        assert proxy.sign_batch(MSG_HASHES, STARK_PRIVATE_KEY) == signatures
@@ -0,0 +1,32 @@
+import pytest
+
+from apexpro._websocket_stream import _ApexWebSocketManager
+from apexpro.helpers.decoders import DECODERS, get_decoder, json_decoder
+
+
+class TestDecoders():
+
+    def test_get_decoder(self):
+        assert get_decoder('json') is json_decoder
+        assert get_decoder(len) is len
+        assert get_decoder() is json_decoder
+        with pytest.raises(ValueError):
+            get_decoder('yaml')
+
+    @pytest.mark.parametrize('name', sorted(DECODERS))
+    def test_routes_frames(self, name):
+        received = []
+        manager = _ApexWebSocketManager(decoder=name)
+        manager._set_callback('recentlyTrade.H.BTCUSDC', received.append)
+        for frame in ('{"topic":"recentlyTrade.H.BTCUSDC","data":[{"p":"1"}]}',
+                      b'{"topic":"recentlyTrade.H.BTCUSDC","data":[{"p":"2"}]}',
+                      '{"topic":"recentlyTrade.H.ETHUSDC","data":[]}',
+                      '{"request":{"op":"login"},"success":"true"}',
+                      '[1, 2]', '"text"'):
+            manager._on_message(frame)
+        assert [message['data'][0]['p'] for message in received] == ['1', '2']
+        assert manager.auth
+
+        manager._pop_callback('recentlyTrade.H.BTCUSDC')
+        manager._on_message('{"topic":"recentlyTrade.H.BTCUSDC","data":[{"p":"3"}]}')
+        assert len(received) == 2
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from apexpro.helpers.dispatcher import Dispatcher
+
+from .conftest import wait
+
+
+class TestDispatcher():
+
+    def test_keeps_topic_order(self):
+        received = {}
+        with Dispatcher(workers=4, overflow='block', maxsize=10) as dispatcher:
+            for i in range(200):
+                topic = 'topic%d' % (i % 8)
+                dispatcher.submit(topic, received.setdefault(topic, []).append, i)
+        assert sum(len(values) for values in received.values()) == 200
+        for values in received.values():
+            assert values == sorted(values)
+        assert dispatcher.metrics()['dispatched'] == 200
+
+    def test_slow_callback_does_not_block_submit(self):
+        release = threading.Event()
+        received = []
+
+        def slow(message):
+            release.wait()
+            received.append(message)
+
+        dispatcher = Dispatcher(workers=1, maxsize=3)
+        start = time.time()
+        for i in range(10):
+            dispatcher.submit('trades', slow, i)
+        assert time.time() - start < 0.5
+        metrics = dispatcher.metrics()
+        assert metrics['dropped'] >= 6
+        assert sum(metrics['queue_depth']) <= 3
+        release.set()
+        dispatcher.close()
+        # The message being handled, then the 3 latest.
+        assert received[-3:] == [7, 8, 9]
+
+    def test_conflate_keeps_latest_per_topic(self):
+        release = threading.Event()
+        received = []
+        dispatcher = Dispatcher(workers=1, overflow='conflate')
+        dispatcher.submit('block', lambda message: release.wait(), None)
+        wait(lambda: dispatcher.metrics()['dispatched'] == 1)
+        for i in range(5):
+            dispatcher.submit('a', received.append, ('a', i))
+            dispatcher.submit('b', received.append, ('b', i))
+        release.set()
+        dispatcher.close()
+        assert received == [('a', 4), ('b', 4)]
+        metrics = dispatcher.metrics()
+        assert metrics['conflated'] == 8
+        assert metrics['lag']['max'] > 0
+        assert set(metrics['lag']['by_topic']) == {'block', 'a', 'b'}
+
+    def test_block_waits_for_room(self):
+        received = []
+        dispatcher = Dispatcher(workers=1, maxsize=1, overflow='block')
+        for i in range(20):
+            dispatcher.submit('trades', lambda message: (time.sleep(0.001),
+                                                         received.append(message)), i)
+        dispatcher.close()
+        assert received == list(range(20))
+        assert dispatcher.metrics()['max_queue_depth'] == 1
+
+    def test_invalid_overflow(self):
+        with pytest.raises(ValueError):
+            Dispatcher(overflow='latest')
+
+    def test_websocket_callbacks_run_on_workers(self, exchange):
+        from apexpro.websocket_api import WebSocket
+
+        threads = []
+        with Dispatcher(workers=2) as dispatcher:
+            exchange.publish('recentlyTrade.H.BTCUSDC', [{'p': '20000'}], 'snapshot')
+            ws_client = WebSocket(endpoint=exchange.ws_endpoint, dispatcher=dispatcher)
+            ws_client.trade_stream(
+                lambda message: threads.append(threading.current_thread().name), 'BTCUSDC')
+            wait(lambda: threads)
+            assert threads[0].startswith('apexpro-dispatch-')
+            ws_client.ws_public.exit()
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import pytest
+
+from apexpro import private_key_to_public_key_pair_hex
+from apexpro.constants import APEX_HTTP_TEST, NETWORKID_TEST
+from apexpro.http_async import AsyncHttpPrivateStark, AsyncHttpPublic
+from apexpro.http_private_stark_key_sign import HttpPrivateStark
+
+from .conftest import API_KEY_CREDENTIALS, run
+
+STARK_PRIVATE_KEY = '0x170d807cafe3d8b5758f3f698331d292bf5aeb71f6fd282f0831dee094ee891'
+STARK_PUBLIC_KEY = private_key_to_public_key_pair_hex(STARK_PRIVATE_KEY)[0]
+
+
+@pytest.fixture
+def exchange(exchange):
+    exchange.add_account(API_KEY_CREDENTIALS, STARK_PUBLIC_KEY, position_id='12345')
+    return exchange
+
+
+class TestHttpAsync():
+
+    def test_concurrent_public_requests_share_the_pool(self, exchange):
+        exchange.latency = 0.05
+
+        async def test():
+            async with AsyncHttpPublic(exchange.http_endpoint, pool_size=10) as client:
+                start = asyncio.get_running_loop().time()
+                results = await asyncio.gather(*[client.server_time() for _ in range(100)])
+                elapsed = asyncio.get_running_loop().time() - start
+            assert all('time' in result['data'] for result in results)
+            assert exchange.stats['time'] == 100
+            # 100 requests of 50ms over 10 connections, not one after the other.
+            assert elapsed < 2
+
+        run(test())
+
+    def test_create_order_v2_matches_sync_client(self, exchange):
+        order = dict(
+            symbol='BTC-USDC', side='BUY', type='LIMIT', size='0.01', price='20000',
+            limitFeeRate='0.0005', expirationEpochSeconds=time.time() + 3600, clientId='1')
+
+        async def test():
+            async with AsyncHttpPrivateStark(
+                    exchange.http_endpoint, network_id=NETWORKID_TEST,
+                    stark_private_key=STARK_PRIVATE_KEY,
+                    api_key_credentials=API_KEY_CREDENTIALS) as client:
+                await client.configs_v2()
+                assert client.configIndexV2.tick_size('BTC-USDC') is not None
+                await client.get_account_v2()
+                assert client.account['positionId'] == '12345'
+                return await client.create_order_v2(**order)
+
+        # The exchange checks the API key signature and the STARK signature of the order.
+        response = run(test())
+        assert exchange.stats['rejected'] == 0
+
+        sync_client = HttpPrivateStark(
+            APEX_HTTP_TEST, network_id=NETWORKID_TEST, stark_private_key=STARK_PRIVATE_KEY)
+        sync_client._apply_configs_v2({'usdcConfig': exchange.config, 'usdtConfig': {}})
+        sync_client.account = {'positionId': '12345'}
+        sync_client._post = lambda endpoint, data: data
+        expected = sync_client.create_order_v2(**order)
+
+        assert response['data']['clientId'] == expected['clientId']
+        assert response['data']['limitFee'] == expected['limitFee']
+        assert exchange.accounts['key'].orders == {response['data']['id']: response['data']}
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time budget of the public market data entry points, in microseconds.
+PUBLIC_IMPORT_BUDGET_US = 500000
+
+PUBLIC_MODULES = ['apexpro.http_public', 'apexpro.websocket_api']
+HEAVY_MODULES = [
+    'web3',
+    'eth_account',
+    'ecdsa',
+    'sympy',
+    'apexpro.eth',
+    'apexpro.eth_signing',
+    'apexpro.starkex.starkex_resources.python_signature',
+]
+
+
+def _import_times(modules):
+    """
+    Imports modules in a fresh interpreter with -X importtime and returns the cumulative time of
+    every imported module, in microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + ', '.join(modules)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        cwd=ROOT_PATH,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestImportTime():
+
+    def test_public_modules_skip_heavy_dependencies(self):
+        times = _import_times(PUBLIC_MODULES)
+        assert [module for module in HEAVY_MODULES if module in times] == []
+
+    def test_public_modules_import_budget(self):
+        times = _import_times(PUBLIC_MODULES)
+        total = sum(times[module] for module in PUBLIC_MODULES)
+        assert total < PUBLIC_IMPORT_BUDGET_US, times
@@ -0,0 +1,68 @@
+import random
+
+from apexpro.constants import APEX_HTTP_TEST, NETWORKID_TEST
+from apexpro.helpers.instrumentation import NO_PHASE, Histogram, HistogramCollector
+from apexpro.http_private_stark_key_sign import HttpPrivateStark
+
+STARK_PRIVATE_KEY = '0x170d807cafe3d8b5758f3f698331d292bf5aeb71f6fd282f0831dee094ee891'
+API_KEY_CREDENTIALS = {'key': 'key', 'secret': 'c2VjcmV0', 'passphrase': 'passphrase'}
+
+CONFIG = {
+    'global': {'registerEnvId': NETWORKID_TEST},
+    'currency': [
+        {'id': 'USDC', 'starkExAssetId': '0xa21e', 'stepSize': '0.000001'},
+    ],
+    'perpetualContract': [
+        {'symbol': 'BTC-USDC', 'settleCurrencyId': 'USDC', 'tickSize': '0.5',
+         'stepSize': '0.001', 'starkExResolution': 10000000000,
+         'starkExSyntheticAssetId': '0x4254432d3130000000000000000000'},
+    ],
+    'multiChain': {'chains': []},
+}
+
+
+class TestInstrumentation():
+
+    def test_histogram_percentiles(self):
+        values = [random.randint(1, 10 ** 9) for _ in range(10000)]
+        histogram = Histogram()
+        for value in values:
+            histogram.record(value)
+        values.sort()
+        for percentile in (50, 90, 99, 99.9):
+            exact = values[int(len(values) * percentile / 100.0 + 0.5) - 1]
+            assert abs(histogram.percentile(percentile) - exact) <= exact / 100
+        assert histogram.percentile(100) == values[-1]
+        assert histogram.count == len(values)
+
+    def test_small_values_are_exact(self):
+        histogram = Histogram()
+        for value in range(256):
+            histogram.record(value)
+        assert histogram.percentile(50) == 127
+
+    def test_create_order_phases(self):
+        collector = HistogramCollector()
+        client = HttpPrivateStark(
+            APEX_HTTP_TEST, network_id=NETWORKID_TEST, stark_private_key=STARK_PRIVATE_KEY,
+            api_key_credentials=API_KEY_CREDENTIALS, instrumentation=collector)
+        client._apply_configs_v2({'usdcConfig': CONFIG, 'usdtConfig': {}})
+        client.account = {'positionId': '12345'}
+        client.client.send = lambda request, timeout: type(
+            'Response', (), {'json': lambda self: {'data': {}}})()
+
+        for _ in range(3):
+            client.create_order_v2(
+                symbol='BTC-USDC', side='BUY', type='LIMIT', size='0.01', price='20000',
+                limitFeeRate='0.0005', expirationEpochSeconds=1700000000)
+
+        snapshot = collector.snapshot()
+        assert set(snapshot['create-order']) == {'sign', 'fee', 'hmac', 'network', 'decode'}
+        assert snapshot['create-order']['sign']['count'] == 3
+        assert snapshot['create-order']['sign']['p50_us'] > 0
+        collector.reset()
+        assert collector.snapshot() == {}
+
+    def test_disabled_by_default(self):
+        client = HttpPrivateStark(APEX_HTTP_TEST, network_id=NETWORKID_TEST)
+        assert client._phase('create-order', 'sign') is NO_PHASE
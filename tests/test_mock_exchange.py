@@ -0,0 +1,103 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+aiohttp = pytest.importorskip('aiohttp')
+
+from apexpro import private_key_to_public_key_pair_hex
+from apexpro.constants import NETWORKID_TEST
+from apexpro.helpers.request_helpers import generate_now
+from apexpro.http_private_stark_key_sign import HttpPrivateStark
+from apexpro.mock_exchange import hmac_signature
+
+from .conftest import API_KEY_CREDENTIALS, run
+
+STARK_PRIVATE_KEY = '0x170d807cafe3d8b5758f3f698331d292bf5aeb71f6fd282f0831dee094ee891'
+STARK_PUBLIC_KEY = private_key_to_public_key_pair_hex(STARK_PRIVATE_KEY)[0]
+
+ORDER = dict(symbol='BTC-USDC', side='BUY', type='LIMIT', size='0.01', price='20000',
+             limitFeeRate='0.0005', expirationEpochSeconds=time.time() + 3600)
+
+
+def make_client(exchange):
+    client = HttpPrivateStark(
+        exchange.http_endpoint, network_id=NETWORKID_TEST, stark_private_key=STARK_PRIVATE_KEY,
+        api_key_credentials=API_KEY_CREDENTIALS)
+    exchange.add_account(API_KEY_CREDENTIALS, STARK_PUBLIC_KEY, position_id='12345')
+    client.configs_v2()
+    client.get_account_v2()
+    return client
+
+
+class TestMockExchange():
+
+    def test_orders_round_trip(self, exchange):
+        client = make_client(exchange)
+        assert client.account['positionId'] == '12345'
+
+        order = client.create_order_v2(**ORDER)['data']
+        assert order['status'] == 'OPEN'
+        assert client.open_orders_v2()['data'] == [order]
+
+        client.delete_order_v2(id=order['id'])
+        assert client.open_orders_v2()['data'] == []
+        assert [o['id'] for o in client.paginate(client.history_orders_v2)] == [order['id']]
+
+    def test_rejects_bad_signatures(self, exchange):
+        client = make_client(exchange)
+        response = client.create_order_v2(signature='1' * 128, **ORDER)
+        assert response['msg'] == 'Invalid order signature'
+
+        other = HttpPrivateStark(
+            exchange.http_endpoint, network_id=NETWORKID_TEST,
+            api_key_credentials=dict(API_KEY_CREDENTIALS, secret='other'))
+        assert other.get_account_v2()['msg'] == 'Invalid signature'
+        assert exchange.stats['rejected'] == 2
+
+    def test_error_injection(self, exchange):
+        exchange.error_rate = 1
+        client = HttpPrivateStark(exchange.http_endpoint, network_id=NETWORKID_TEST)
+        assert client.server_time() == {'code': 500, 'msg': 'Injected error'}
+
+    def test_websocket_protocol(self, exchange):
+        client = make_client(exchange)
+
+        async def test():
+            session = aiohttp.ClientSession()
+            public = await session.ws_connect(exchange.ws_endpoint + '/realtime_public?v=2')
+            topic = 'orderBook200.H.BTCUSDC'
+            await public.send_json({'op': 'subscribe', 'args': [topic]})
+            assert (await public.receive_json())['request']['op'] == 'subscribe'
+            exchange.publish_depth('BTCUSDC', [['20000', '1']], [['20001', '2']])
+            snapshot = await public.receive_json()
+            assert snapshot['type'] == 'snapshot'
+            assert snapshot['data']['u'] == 1
+            await public.send_json({'op': 'ping', 'args': ['1']})
+            assert (await public.receive_json())['op'] == 'pong'
+
+            private = await session.ws_connect(exchange.ws_endpoint + '/realtime_private?v=2')
+            timestamp = generate_now()
+            login = {
+                'type': 'login',
+                'topics': ['ws_accounts_v2'],
+                'httpMethod': 'GET',
+                'requestPath': '/ws/accounts',
+                'apiKey': 'key',
+                'passphrase': 'passphrase',
+                'timestamp': timestamp,
+                'signature': hmac_signature('secret', str(timestamp) + 'GET/ws/accounts'),
+            }
+            await private.send_json({'op': 'login', 'args': [json.dumps(login)]})
+            assert (await private.receive_json())['success'] is True
+
+            loop = asyncio.get_running_loop()
+            order = (await loop.run_in_executor(
+                None, lambda: client.create_order_v2(**ORDER)))['data']
+            update = await private.receive_json()
+            assert update['topic'] == 'ws_accounts_v2'
+            assert update['contents']['orders'] == [order]
+            await session.close()
+
+        run(test())
@@ -0,0 +1,61 @@
+import decimal
+
+from apexpro.models import ConfigIndex
+
+USDC_CONFIG = {
+    'currency': [
+        {'id': 'USDC', 'starkExAssetId': '0xa21e', 'stepSize': '0.000001'},
+    ],
+    'perpetualContract': [
+        {'symbol': 'BTC-USDC', 'settleCurrencyId': 'USDC', 'tickSize': '0.5',
+         'stepSize': '0.001', 'starkExSyntheticAssetId': '0x4254'},
+        {'symbol': 'ETH-USDC', 'settleCurrencyId': 'USDC', 'tickSize': '0.01',
+         'stepSize': '0.01', 'starkExSyntheticAssetId': '0x4554'},
+    ],
+    'multiChain': {'chains': [
+        {'chainId': 5, 'rpcUrl': 'https://goerli', 'tokens': [
+            {'token': 'USDC', 'tokenAddress': '0xusdc-goerli', 'decimals': 6},
+        ]},
+    ]},
+}
+
+USDT_CONFIG = {
+    'currency': [
+        {'id': 'USDC', 'starkExAssetId': '0xother'},
+        {'id': 'USDT', 'starkExAssetId': '0x7a56', 'stepSize': '0.0001'},
+    ],
+    'perpetualContract': [
+        {'symbol': 'BTC-USDT', 'settleCurrencyId': 'USDT', 'tickSize': '0.1',
+         'stepSize': '0.001', 'starkExSyntheticAssetId': '0x4254'},
+    ],
+    'multiChain': {'chains': [
+        {'chainId': 5, 'rpcUrl': 'https://goerli', 'tokens': [
+            {'token': 'USDC', 'tokenAddress': '0xother'},
+            {'token': 'USDT', 'tokenAddress': '0xusdt-goerli', 'decimals': 6},
+        ]},
+    ]},
+}
+
+
+class TestConfigIndex():
+
+    def test_symbols(self):
+        index = ConfigIndex(USDC_CONFIG, USDT_CONFIG)
+        assert index.contract('ETH-USDC')['starkExSyntheticAssetId'] == '0x4554'
+        assert index.tick_size('BTC-USDT') == decimal.Decimal('0.1')
+        assert index.step_size('BTC-USDC') == decimal.Decimal('0.001')
+        assert index.settle_currency('BTC-USDC')['starkExAssetId'] == '0xa21e'
+        assert index.settle_currency('BTC-USDT')['starkExAssetId'] == '0x7a56'
+        assert index.contract('DOGE-USDC') == {}
+        assert index.tick_size('DOGE-USDC') is None
+
+    def test_currencies_and_tokens_prefer_settling_config(self):
+        for configs in ((USDC_CONFIG, USDT_CONFIG), (USDT_CONFIG, USDC_CONFIG)):
+            index = ConfigIndex(*configs)
+            assert index.currency('USDC')['starkExAssetId'] == '0xa21e'
+            assert index.currency('USDT')['starkExAssetId'] == '0x7a56'
+            assert index.currency_config('USDT') is USDT_CONFIG
+            assert index.token(5, 'USDC')['tokenAddress'] == '0xusdc-goerli'
+            assert index.token(5, 'USDT')['tokenAddress'] == '0xusdt-goerli'
+            assert index.token(1, 'USDC') == {}
+            assert index.chain(5)['rpcUrl'] == 'https://goerli'
@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+from apexpro import order_book
+from apexpro.order_book import OrderBook
+
+from .conftest import wait
+
+SNAPSHOT = {'topic': 'orderBook25.H.BTCUSDC', 'type': 'snapshot', 'data': {
+    's': 'BTCUSDC', 'u': 10,
+    'b': [['19999', '1'], ['20000', '2'], ['19998.5', '3']],
+    'a': [['20001', '1'], ['20003', '2']],
+}}
+
+
+def delta(u, b=(), a=()):
+    return {'topic': 'orderBook25.H.BTCUSDC', 'type': 'delta',
+            'data': {'s': 'BTCUSDC', 'u': u, 'b': list(b), 'a': list(a)}}
+
+
+@pytest.fixture(params=['sortedcontainers', 'bisect'])
+def book(request, monkeypatch):
+    if request.param == 'bisect':
+        monkeypatch.setattr(order_book, 'SortedList', None)
+    return OrderBook('BTCUSDC')
+
+
+class TestOrderBook():
+
+    def test_snapshot_and_deltas(self, book):
+        assert book.apply(SNAPSHOT)
+        assert book.top() == (('20000', '2'), ('20001', '1'))
+        assert book.depth(2)['b'] == [('20000', '2'), ('19999', '1')]
+
+        assert book.apply(delta(11, b=[['20000', '0'], ['20000.5', '4']], a=[['20002', '5']]))
+        assert book.best_bid() == ('20000.5', '4')
+        assert book.depth()['a'] == [('20001', '1'), ('20002', '5'), ('20003', '2')]
+        assert book.snapshot() == {
+            's': 'BTCUSDC', 'u': 11,
+            'b': [('20000.5', '4'), ('19999', '1'), ('19998.5', '3')],
+            'a': [('20001', '1'), ('20002', '5'), ('20003', '2')],
+        }
+        assert len(book) == 6
+
+    def test_gap_waits_for_snapshot(self, book):
+        assert not book.apply(delta(1))
+        book.apply(SNAPSHOT)
+        assert not book.apply(delta(12, a=[['20001', '0']]))
+        assert not book.synced and book.gaps == 1
+        assert not book.apply(delta(13))
+        assert book.best_ask() == ('20001', '1')
+
+        assert book.apply(SNAPSHOT)
+        assert book.synced and book.update_id == 10
+
+    def test_snapshot_without_update_id(self, book):
+        snapshot = dict(SNAPSHOT, data={k: v for k, v in SNAPSHOT['data'].items() if k != 'u'})
+        assert book.apply(snapshot)
+        assert book.synced and book.update_id is None
+        assert book.apply(delta(None, b=[['20000.5', '4']]))
+        assert book.apply(delta(21, a=[['20001', '0']]))
+        assert book.top() == (('20000.5', '4'), ('20003', '2'))
+        assert not book.apply(delta(23))
+        assert not book.synced and book.gaps == 1
+
+    def test_stream_resyncs_on_gap(self, exchange):
+        from apexpro.websocket_api import WebSocket
+
+        exchange.publish_depth('BTCUSDC', [['20000', '1']], [['20001', '1']], limit=25)
+        updated = threading.Event()
+        ws_client = WebSocket(endpoint=exchange.ws_endpoint)
+        book = ws_client.order_book_stream('BTCUSDC', 25, callback=lambda b: updated.set())
+        assert ws_client.order_book('BTCUSDC') is book
+
+        wait(lambda: book.update_id == 1)
+        exchange.publish_depth('BTCUSDC', [['20000.5', '2']], [], limit=25)
+        wait(lambda: book.update_id == 2)
+        assert book.best_bid() == ('20000.5', '2')
+
+        # An update id is skipped: the client resubscribes and gets the current snapshot.
+        exchange.publish('orderBook25.H.BTCUSDC', {'s': 'BTCUSDC', 'b': [], 'a': [], 'u': 9})
+        wait(lambda: book.gaps == 1 and book.synced)
+        assert book.update_id == 2
+        assert book.top() == (('20000.5', '2'), ('20001', '1'))
+        assert updated.is_set()
+        ws_client.ws_public.ws.close()
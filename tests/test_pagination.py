@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from apexpro.exceptions import InvalidRequestError
+from apexpro.helpers.pagination import aiter_rows, iter_rows
+
+from .conftest import run
+
+
+class FakeFills:
+    """Stand-in for fills_v2, serving rows 0..total-1 newest first."""
+
+    __name__ = 'fills_v2'
+
+    def __init__(self, total, delay=0.0, inserted_after_first_page=0):
+        self.total = total
+        self.delay = delay
+        self.inserted_after_first_page = inserted_after_first_page
+        self.pages = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def page(self, limit, page):
+        total = self.total
+        if page > 0:
+            # New fills arrive while paging, shifting the older ones to later pages.
+            total += self.inserted_after_first_page
+        ids = list(range(total - 1, -1, -1))[page * limit:(page + 1) * limit]
+        return {'data': {'orders': [{'id': str(i)} for i in ids], 'totalSize': total}}
+
+    def __call__(self, limit, page, **params):
+        with self.lock:
+            self.pages.append(page)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        return self.page(limit, page)
+
+
+class TestPagination():
+
+    def test_iter_rows_walks_all_pages(self):
+        fetch = FakeFills(250, delay=0.02)
+        rows = list(iter_rows(fetch, limit=100, prefetch=3))
+        assert [row['id'] for row in rows] == [str(i) for i in range(249, -1, -1)]
+        assert sorted(fetch.pages) == [0, 1, 2]
+        assert fetch.max_in_flight > 1
+
+    def test_iter_rows_drops_duplicates_at_page_boundaries(self):
+        fetch = FakeFills(200, inserted_after_first_page=3)
+        ids = [row['id'] for row in iter_rows(fetch, limit=100, prefetch=1)]
+        assert len(ids) == len(set(ids))
+        assert ids[:100] == [str(i) for i in range(199, 99, -1)]
+
+    def test_iter_rows_is_lazy(self):
+        fetch = FakeFills(10000)
+        rows = iter_rows(fetch, limit=100, prefetch=2)
+        assert next(rows) == {'id': '9999'}
+        rows.close()
+        assert len(fetch.pages) <= 3
+
+    def test_iter_rows_rate_budget(self):
+        fetch = FakeFills(500)
+        start = time.monotonic()
+        assert len(list(iter_rows(fetch, limit=100, max_requests_per_second=50))) == 500
+        # 5 pages spaced 20ms apart.
+        assert time.monotonic() - start >= 0.08
+
+    def test_iter_rows_raises_on_error_response(self):
+        with pytest.raises(InvalidRequestError):
+            list(iter_rows(lambda **kwargs: {'code': 3, 'msg': 'error'}))
+
+    def test_aiter_rows(self):
+        fetch = FakeFills(250)
+
+        async def afetch(**kwargs):
+            await asyncio.sleep(0.01)
+            return fetch(**kwargs)
+
+        async def collect():
+            return [row['id'] async for row in aiter_rows(afetch, rows_key='orders', limit=100)]
+
+        ids = run(collect())
+        assert ids == [str(i) for i in range(249, -1, -1)]
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from apexpro.websocket_api import WebSocket
+from apexpro.websocket_async import WebSocketAsync
+
+from .conftest import run, wait
+
+SYMBOLS = ['BTCUSDC', 'ETHUSDC', 'SOLUSDC', 'DOGEUSDC', 'LTCUSDC', 'XRPUSDC']
+
+
+@pytest.fixture
+def exchange(exchange):
+    for symbol in SYMBOLS:
+        exchange.publish('instrumentInfo.H.' + symbol, {'symbol': symbol}, 'snapshot')
+    return exchange
+
+
+class TestPublicPool():
+
+    def test_shards_by_symbol(self, exchange):
+        tickers, books = [], []
+        ws_client = WebSocket(endpoint=exchange.ws_endpoint, public_connections=3)
+        for symbol in SYMBOLS:
+            ws_client.ticker_stream(tickers.append, symbol)
+            ws_client.depth_stream(books.append, symbol, 25)
+        wait(lambda: len(tickers) == len(SYMBOLS))
+
+        managers = [manager for manager in ws_client.ws_public_pool if manager is not None]
+        assert len(managers) > 1
+        assert len(exchange._connections) == len(managers)
+        for symbol in SYMBOLS:
+            # Both topics of a symbol are on the same connection.
+            assert ws_client.public_topics['instrumentInfo.H.' + symbol] == \
+                ws_client.public_topics['orderBook25.H.' + symbol]
+        ws_client.close()
+
+    def test_max_topics_per_connection(self, exchange):
+        tickers = []
+        ws_client = WebSocket(endpoint=exchange.ws_endpoint, public_connections=1,
+                              max_topics_per_connection=2)
+        ws_client.public_topics_stream(
+            tickers.append, ['instrumentInfo.H.' + symbol for symbol in SYMBOLS])
+        wait(lambda: len(tickers) == len(SYMBOLS))
+        assert len(ws_client.ws_public_pool) == 3
+        assert all(len(manager.subscriptions) == 2 for manager in ws_client.ws_public_pool)
+        # One subscribe message per connection.
+        assert exchange.stats['ws_messages'] == 3
+
+        # A dropped connection only resyncs its own topics.
+        events = []
+        ws_client.event_callback = events.append
+        exchange.drop_connections()
+        wait(lambda: sum(event['event'] == 'reconnect' for event in events) == 3)
+        assert sorted(topic for event in events if event['event'] == 'reconnect'
+                      for topic in event['topics']) == \
+            sorted('instrumentInfo.H.' + symbol for symbol in SYMBOLS)
+        ws_client.close()
+
+    def test_unsubscribe_frees_the_slot(self, exchange):
+        tickers = []
+        ws_client = WebSocket(endpoint=exchange.ws_endpoint, max_topics_per_connection=1)
+        ws_client.depth_topic_stream(tickers.append, 'instrumentInfo.H.BTCUSDC')
+        ws_client.unsub_depth_topic_stream(tickers.append, 'instrumentInfo.H.BTCUSDC')
+        assert ws_client.public_topics == {}
+        ws_client.ticker_stream(tickers.append, 'ETHUSDC')
+        wait(lambda: any(message['topic'] == 'instrumentInfo.H.ETHUSDC' for message in tickers))
+        assert len(ws_client.ws_public_pool) == 1
+        ws_client.close()
+
+    def test_async(self, exchange):
+        async def test():
+            tickers = []
+            async with WebSocketAsync(endpoint=exchange.ws_endpoint,
+                                      public_connections=2) as ws_client:
+                await ws_client.public_topics_stream(
+                    tickers.append, ['instrumentInfo.H.' + symbol for symbol in SYMBOLS])
+                while len(tickers) < len(SYMBOLS):
+                    await asyncio.sleep(0.01)
+                assert len([manager for manager in ws_client.ws_public_pool if manager]) == 2
+
+        run(asyncio.wait_for(test(), 10))
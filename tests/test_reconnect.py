@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from apexpro.helpers.backoff import Backoff
+from apexpro.websocket_api import WebSocket
+from apexpro.websocket_async import WebSocketAsync
+
+from .conftest import API_KEY_CREDENTIALS, run, wait
+
+
+@pytest.fixture
+def exchange(exchange):
+    exchange.publish_depth('BTCUSDC', [['20000', '1']], [['20001', '1']], limit=25)
+    return exchange
+
+
+class TestReconnect():
+
+    def test_backoff(self):
+        backoff = Backoff(initial=0.1, maximum=1)
+        delays = [backoff.next() for _ in range(8)]
+        assert 0.05 <= delays[0] <= 0.1
+        assert 0.1 <= delays[1] <= 0.2
+        assert all(0.5 <= delay <= 1 for delay in delays[4:])
+        assert backoff.attempts == 8
+        backoff.reset()
+        assert backoff.next() <= 0.1
+
+    def test_replays_subscriptions(self, exchange):
+        events, trades = [], []
+        ws_client = WebSocket(endpoint=exchange.ws_endpoint, event_callback=events.append)
+        book = ws_client.order_book_stream('BTCUSDC', 25)
+        ws_client.trade_stream(trades.append, 'BTCUSDC')
+        ws_client.trade_stream(trades.append, 'ETHUSDC')
+        ws_client.unsub_depth_topic_stream(trades.append, 'recentlyTrade.H.ETHUSDC')
+        wait(lambda: book.synced)
+
+        exchange.drop_connections()
+        wait(lambda: events and events[-1]['event'] == 'reconnect')
+        assert [event['event'] for event in events] == ['disconnect', 'gap', 'reconnect']
+        assert events[1]['topic'] == 'orderBook25.H.BTCUSDC'
+        assert events[2]['topics'] == ['orderBook25.H.BTCUSDC', 'recentlyTrade.H.BTCUSDC']
+        assert events[2]['downtime'] < 1
+
+        # The book is empty until the replayed subscription brings a new snapshot.
+        wait(lambda: book.synced)
+        assert book.best_bid() == ('20000', '1')
+        exchange.publish('recentlyTrade.H.BTCUSDC', [{'p': '20000'}])
+        wait(lambda: trades)
+        ws_client.ws_public.exit()
+
+    def test_async_reauthenticates(self, exchange):
+        async def test():
+            events, accounts = [], []
+            async with WebSocketAsync(endpoint=exchange.ws_endpoint,
+                                      api_key_credentials=API_KEY_CREDENTIALS,
+                                      event_callback=events.append) as ws_client:
+                await ws_client.account_info_stream_v2(accounts.append)
+                book = await ws_client.order_book_stream('BTCUSDC', 25)
+
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, exchange.drop_connections)
+                while sum(event['event'] == 'reconnect' for event in events) < 2:
+                    await asyncio.sleep(0.01)
+                while not (book.synced and accounts):
+                    exchange.publish_private('key', 'ws_accounts_v2', {'orders': []})
+                    await asyncio.sleep(0.01)
+                assert ws_client.ws_private.reconnects == 1
+
+        run(asyncio.wait_for(test(), 10))
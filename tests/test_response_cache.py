@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+
+from apexpro.constants import APEX_HTTP_TEST, NETWORKID_TEST
+from apexpro.helpers.response_cache import ResponseCache
+from apexpro.http_private import HttpPrivate
+
+from .conftest import FakeClock, run
+
+API_KEY_CREDENTIALS = {'key': 'key', 'secret': 'c2VjcmV0', 'passphrase': 'passphrase'}
+
+
+def make_client(cache, delay=0.0):
+    client = HttpPrivate(APEX_HTTP_TEST, network_id=NETWORKID_TEST,
+                         api_key_credentials=API_KEY_CREDENTIALS, response_cache=cache)
+    sent = []
+
+    def send(request, timeout):
+        sent.append(request)
+        time.sleep(delay)
+        response = {'data': {'n': len(sent)}}
+        return type('Response', (), {'json': lambda self: response})()
+
+    client.client.send = send
+    return client, sent
+
+
+class TestResponseCache():
+
+    def test_ttl_and_lru(self):
+        clock = FakeClock()
+        cache = ResponseCache(ttl=1.0, maxsize=2, clock=clock)
+        calls = []
+
+        def fetch(value):
+            return lambda: calls.append(value) or value
+
+        assert cache.get(('k', 'a', ()), fetch(1)) == 1
+        assert cache.get(('k', 'a', ()), fetch(2)) == 1
+        cache.get(('k', 'b', ()), fetch(3))
+        cache.get(('k', 'c', ()), fetch(4))
+        assert cache.get(('k', 'b', ()), fetch(5)) == 3
+        # 'a' was the least recently used of the three.
+        assert cache.get(('k', 'a', ()), fetch(6)) == 6
+        clock.now = 1.0
+        assert cache.get(('k', 'b', ()), fetch(7)) == 7
+        assert calls == [1, 3, 4, 6, 7]
+        assert cache.stats()['hits'] == 2
+
+    def test_concurrent_gets_are_coalesced(self):
+        cache = ResponseCache(ttl=0)
+        client, sent = make_client(cache, delay=0.05)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(client.get_account_v2()))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(sent) == 1
+        assert results == [{'data': {'n': 1}}] * 8
+        assert cache.stats()['coalesced'] == 7
+        # With ttl=0 nothing is cached.
+        client.get_account_v2()
+        assert len(sent) == 2
+
+    def test_post_invalidates_account_state(self):
+        cache = ResponseCache(ttl=10)
+        client, sent = make_client(cache)
+        assert client.open_orders_v2() == {'data': {'n': 1}}
+        assert client.open_orders_v2() == {'data': {'n': 1}}
+        assert client.open_orders_v2(symbol='BTC-USDC') == {'data': {'n': 2}}
+        client.delete_open_orders_v2()
+        assert client.open_orders_v2() == {'data': {'n': 4}}
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 3
+        assert stats['invalidations'] == 1
+
+    def test_error_responses_are_not_cached(self):
+        cache = ResponseCache(ttl=10)
+        responses = [{'code': 20016, 'msg': 'busy'}, {'data': {}}]
+        fetch = lambda: responses.pop(0)
+        assert cache.get(('k', 'a', ()), fetch) == {'code': 20016, 'msg': 'busy'}
+        assert cache.get(('k', 'a', ()), fetch) == {'data': {}}
+        assert cache.get(('k', 'a', ()), fetch) == {'data': {}}
+
+    def test_cancelled_async_fetch_is_retried_by_a_follower(self):
+        cache = ResponseCache(ttl=0)
+        calls = []
+
+        async def fetch():
+            calls.append(None)
+            await asyncio.sleep(0.05)
+            return len(calls)
+
+        async def test():
+            leader = asyncio.ensure_future(cache.get_async(('k', 'a', ()), fetch))
+            await asyncio.sleep(0)
+            followers = [asyncio.ensure_future(cache.get_async(('k', 'a', ()), fetch))
+                         for _ in range(3)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            assert await asyncio.gather(*followers) == [2, 2, 2]
+
+        run(test())
+        assert len(calls) == 2
+        assert cache.stats()['in_flight'] == 0
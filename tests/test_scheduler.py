@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from apexpro.constants import APEX_HTTP_TEST, NETWORKID_TEST
+from apexpro.exceptions import FailedRequestError
+from apexpro.helpers.scheduler import (
+    PRIORITY_ACCOUNT, PRIORITY_CANCEL, PRIORITY_CREATE, PRIORITY_HISTORY, RequestScheduler)
+from apexpro.http_private import HttpPrivate
+
+from .conftest import API_KEY_CREDENTIALS, FakeClock, run
+
+
+class TestRequestScheduler():
+
+    def test_classify(self):
+        scheduler = RequestScheduler(rate=10, weights={'history-orders': 5})
+        assert scheduler.classify(APEX_HTTP_TEST + '/api/v2/delete-order') == (PRIORITY_CANCEL, 1)
+        assert scheduler.classify('/api/v2/create-order') == (PRIORITY_CREATE, 1)
+        assert scheduler.classify('/api/v2/account') == (PRIORITY_ACCOUNT, 1)
+        assert scheduler.classify('/api/v2/history-orders') == (PRIORITY_HISTORY, 5)
+
+    def test_burst_then_rate(self):
+        clock = FakeClock()
+        scheduler = RequestScheduler(rate=10, burst=2, clock=clock)
+
+        def try_dispatch(ticket):
+            with scheduler._lock:
+                return scheduler._try_dispatch(ticket)
+
+        assert try_dispatch(scheduler._enqueue('/api/v2/account')) == 0
+        assert try_dispatch(scheduler._enqueue('/api/v2/account')) == 0
+        ticket = scheduler._enqueue('/api/v2/account')
+        assert try_dispatch(ticket) == pytest.approx(0.1)
+        clock.now = 0.1
+        assert try_dispatch(ticket) == 0
+
+    def test_cancels_jump_the_queue(self):
+        scheduler = RequestScheduler(rate=50, burst=1)
+        scheduler.acquire('/api/v2/account')
+        order = []
+
+        def request(path):
+            scheduler.acquire(path)
+            order.append(path)
+
+        paths = ['/api/v2/history-value'] * 3 + ['/api/v2/account', '/api/v2/create-order',
+                                                 '/api/v2/delete-order']
+        threads = []
+        for path in paths:
+            threads.append(threading.Thread(target=request, args=(path,)))
+            threads[-1].start()
+            time.sleep(0.002)
+        for thread in threads:
+            thread.join()
+
+        assert order[:3] == ['/api/v2/delete-order', '/api/v2/create-order', '/api/v2/account']
+        metrics = scheduler.metrics()
+        assert metrics['dispatched']['history'] == 3
+        assert metrics['queue_depth'] == {'cancel': 0, 'create': 0, 'account': 0, 'history': 0}
+        assert metrics['max_queue_depth']['history'] == 3
+
+    def test_drop_stale_requests(self):
+        scheduler = RequestScheduler(rate=1, burst=1, max_queue_time={PRIORITY_HISTORY: 0.05})
+        scheduler.acquire('/api/v2/account')
+        with pytest.raises(FailedRequestError) as e:
+            scheduler.acquire('/api/v2/fills')
+        assert e.value.status_code == 429
+        assert scheduler.metrics()['dropped']['history'] == 1
+
+    def test_client_waits_on_scheduler(self):
+        scheduler = RequestScheduler(rate=1, burst=1, max_queue_time=0.01)
+        client = HttpPrivate(APEX_HTTP_TEST, network_id=NETWORKID_TEST,
+                             request_scheduler=scheduler)
+        client.client.send = lambda request, timeout: type(
+            'Response', (), {'json': lambda self: {'data': {}}})()
+        assert client.history_value_v2() == {'data': {}}
+        with pytest.raises(FailedRequestError):
+            client.history_value_v2()
+
+    def test_request_is_signed_after_the_wait(self):
+        scheduler = RequestScheduler(rate=10, burst=1)
+        client = HttpPrivate(APEX_HTTP_TEST, network_id=NETWORKID_TEST,
+                             api_key_credentials=API_KEY_CREDENTIALS,
+                             request_scheduler=scheduler, force_retry=True, retry_delay=0)
+        events = []
+        acquire, sign = scheduler.acquire, client.sign
+
+        def record_acquire(path):
+            acquire(path)
+            events.append(('acquired', None))
+
+        def record_sign(**kwargs):
+            events.append(('signed', kwargs['iso_timestamp']))
+            return sign(**kwargs)
+
+        def send(request, timeout):
+            events.append(('sent', request.headers['APEX-TIMESTAMP']))
+            if len(events) == 3:
+                raise requests.exceptions.ConnectionError('reset')
+            return type('Response', (), {'json': lambda self: {'data': {}}})()
+
+        scheduler.acquire = record_acquire
+        client.sign = record_sign
+        client.client.send = send
+        # Take the burst, so that the request waits for the next token.
+        acquire('/api/v2/account')
+        assert client.history_value_v2() == {'data': {}}
+        # Each attempt waits, then signs with a new timestamp, then sends it.
+        assert [event for event, _ in events] == ['acquired', 'signed', 'sent'] * 2
+        assert events[1][1] == events[2][1]
+        assert events[4][1] == events[5][1]
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        scheduler = RequestScheduler(rate=20, burst=1)
+        scheduler.acquire('/api/v2/account')
+
+        async def test():
+            waiter = asyncio.ensure_future(scheduler.acquire_async('/api/v2/delete-order'))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            await asyncio.wait_for(scheduler.acquire_async('/api/v2/fills'), 1)
+            await asyncio.wait_for(scheduler.acquire_async('/api/v2/delete-order'), 1)
+
+        run(test())
+        assert scheduler.metrics()['queue_depth'] == \
+            {'cancel': 0, 'create': 0, 'account': 0, 'history': 0}
@@ -0,0 +1,192 @@
+import json
+import random
+
+from apexpro.starkex.starkex_resources.jacobian import jacobian_mult
+from apexpro.starkex.starkex_resources.math_utils import ec_mult
+from apexpro.starkex.starkex_resources.pedersen_params import PEDERSEN_HASH_POINT_FILENAME
+from apexpro.starkex.starkex_resources.pedersen_params import load_pedersen_params
+from apexpro.starkex.starkex_resources.point_cache import decode_points
+from apexpro.starkex.starkex_resources.point_cache import load_point_buffer
+from apexpro.starkex.starkex_resources.point_cache import point_cache_tag
+from apexpro.starkex.starkex_resources.proxy import get_asset_hash
+from apexpro.starkex.starkex_resources.proxy import get_hash
+from apexpro.starkex.starkex_resources.python_signature import ALPHA
+from apexpro.starkex.starkex_resources.python_signature import EC_GEN
+from apexpro.starkex.starkex_resources.python_signature import EC_ORDER
+from apexpro.starkex.starkex_resources.python_signature import FIELD_PRIME
+from apexpro.starkex.starkex_resources.python_signature import SHIFT_POINT
+from apexpro.starkex.starkex_resources.python_signature import configure_pedersen_table
+from apexpro.starkex.starkex_resources.python_signature import ec_gen_mult
+from apexpro.starkex.starkex_resources.python_signature import mimic_ec_mult_air
+from apexpro.starkex.starkex_resources.python_signature import pedersen_hash_as_point
+from apexpro.starkex.starkex_resources.python_signature import (
+    pedersen_hash_as_point_bitwise,
+)
+from apexpro.starkex.starkex_resources.python_signature import (
+    private_key_to_ec_point_on_stark_curve,
+)
+from apexpro.starkex.starkex_resources.python_signature import py_sign
+from apexpro.starkex.starkex_resources.python_signature import py_verify
+from apexpro.starkex.starkex_resources.python_signature import py_verify_batch
+
+STARK_PRIVATE_KEY = 0x170d807cafe3d8b5758f3f698331d292bf5aeb71f6fd282f0831dee094ee891
+STARK_PUBLIC_KEY = 0x39d88860b99b1809a63add01f7dfa59676ae006bbcdf38ff30b6a69dcf55ed3
+STARK_PUBLIC_KEY_Y_COORDINATE = (
+    0x2bdd58a2c2acb241070bc5d55659a85bba65211890a8c47019a33902aba8400
+)
+
+# (msg_hash, priv_key, seed, r, s) produced by the reference affine implementation.
+SIGNATURE_VECTORS = [
+    (
+        0x40e1e3c9ed0248fc9799a707e36d6004762a223c9f90c95ac96628c4381836,
+        0x19322fe157cf9c6b16e2d5cabeb959208f0ebd4950cddd9ce97b5bdf073eed2,
+        0x9da618fd7bf78a4e,
+        0x54f5aa4aeee08024e3a19b16df81b0bc5caa22e1eac4428e5e5b1a1767e0a38,
+        0x2bfc66f7e1eda025da1a253310588c0c96a7e6f7283b3b77145d06a0a65bb2c,
+    ),
+    (
+        0x7ef077e597ee18bc3a671c462dcec669027b9ad0a83178876e99afdd579c4c9,
+        0xa4adb4ce779a93a99226f446db4bc46a8f69260a228ba87442a1244e2e3762,
+        None,
+        0x6ad4ddaa6725708dba22aa14536fc2d560fa33b926cf2b1467143d4ed149139,
+        0x289977eebd1c46b88ab55815881fd603b739d54a3ee8da8285a4fb88af0e886,
+    ),
+    (
+        0xf708754d4142f83408d67f95a290e3f3d9ff9f2cb87a7a6bd20911b3d18022,
+        0x3c7ff718021ef3275a66c1ae32996b4e2ee229ab471b2e631d17176658aa25e,
+        None,
+        0x5b2b86048e7ccf57e83dd05a9202ee3809bd4f5811c2329d61cc39c4d66694e,
+        0x39419b61cd979a5d3e59766b8aebdaa4dc2e499a295130f07f2f01772fe2ef3,
+    ),
+]
+
+# (a, b, pedersen_hash(a, b)) produced by the reference affine implementation.
+PEDERSEN_HASH_VECTORS = [
+    (
+        0,
+        0,
+        0x49ee3eba8c1600700ee1b87eb599f16716b0b1022947733551fde4050ca6804,
+    ),
+    (
+        0x55adf0ba5d04fab59329845142608df37d5587e166b198374a9922764107334,
+        0x2236f5d2116a98407ff4c3818543641b2092a515ae538506364b8155a4faa50,
+        0x13feba42aaf527032582d62ea4d42a379293062475090e24b964ba771795a7a,
+    ),
+]
+
+
+class TestSignature():
+
+    def test_ec_gen_mult_matches_ec_mult(self):
+        rng = random.Random(0)
+        scalars = [1, 2, 15, 16, 17, EC_ORDER - 1, 2 ** 251]
+        scalars += [rng.randint(1, EC_ORDER - 1) for _ in range(5)]
+        for m in scalars:
+            assert tuple(ec_gen_mult(m)) == tuple(
+                ec_mult(m, EC_GEN, ALPHA, FIELD_PRIME))
+
+    def test_jacobian_mult_matches_ec_mult(self):
+        rng = random.Random(1)
+        point = ec_mult(rng.randint(1, EC_ORDER - 1), EC_GEN, ALPHA, FIELD_PRIME)
+        for m in [1, 2, 3, EC_ORDER - 1] + [rng.randint(1, EC_ORDER - 1) for _ in range(3)]:
+            assert tuple(jacobian_mult(m, point, ALPHA, FIELD_PRIME)) == tuple(
+                ec_mult(m, point, ALPHA, FIELD_PRIME))
+
+    def test_mimic_ec_mult_air_keeps_air_errors(self):
+        # The AIR errors when the partial sum and the doubled point share an x coordinate.
+        for point in (SHIFT_POINT, (SHIFT_POINT[0], FIELD_PRIME - SHIFT_POINT[1])):
+            try:
+                mimic_ec_mult_air(1, point, SHIFT_POINT)
+            except AssertionError:
+                pass
+            else:
+                assert False, 'mimic_ec_mult_air should fail like the AIR'
+
+    def test_pedersen_hash_matches_reference_vectors(self):
+        for a, b, expected in PEDERSEN_HASH_VECTORS:
+            assert pedersen_hash_as_point(a, b)[0] == expected
+
+    def test_pedersen_tables_match_bitwise_hash(self):
+        rng = random.Random(2)
+        inputs = [(0, 0), (1, 0), (0, FIELD_PRIME - 1), (FIELD_PRIME - 1, FIELD_PRIME - 1)]
+        inputs += [(rng.randrange(FIELD_PRIME), rng.randrange(FIELD_PRIME)) for _ in range(5)]
+        try:
+            for window_bits, memory_map in ((4, False), (8, True)):
+                configure_pedersen_table(window_bits, memory_map)
+                for a, b in inputs:
+                    assert tuple(pedersen_hash_as_point(a, b)) == tuple(
+                        pedersen_hash_as_point_bitwise(a, b))
+        finally:
+            configure_pedersen_table()
+
+    def test_asset_hash_matches_nested_hashes(self):
+        sell, buy, fee = PEDERSEN_HASH_VECTORS[1][0], PEDERSEN_HASH_VECTORS[1][1], 0
+        for _ in range(2):
+            assert get_asset_hash(sell, buy, fee) == get_hash(get_hash(sell, buy), fee)
+            assert get_asset_hash(sell, fee) == get_hash(sell, fee)
+
+    def test_private_key_to_ec_point(self):
+        assert tuple(private_key_to_ec_point_on_stark_curve(STARK_PRIVATE_KEY)) == (
+            STARK_PUBLIC_KEY, STARK_PUBLIC_KEY_Y_COORDINATE)
+
+    def test_sign_matches_reference_vectors(self):
+        for msg_hash, priv_key, seed, r, s in SIGNATURE_VECTORS:
+            assert py_sign(msg_hash, priv_key, seed) == (r, s)
+
+    def test_verify(self):
+        for msg_hash, priv_key, seed, r, s in SIGNATURE_VECTORS:
+            public_key = private_key_to_ec_point_on_stark_curve(priv_key)
+            assert py_verify(msg_hash, r, s, public_key[0])
+            assert not py_verify(msg_hash + 1, r, s, public_key[0])
+
+    def test_verify_batch(self):
+        for msg_hash, priv_key, seed, r, s in SIGNATURE_VECTORS:
+            public_key = private_key_to_ec_point_on_stark_curve(priv_key)
+            signatures = [(msg_hash, r, s), (msg_hash + 1, r, s), (msg_hash, r, s)]
+            expected = [True, False, True]
+            assert py_verify_batch(signatures, public_key[0]) == expected
+            assert py_verify_batch(signatures, public_key) == expected
+            negated_key = (public_key[0], FIELD_PRIME - public_key[1])
+            assert py_verify_batch(signatures, negated_key) == [False, False, False]
+
+    def test_pedersen_params_cache(self, tmp_path):
+        with open(PEDERSEN_HASH_POINT_FILENAME) as f:
+            expected = json.load(f)
+        cache_filename = str(tmp_path / 'pedersen_params.bin')
+        for _ in range(2):
+            params = load_pedersen_params(cache_filename=cache_filename)
+            assert params.field_prime == expected['FIELD_PRIME']
+            assert params.ec_order == expected['EC_ORDER']
+            assert params.beta == expected['BETA']
+            assert [list(point) for point in params.constant_points] == \
+                expected['CONSTANT_POINTS']
+            assert list(params.constant_points[2:5]) == [
+                tuple(point) for point in expected['CONSTANT_POINTS'][2:5]]
+
+        # A corrupted cache is detected and rebuilt.
+        with open(cache_filename, 'r+b') as f:
+            f.seek(-1, 2)
+            f.write(b'\xff')
+        params = load_pedersen_params(cache_filename=cache_filename)
+        assert list(params.constant_points[-1]) == expected['CONSTANT_POINTS'][-1]
+
+    def test_point_cache_checks_digest_not_points(self, tmp_path):
+        filename = str(tmp_path / 'table.bin')
+        tag = point_cache_tag('TEST')
+        points = [(i, i + 1) for i in range(100)]
+        checked = []
+
+        def is_valid(point):
+            checked.append(point)
+            return True
+
+        load_point_buffer(filename, tag, lambda: points, is_valid)
+        assert decode_points(load_point_buffer(filename, tag, lambda: [], is_valid)) == points
+        assert checked == [(0, 1)]
+
+        # A corrupted point is caught by the digest, and the table rebuilt.
+        with open(filename, 'r+b') as f:
+            f.seek(-1, 2)
+            f.write(b'\xff')
+        rebuilt = [(1, 2)]
+        assert decode_points(load_point_buffer(filename, tag, lambda: rebuilt, is_valid)) == rebuilt
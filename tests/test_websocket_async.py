@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from apexpro.websocket_api import WebSocket
+from apexpro.websocket_async import WebSocketAsync
+
+from .conftest import API_KEY_CREDENTIALS, run
+
+
+async def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        await asyncio.sleep(0.01)
+    assert condition()
+
+
+class TestWebSocketAsync():
+
+    def test_public_and_private_streams(self, exchange):
+        async def test():
+            trades, accounts = [], []
+
+            async def on_account(message):
+                await asyncio.sleep(0)
+                accounts.append(message)
+
+            # Subscribers are sent the last snapshot of a topic by the mock exchange.
+            exchange.publish('recentlyTrade.H.BTCUSDC', [{'p': '20000'}], 'snapshot')
+            exchange.publish_depth('BTCUSDC', [['20000', '1']], [['20001', '1']], limit=25)
+
+            async with WebSocketAsync(endpoint=exchange.ws_endpoint,
+                                      api_key_credentials=API_KEY_CREDENTIALS) as ws_client:
+                await asyncio.gather(
+                    ws_client.trade_stream(trades.append, 'BTCUSDC'),
+                    ws_client.trade_stream(trades.append, 'ETHUSDC'),
+                    ws_client.account_info_stream_v2(on_account),
+                )
+                book = await ws_client.order_book_stream('BTCUSDC', 25)
+
+                # Private messages are only sent once the login has been processed.
+                while not accounts:
+                    exchange.publish_private('key', 'ws_accounts_v2', {'orders': []})
+                    await asyncio.sleep(0.01)
+                await wait_for(lambda: trades and book.synced)
+
+                assert trades[0]['data'] == [{'p': '20000'}]
+                assert accounts[0]['contents'] == {'orders': []}
+                assert book.best_ask() == ('20001', '1')
+                session = ws_client.session
+            assert session.closed
+            assert ws_client.ws_public is None
+
+        run(test())
+
+    def test_many_clients_on_one_loop(self, exchange):
+        async def test():
+            # Subscribers are sent the last snapshot of a topic by the mock exchange.
+            exchange.publish('instrumentInfo.H.BTCUSDC', {'symbol': 'BTCUSDC'}, 'snapshot')
+            clients = [WebSocketAsync(endpoint=exchange.ws_endpoint) for _ in range(20)]
+            received = []
+            await asyncio.gather(*(
+                client.ticker_stream(received.append, 'BTCUSDC') for client in clients))
+            await wait_for(lambda: len(received) == len(clients))
+            await asyncio.gather(*(client.close() for client in clients))
+
+        run(test())
+
+    def test_sync_exit_does_not_spin(self, exchange):
+        exchange.publish('recentlyTrade.H.BTCUSDC', [{'p': '20000'}], 'snapshot')
+        received = threading.Event()
+        ws_client = WebSocket(endpoint=exchange.ws_endpoint)
+        ws_client.trade_stream(lambda message: received.set(), 'BTCUSDC')
+        assert received.wait(5)
+        start = time.time()
+        ws_client.ws_public.exit()
+        assert time.time() - start < 1
+        assert not ws_client.ws_public.wst.is_alive()